@@ -0,0 +1,141 @@
+"""
+Load throughput of MySQLTableWriter (tools/mysql_loader.py) against a local MySQL:
+per-batch executemany (insert_chunks), bulk_load through LOAD DATA LOCAL
+INFILE, bulk_load's multi-row INSERT fallback and PartitionedLoader over
+several pooled connections.
+
+Start a throwaway server with local_infile on first, e.g.
+
+    docker run --rm -d -p 3306:3306 -e MYSQL_ROOT_PASSWORD=password \\
+        -e MYSQL_DATABASE=bench mysql:8.0 --local-infile=1
+
+then
+
+    python benchmarks/bulk_load.py --rows 1000000 --commit-rows 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from salesanalysisagent.tools.mysql_loader import (  # noqa: E402
+    MySQLConnector,
+    MySQLTableWriter,
+    PartitionedLoader,
+)
+
+
+def synthetic_chunks(rows: int, chunk_rows: int, seed: int = 0):
+    """Sales-shaped frames: product_id, product_name, price, sale_date."""
+    rng = np.random.default_rng(seed)
+    names = np.array(["alpha", "beta", "gamma", "delta\twith tab", "eps\\ilon"])
+    start = pd.Timestamp("2024-01-01")
+    for offset in range(0, rows, chunk_rows):
+        n = min(chunk_rows, rows - offset)
+        yield pd.DataFrame(
+            {
+                "product_id": np.arange(offset, offset + n, dtype=np.int64),
+                "product_name": names[rng.integers(0, len(names), n)],
+                "price": rng.uniform(1, 500, n).round(2),
+                "sale_date": start + pd.to_timedelta(rng.integers(0, 365, n), "D"),
+            }
+        )
+
+
+def count_rows(connector, table_name: str) -> int:
+    cursor = connector.connection.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+    (count,) = cursor.fetchone()
+    cursor.close()
+    return count
+
+
+def reset_table(connector, table_name: str):
+    cursor = connector.connection.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS `{table_name}`")
+    cursor.execute(
+        f"CREATE TABLE `{table_name}` (product_id BIGINT, product_name TEXT, "
+        "price DECIMAL(10, 2), sale_date DATETIME)"
+    )
+    cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="password")
+    parser.add_argument("--database", default="bench")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--commit-rows", type=int, default=500_000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    connector = MySQLConnector(args.host, args.user, args.password, args.database)
+    connector.connect()
+    writer = MySQLTableWriter(connector)
+    table_name = "bulk_load_bench"
+
+    def chunks():
+        return synthetic_chunks(args.rows, args.chunk_rows)
+
+    cases = {
+        "executemany, commit per batch": lambda: writer.insert_chunks(
+            table_name, chunks(), create_table=False
+        ),
+        "bulk_load, LOAD DATA LOCAL": lambda: writer.bulk_load(
+            table_name,
+            chunks(),
+            commit_rows=args.commit_rows,
+            create_table=False,
+            local_infile=True,
+        ),
+        "bulk_load, INSERT fallback": lambda: writer.bulk_load(
+            table_name,
+            chunks(),
+            commit_rows=args.commit_rows,
+            create_table=False,
+            local_infile=False,
+        ),
+        f"PartitionedLoader, {args.workers} connections": lambda: (
+            PartitionedLoader(
+                connector, workers=args.workers, partition_key="product_id"
+            ).load(table_name, chunks(), create_table=False)
+        ),
+    }
+    results = []
+    try:
+        for name, run in cases.items():
+            reset_table(connector, table_name)
+            start = time.perf_counter()
+            try:
+                run()
+            except Exception as e:
+                results.append((name, None, f"{type(e).__name__}: {e}"))
+                continue
+            seconds = time.perf_counter() - start
+            loaded = count_rows(connector, table_name)
+            note = "" if loaded == args.rows else f"loaded {loaded} rows"
+            results.append((name, seconds, note))
+    finally:
+        reset_table(connector, table_name)
+        connector.close()
+
+    print(f"\n{args.rows:,} rows, commit every {args.commit_rows:,}")
+    print(f"{'case':<32} {'seconds':>9} {'rows/sec':>12}")
+    for name, seconds, note in results:
+        if seconds is None:
+            print(f"{name:<32} {'failed':>9} {'':>12} {note}")
+        else:
+            print(f"{name:<32} {seconds:>9.2f} {args.rows / seconds:>12,.0f} {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Startup-time guard for the CLI entry points.
+
+Each case runs in a fresh interpreter, best of --repeat runs. The script
+exits non-zero when a case is over its budget or when importing main pulls
+in a heavy package, so it can run in CI next to the scheduler jobs:
+
+    python benchmarks/import_time.py [--repeat 5] [--budget-ms 150]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, "src")
+
+# Packages that must stay out of `import salesanalysisagent.main`.
+HEAVY = ("crewai", "crewai_tools", "pandas", "numpy", "pyarrow")
+
+CASES = {
+    "import main": ["-c", "import salesanalysisagent.main"],
+    "no arguments": ["-m", "salesanalysisagent.main"],
+    "replay without task id": [
+        "-c",
+        "import sys; sys.argv = ['replay']; "
+        "from salesanalysisagent.main import replay; replay()",
+    ],
+}
+
+
+def run_case(args, repeat: int) -> float:
+    env = dict(os.environ, PYTHONPATH=SRC)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *args],
+            env=env,
+            cwd=ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def heavy_imports() -> list:
+    code = (
+        "import sys, salesanalysisagent.main; "
+        f"print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, PYTHONPATH=SRC),
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return out.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    baseline = run_case(["-c", "pass"], args.repeat)
+    print(f"{'case':<26} {'wall ms':>8} {'over python':>12}")
+    print(f"{'python -c pass':<26} {baseline:>8.1f} {'':>12}")
+    failed = False
+    for name, case in CASES.items():
+        elapsed = run_case(case, args.repeat)
+        over = elapsed - baseline
+        flag = "  OVER BUDGET" if over > args.budget_ms else ""
+        failed |= bool(flag)
+        print(f"{name:<26} {elapsed:>8.1f} {over:>12.1f}{flag}")
+
+    leaked = heavy_imports()
+    if leaked:
+        failed = True
+        print(f"import salesanalysisagent.main loads: {', '.join(leaked)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,38 @@
+import functools
+import os
+from typing import Optional
+
 from crewai import LLM, Agent, Crew, Process, Task
-from crewai.knowledge.source.text_file_knowledge_source import \
-    TextFileKnowledgeSource
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import CodeInterpreterTool, FileWriterTool
+from crewai.tasks.task_output import TaskOutput
 
 # from salesanalysisagent.tools.schema_mapping_tool import SchemaMappingTool
 from salesanalysisagent.tools.clean_validate_tool import CleanValidateTool
 from salesanalysisagent.tools.code_gen_tool import CodeGenTool
-from salesanalysisagent.tools.data_format_validator import \
+from salesanalysisagent.tools.data_format_validator_tool import \
     FormatChangeDetectorTool
 from salesanalysisagent.tools.data_loader_tool import DataLoaderTool
 from salesanalysisagent.tools.inspect_tool import InspectTool
+from salesanalysisagent.tools.knowledge_cache import \
+    CachedTextFileKnowledgeSource
 from salesanalysisagent.tools.schema_mapping_tool import SchemaMappingTool
-from salesanalysisagent.tools.schema_validator import SchemaValidatorTool
+from salesanalysisagent.tools.schema_validator_tool import SchemaValidatorTool
+from salesanalysisagent.tools.transform_bench_tool import TransformBenchmarkTool
+
+# Tasks marked async_execution in tasks.yaml run concurrently; tasks with a
+# context (code_gen_task) wait for them. Set to 0 to run everything in order.
+PARALLEL_TASKS = os.environ.get("SALES_AGENT_PARALLEL_TASKS", "1") != "0"
+# LLM requests per minute across the crew (unset: no limit).
+MAX_RPM = int(os.environ.get("SALES_AGENT_MAX_RPM", "0")) or None
+
+
+@functools.lru_cache(maxsize=None)
+def knowledge_source() -> CachedTextFileKnowledgeSource:
+    """
+    Built on the first crew instead of at import, then shared by every crew.
+    Embeddings are reused across runs until one of the files changes.
+    """
+    return CachedTextFileKnowledgeSource(file_paths=["code.py", "requirements.txt"])
 
 
 @CrewBase
@@ -22,9 +42,11 @@ class SalesAnalysisAgent:
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
     content = "Users name is John. He is 30 years old and lives in San Francisco."
-    text_source = TextFileKnowledgeSource(file_paths=["code.py", "requirements.txt"])
-    code_interpreter = CodeInterpreterTool()
-    write_tool = FileWriterTool()
+    # Names of tasks already handled outside the crew (e.g. by the format
+    # rule library); they are left out of the crew for this run.
+    skip_tasks = frozenset()
+    # Task name -> raw output used instead of running it (cache / rule library).
+    precomputed_outputs = {}
 
     @agent
     def data_loader(self) -> Agent:
@@ -50,12 +72,22 @@ class SalesAnalysisAgent:
 
     @agent
     def schema_validator(self) -> Agent:
+        # crewai_tools adds about a second of imports; only pay it for a crew.
+        from crewai_tools import CodeInterpreterTool, FileWriterTool
+
+        from salesanalysisagent.tools.payload import budgeted
+
         return Agent(
             config=self.agents_config["schema_validator"],
-            tools=[SchemaValidatorTool(), CodeInterpreterTool(), FileWriterTool()],
+            tools=[
+                SchemaValidatorTool(),
+                TransformBenchmarkTool(),
+                budgeted(CodeInterpreterTool)(),
+                budgeted(FileWriterTool)(),
+            ],
             verbose=True,
             all_code_execution=True,
-            # knowledge_sources=[self.text_source],
+            # knowledge_sources=[knowledge_source()],
             # llm=self.gemini_llm,
         )
 
@@ -71,7 +103,7 @@ class SalesAnalysisAgent:
     def data_format_validator(self) -> Agent:
         return Agent(
             config=self.agents_config["data_format_validator"],
-            tools=[FormatChangeDetectorTool()],
+            tools=[FormatChangeDetectorTool(), TransformBenchmarkTool()],
             verbose=True,
         )
 
@@ -88,13 +120,13 @@ class SalesAnalysisAgent:
     #     return Task(
     #         config=self.tasks_config["data_loader_task"],
     #     )
-    #
-    # @task
-    # def inspect_task(self) -> Task:
-    #     return Task(
-    #         config=self.tasks_config["inspect_task"],
-    #     )
-    #
+
+    @task
+    def inspect_task(self) -> Task:
+        return Task(
+            config=self.tasks_config["inspect_task"],
+        )
+
     # @task
     # def schema_mapping_task(self) -> Task:
     #     return Task(
@@ -105,31 +137,71 @@ class SalesAnalysisAgent:
     def schema_validator_task(self) -> Task:
         return Task(config=self.tasks_config["schema_validator_task"])
 
-    # @task
-    # def data_format_check_task(self) -> Task:
-    #     return Task(config=self.tasks_config["data_format_check_task"])
-    #
+    @task
+    def data_format_check_task(self) -> Task:
+        return Task(config=self.tasks_config["data_format_check_task"])
+
     # @task
     # def clean_validate_task(self) -> Task:
     #     return Task(
     #         config=self.tasks_config["clean_validate_task"],
     #     )
-    #
-    # @task
-    # def code_gen_task(self) -> Task:
-    #     return Task(
-    #         config=self.tasks_config["code_gen_task"], output_file="generated_code.py"
-    #     )
-    #
+
+    @task
+    def code_gen_task(self) -> Task:
+        return Task(
+            config=self.tasks_config["code_gen_task"],
+        )
+
     @crew
     def crew(self) -> Crew:
-        return Crew(
+        crew = Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True,
-            knowledge_sources=[self.text_source],
+            knowledge_sources=[knowledge_source()],
+            max_rpm=MAX_RPM,
         )
+        return prepare_run(crew, self.skip_tasks, self.precomputed_outputs)
+
+
+def prepare_run(
+    crew: Crew,
+    skip_tasks=frozenset(),
+    precomputed_outputs: Optional[dict] = None,
+    output_dir: Optional[str] = None,
+) -> Crew:
+    """
+    Shape a crew (or a copy of a shared one) for one feed: drop tasks answered
+    outside the crew, seed their outputs so context still resolves, and write
+    task output files under output_dir.
+    """
+    precomputed_outputs = precomputed_outputs or {}
+    for task in crew.tasks:
+        if task.name in precomputed_outputs:
+            # Downstream tasks still read skipped tasks through context.
+            task.output = TaskOutput(
+                description=task.description,
+                name=task.name,
+                raw=precomputed_outputs[task.name],
+                agent=task.agent.role,
+            )
+    tasks = [task for task in crew.tasks if task.name not in skip_tasks]
+    if not PARALLEL_TASKS:
+        for task in tasks:
+            task.async_execution = False
+    elif tasks and tasks[-1].async_execution:
+        # A crew may not end with several async tasks; run the last inline.
+        tasks[-1].async_execution = False
+    if output_dir is not None:
+        for task in tasks:
+            if task.output_file:
+                task.output_file = os.path.join(
+                    output_dir, os.path.basename(task.output_file)
+                )
+    crew.tasks = tasks
+    return crew
 
 
 # Create a knowledge source
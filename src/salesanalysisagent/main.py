@@ -1,13 +1,31 @@
 #!/usr/bin/env python
+import ast
+import functools
+import glob
+import json
 import os
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from salesanalysisagent.crew import SalesAnalysisAgent
+from salesanalysisagent.tools.tracing import (
+    TRACING_ENABLED,
+    get_tracer,
+    listen_to_crewai,
+    span,
+)
+
+# crewAI, crewai_tools and pandas take seconds to import, so everything built
+# on them is imported inside the function that needs it. Argument errors,
+# replay and runs answered by the rule library or the decision cache never
+# load what they do not use.
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
+BATCH_CONCURRENCY = int(os.environ.get("SALES_AGENT_BATCH_CONCURRENCY", "4"))
+BATCH_OUTPUT_DIR = os.environ.get("SALES_AGENT_OUTPUT_DIR", "outputs")
+
 
 def run():
     """
@@ -29,21 +47,394 @@ def run():
         "current_year": str(datetime.now().year),
     }
     try:
-        result = SalesAnalysisAgent().crew().kickoff(inputs=inputs)
+        kickoff(inputs)
+    except Exception as e:
+        print(f"[ERROR] Failed to run the crew: {str(e)}")
+        raise e
+    finally:
+        if TRACING_ENABLED:
+            print(get_tracer().format_summary())
+
+
+@functools.lru_cache(maxsize=None)
+def crew_tasks():
+    """
+    Names of the @task methods in crew.py, in the crew's task order. They are
+    read from its source so the fast paths can tell whether any task is left
+    without importing crewAI.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "crew.py")
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return tuple(
+        item.name
+        for node in tree.body
+        if isinstance(node, ast.ClassDef)
+        for item in node.body
+        if isinstance(item, ast.FunctionDef)
+        and any(
+            isinstance(decorator, ast.Name) and decorator.id == "task"
+            for decorator in item.decorator_list
+        )
+    )
+
+
+def format_fast_path(detected):
+    """
+    Cover a feed's format drift with the built-in rule library. Returns None
+    when detection itself failed, so the crew task runs as before.
+    """
+    if detected is None:
+        return None
+    from salesanalysisagent.tools.format_rules import plan_format_fixes
+
+    try:
+        return plan_format_fixes(
+            detected["file_path"], detected["format_profile"], detected["table_name"]
+        )
+    except Exception as e:
+        print(f"[WARN] Format rule fast path unavailable: {str(e)}")
+        return None
+
+
+def target_state(file_path):
+    """
+    The feed's validate_schema result and its target table version, or None
+    when the target cannot be read (the decision cache and the transform
+    registry are then skipped for this run).
+    """
+    from salesanalysisagent.tools.decision_cache import DECISION_CACHE_ENABLED
+    from salesanalysisagent.tools.schema_catalog import get_catalog
+    from salesanalysisagent.tools.schema_validator import validate_schema
+    from salesanalysisagent.tools.transform_registry import (
+        TRANSFORM_REGISTRY_ENABLED,
+    )
+
+    if not (DECISION_CACHE_ENABLED or TRANSFORM_REGISTRY_ENABLED):
+        return None
+    try:
+        validation = validate_schema(file_path, sample_target=False)
+        table_version = get_catalog().table_version(
+            validation["database_name"], validation["table_name"]
+        )
+    except Exception as e:
+        print(f"[WARN] Target table unavailable for this run: {str(e)}")
+        return None
+    return validation, table_version
+
+
+def decision_keys(detected, target, task_names):
+    """
+    Decision cache key per task: the schema diff, the column shape signatures
+    and the target table version. Empty when any part cannot be computed, so
+    nothing is cached against an unknown target.
+    """
+    from salesanalysisagent.tools.decision_cache import (
+        DECISION_CACHE_ENABLED,
+        fingerprint,
+        shape_fingerprint,
+    )
+
+    if not DECISION_CACHE_ENABLED or target is None:
+        return {}
+    validation, table_version = target
+    shapes = shape_fingerprint(detected["format_profile"]) if detected else None
+    return {
+        name: (
+            fingerprint(name, validation["schema_difference"], shapes, table_version),
+            validation,
+        )
+        for name in task_names
+    }
+
+
+def transform_key(detected, target):
+    """Transform registry key of a feed, or None when it cannot be computed."""
+    from salesanalysisagent.tools.decision_cache import shape_fingerprint
+    from salesanalysisagent.tools.transform_registry import (
+        TRANSFORM_REGISTRY_ENABLED,
+        schema_fingerprint,
+    )
+
+    if not TRANSFORM_REGISTRY_ENABLED or target is None:
+        return None
+    validation, _ = target
+    shapes = shape_fingerprint(detected["format_profile"]) if detected else None
+    return schema_fingerprint(
+        validation["schema_difference"], validation["target_schema"], shapes
+    )
+
+
+def kickoff(inputs):
+    """
+    Kick off the crew for one feed and store the code it writes in the
+    transform registry. A feed whose schema fingerprint is registered reuses
+    the stored format steps instead of the data format task. That task is
+    also skipped when the rule library covers every drifted column, and any
+    task whose decision is cached for the same drift and target table version is
+    answered from the cache instead of the LLM.
+    """
+    from salesanalysisagent.tools.dataset_registry import reset_registry
+
+    tracer = get_tracer()
+    tracer.reset()
+    try:
+        with span("kickoff", "crew", file_path=inputs["file_path"]):
+            return _kickoff(inputs)
+    finally:
+        reset_registry()
+        if TRACING_ENABLED:
+            stem = tracer.export(os.path.basename(inputs["file_path"]))
+            print(f"Trace written to {stem}.jsonl and {stem}.trace.json")
+
+
+def _kickoff(inputs, base_crew=None, output_dir="."):
+    """
+    One feed: transform registry, rule fast path, decision cache, then the
+    crew for whatever is left. With base_crew (batch mode) the feed runs on a
+    copy of the shared crew, so agents share their tools and the crew is not
+    rebuilt. When nothing is left the crew is never built and crewAI never
+    imported.
+    """
+    from salesanalysisagent.tools.data_format_validator import (
+        detect_format_changes,
+    )
+    from salesanalysisagent.tools.decision_cache import get_decision_cache
+    from salesanalysisagent.tools.transform_registry import (
+        FORMAT_STEPS,
+        get_transform_registry,
+    )
+
+    file_path = inputs["file_path"]
+    with span("format_detection", "stage"):
+        try:
+            detected = dict(detect_format_changes(file_path), file_path=file_path)
+        except Exception as e:
+            print(f"[WARN] Format detection failed: {str(e)}")
+            detected = None
+
+    target = target_state(file_path)
+    registry = get_transform_registry()
+    registry_key = transform_key(detected, target)
+    registered = None
+    if registry_key is not None:
+        with span("transform_registry", "stage"):
+            try:
+                registered = registry.load(registry_key)
+                error = registered.verify(file_path) if registered else None
+            except Exception as e:
+                print(f"[WARN] Registered transform failed to run: {str(e)}")
+                registered = None
+        if registered is not None and error is not None:
+            print(f"[WARN] Registered transform no longer fits: {error}")
+            registered = None
+
+    skip = set()
+    precomputed = {}
+    fixes = None
+    if registered is not None:
+        # The stored format steps answer the format task; the schema and code
+        # generation tasks still run (or come from the decision cache).
+        print(
+            f"[OK] {file_path}: format steps from transform v{registered.version} "
+            f"in {registered.path}"
+        )
+        skip.add("data_format_check_task")
+        precomputed["data_format_check_task"] = registered.task_output()
+    else:
+        with span("format_fast_path", "stage"):
+            fixes = format_fast_path(detected)
+        if fixes is not None and not fixes["uncovered"]:
+            skip.add("data_format_check_task")
+            if fixes["code"]:
+                precomputed["data_format_check_task"] = fixes["code"]
+
+    cache = get_decision_cache()
+    pending = [name for name in crew_tasks() if name not in skip]
+    outputs = []
+    with span("decision_cache", "stage"):
+        keys = decision_keys(detected, target, pending)
+        for name, (key, _) in keys.items():
+            entry = cache.get(key)
+            if entry is not None:
+                skip.add(name)
+                precomputed[name] = entry["raw"]
+                outputs.append((name, f"{entry['agent']}, cached", entry["raw"]))
+
+    result = None
+    crew = None
+    if any(name not in skip for name in pending):
+        crew = build_crew(skip, precomputed, base_crew, output_dir)
+    if crew is not None and crew.tasks:
+        with span("crew_kickoff", "crew") as crew_span:
+            result = crew.kickoff(inputs=inputs)
+            usage = getattr(result, "token_usage", None)
+            if crew_span is not None and usage is not None:
+                # Provider-reported totals; per-call LLM spans are estimates.
+                crew_span.attrs["usage_prompt_tokens"] = usage.prompt_tokens
+                crew_span.attrs["usage_completion_tokens"] = usage.completion_tokens
         from pprint import pprint
 
         pprint(result)
-        # clean_output_to_python_file(result)
-        with open("generated_code.py", "a", encoding="utf-8") as f:
-            for task_result in result.tasks_output:
-                f.write(f"\n# Output from {task_result.name} ({task_result.agent})\n")
-                f.write(task_result.raw)
-                f.write("\n")
+        for task_result in result.tasks_output:
+            outputs.append((task_result.name, task_result.agent, task_result.raw))
+            if task_result.name in keys:
+                key, validation = keys[task_result.name]
+                cache.put(
+                    key,
+                    {
+                        "task": task_result.name,
+                        "agent": task_result.agent,
+                        "raw": task_result.raw,
+                        "database_name": validation["database_name"],
+                        "table_name": validation["table_name"],
+                    },
+                )
+
+    code = {name: raw for name, _, raw in outputs}
+    if fixes is not None and fixes["code"]:
+        code["rules"] = fixes["code"]
+    stored = registered.entry if registered is not None else None
+    if registry_key is not None and stored is None:
+        stored = registry.register(
+            registry_key,
+            code,
+            file_path=file_path,
+            database_name=target[0]["database_name"],
+            table_name=target[0]["table_name"],
+        )
+        if stored is not None:
+            print(f"Transform v{stored['version']} registered in {stored['path']}")
+    if stored is not None:
+        # Only the format steps are registered; the rest is kept for a human.
+        code = {name: raw for name, raw in code.items() if name not in FORMAT_STEPS}
+    if code:
+        with open(
+            os.path.join(output_dir, "generated_code.py"), "w", encoding="utf-8"
+        ) as f:
+            for name, raw in code.items():
+                f.write(f"# Output from {name}\n{raw}\n\n")
+    return result
+
+
+def build_crew(skip=frozenset(), precomputed=None, base_crew=None, output_dir="."):
+    """A crew for the tasks left over, built fresh or copied from base_crew."""
+    from salesanalysisagent.crew import SalesAnalysisAgent, prepare_run
+
+    listen_to_crewai()
+    if base_crew is not None:
+        return prepare_run(base_crew.copy(), skip, precomputed, output_dir)
+    agent = SalesAnalysisAgent()
+    agent.skip_tasks = frozenset(skip)
+    agent.precomputed_outputs = precomputed or {}
+    return agent.crew()
+
+
+def validate_all():
+    """
+    Validate every feed in mapping.json under a directory against its target
+    table without the LLM, write one consolidated diff report and run the crew
+    only for feeds whose schema drifted.
+    """
+    from salesanalysisagent.tools.schema_validator import (
+        discover_feeds,
+        validate_feeds,
+    )
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root = sys.argv[1] if len(sys.argv) > 1 else os.path.join(script_dir, "data")
+    report_path = sys.argv[2] if len(sys.argv) > 2 else "schema_diff_report.json"
+    try:
+        feeds = discover_feeds(root)
+        report = validate_feeds(feeds)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(
+            f"Checked {report['checked']} feeds, {len(report['drifted'])} drifted. "
+            f"Report written to {report_path}"
+        )
+
+        for file_path in report["drifted"]:
+            kickoff(
+                {
+                    "file_path": file_path,
+                    "current_year": str(datetime.now().year),
+                }
+            )
     except Exception as e:
-        print(f"[ERROR] Failed to run the crew: {str(e)}")
+        print(f"[ERROR] Failed to validate feeds: {str(e)}")
         raise e
 
 
+def feed_output_dir(file_path, root):
+    """outputs/<parent dir>-<file stem>, e.g. outputs/schema_change-sales."""
+    parent = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(root, f"{parent}-{stem}")
+
+
+def run_batch():
+    """
+    Run the crew over many feeds in one process: paths or globs from the
+    command line (default: every feed in mapping.json under data/), at most
+    SALES_AGENT_BATCH_CONCURRENCY kickoffs at a time. The crew is built once
+    and copied per feed, each feed writes to its own output directory, and
+    SALES_AGENT_MAX_RPM is split across the concurrent kickoffs.
+    """
+    from salesanalysisagent.tools.dataset_registry import reset_registry
+    from salesanalysisagent.tools.schema_validator import discover_feeds
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    patterns = sys.argv[1:]
+    if patterns:
+        feeds = []
+        for pattern in patterns:
+            feeds.extend(sorted(glob.glob(pattern)) or [pattern])
+    else:
+        feeds = discover_feeds(os.path.join(script_dir, "data"))
+    concurrency = max(1, min(BATCH_CONCURRENCY, len(feeds)))
+
+    tracer = get_tracer()
+    tracer.reset()
+    base_crew = build_crew()
+    if base_crew.max_rpm:
+        base_crew.max_rpm = max(1, base_crew.max_rpm // concurrency)
+
+    failed = []
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {}
+            for file_path in feeds:
+                output_dir = feed_output_dir(file_path, BATCH_OUTPUT_DIR)
+                os.makedirs(output_dir, exist_ok=True)
+                inputs = {
+                    "file_path": file_path,
+                    "current_year": str(datetime.now().year),
+                }
+                future = pool.submit(_batch_kickoff, inputs, base_crew, output_dir)
+                futures[future] = file_path
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    print(f"[OK] {futures[future]}")
+                except Exception as e:
+                    failed.append(futures[future])
+                    print(f"[ERROR] {futures[future]}: {str(e)}")
+    finally:
+        reset_registry()
+        if TRACING_ENABLED:
+            stem = tracer.export("batch")
+            print(tracer.format_summary())
+            print(f"Trace written to {stem}.jsonl and {stem}.trace.json")
+    print(f"Ran {len(feeds)} feeds, {len(failed)} failed.")
+    return failed
+
+
+def _batch_kickoff(inputs, base_crew, output_dir):
+    with span("kickoff", "crew", file_path=inputs["file_path"]):
+        return _kickoff(inputs, base_crew, output_dir)
+
+
 def train():
     """
     Train the crew agents for few-shot fine-tuning.
@@ -55,8 +446,11 @@ def train():
         ),  # Replace with actual data file path
         "current_year": str(datetime.now().year),
     }
+    if len(sys.argv) < 3 or not sys.argv[1].isdigit():
+        print("Usage: train <n_iterations> <filename>")
+        return
     try:
-        SalesAnalysisAgent().crew().train(
+        build_crew().train(
             n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs
         )
     except Exception as e:
@@ -67,8 +461,11 @@ def replay():
     """
     Replay a specific task within the crew execution.
     """
+    if len(sys.argv) < 2:
+        print("Usage: replay <task_id>")
+        return
     try:
-        SalesAnalysisAgent().crew().replay(task_id=sys.argv[1])
+        build_crew().replay(task_id=sys.argv[1])
     except Exception as e:
         print(f"[ERROR] Failed to replay the task: {str(e)}")
 
@@ -84,8 +481,11 @@ def test():
         ),  # Replace with actual data file path
         "current_year": str(datetime.now().year),
     }
+    if len(sys.argv) < 3 or not sys.argv[1].isdigit():
+        print("Usage: test <n_iterations> <openai_model_name>")
+        return
     try:
-        SalesAnalysisAgent().crew().test(
+        build_crew().test(
             n_iterations=int(sys.argv[1]), openai_model_name=sys.argv[2], inputs=inputs
         )
     except Exception as e:
@@ -122,10 +522,13 @@ def clean_output_to_python_file(result, output_file_path="generated_code.py"):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python main.py [run|train|replay|test]")
+        print("Usage: python main.py [run|train|replay|test|validate_all|run_batch]")
         sys.exit(1)
 
     command = sys.argv[1].lower()
+    # The commands read their arguments from sys.argv[1:], as they do when
+    # started through the project's scripts (run_batch, validate_all, ...).
+    del sys.argv[1]
 
     if command == "run":
         run()
@@ -135,6 +538,10 @@ if __name__ == "__main__":
         replay()
     elif command == "test":
         test()
+    elif command == "validate_all":
+        validate_all()
+    elif command == "run_batch":
+        run_batch()
     else:
         print(f"Unknown command: {command}")
-        print("Valid commands: run, train, replay, test")
+        print("Valid commands: run, train, replay, test, validate_all, run_batch")
@@ -1,12 +1,37 @@
 import pandas as pd
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Iterator, Type
 from crewai.tools import BaseTool
 from io import StringIO
 
+from salesanalysisagent.tools.file_reader import DEFAULT_CHUNK_MEMORY_MB, iter_chunks
+from salesanalysisagent.tools.payload import compact_payload, resolve_frame
+from salesanalysisagent.tools.tracing import traced
+
+
+def clean_dataframe(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Parse sales_date and drop incomplete rows."""
+    if "sales_date" in dataframe.columns:
+        dataframe["sales_date"] = pd.to_datetime(
+            dataframe["sales_date"], errors="coerce"
+        )
+
+    return dataframe.dropna()
+
+
+def iter_clean_chunks(
+    file_path: str, max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB
+) -> Iterator[pd.DataFrame]:
+    """Stream a sales file and yield each chunk after cleaning it."""
+    for chunk in iter_chunks(file_path, max_memory_mb=max_memory_mb):
+        yield clean_dataframe(chunk)
+
 
 class CleanValidateToolInput(BaseModel):
-    dataframe_str: str = Field(..., description="CSV string of the mapped sales data.")
+    dataframe_str: str = Field(
+        ...,
+        description="CSV string of the mapped sales data, or a data handle (df:...) from another tool.",
+    )
 
 
 class CleanValidateTool(BaseTool):
@@ -14,19 +39,20 @@ class CleanValidateTool(BaseTool):
     description: str = "Cleans and validates the sales data."
     args_schema: Type[BaseModel] = CleanValidateToolInput
 
+    @traced()
+    @compact_payload
     def _run(self, dataframe_str: str) -> str:
         # Convert the input string back to a DataFrame
         try:
-            dataframe = pd.read_csv(StringIO(dataframe_str))
+            dataframe = resolve_frame(dataframe_str)
+            if dataframe is None:
+                dataframe = pd.read_csv(StringIO(dataframe_str))
+            else:
+                dataframe = dataframe.copy()
         except Exception as e:
             return f"Error reading CSV data: {str(e)}"
 
         # Clean the data
-        if "sales_date" in dataframe.columns:
-            dataframe["sales_date"] = pd.to_datetime(
-                dataframe["sales_date"], errors="coerce"
-            )
-
-        cleaned_df = dataframe.dropna()
+        cleaned_df = clean_dataframe(dataframe)
 
         return cleaned_df
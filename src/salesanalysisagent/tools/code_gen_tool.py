@@ -41,6 +41,9 @@ from pydantic import BaseModel, Field
 import pandas as pd
 from io import StringIO
 
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.tracing import traced
+
 
 class CodeGenToolInput(BaseModel):
     dataframe_str: str = Field(
@@ -55,6 +58,8 @@ class CodeGenTool(BaseTool):
     )
     args_schema: Type[BaseModel] = CodeGenToolInput
 
+    @traced()
+    @compact_payload
     def _run(self, dataframe_str: str) -> str:
         try:
             df = pd.read_csv(StringIO(dataframe_str))
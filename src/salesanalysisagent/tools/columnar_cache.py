@@ -0,0 +1,235 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import pandas as pd
+
+from salesanalysisagent.tools.multipart_reader import read_input, resolve_input_paths
+from salesanalysisagent.tools.tracing import record
+
+# Bump whenever parsing changes so stale conversions are not reused.
+CACHE_VERSION = 4
+CACHE_DIR = os.environ.get(
+    "SALES_AGENT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "salesanalysisagent"),
+)
+CACHE_ENABLED = os.environ.get("SALES_AGENT_COLUMNAR_CACHE", "1") != "0"
+CACHE_MB = float(os.environ.get("SALES_AGENT_COLUMNAR_CACHE_MB", "4096"))
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK = 1 << 20
+_ATTRS_KEY = b"salesanalysisagent.attrs"
+_HASH_MEMO_SIZE = 4096
+_hash_memo = OrderedDict()
+_memo_lock = threading.Lock()
+_evict_lock = threading.Lock()
+# Object columns pyarrow cannot store as one type, e.g. ints then "3A".
+_MIXED_KINDS = {"mixed", "mixed-integer"}
+
+
+def content_hash(file_path: str) -> str:
+    """
+    Hash a file's bytes (blake2b). Results are keyed on path + mtime + size,
+    in memory (the last _HASH_MEMO_SIZE files) and in a small per-path file
+    under CACHE_DIR/hashes, so an unchanged file is only hashed once.
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _memo_lock:
+        digest = _hash_memo.get(memo_key)
+        if digest is not None:
+            _hash_memo.move_to_end(memo_key)
+            return digest
+    ref_path = _hash_ref_path(memo_key[0])
+    stamp = f"{stat.st_mtime_ns} {stat.st_size} "
+    try:
+        with open(ref_path, "r", encoding="utf-8") as f:
+            ref = f.read()
+        if ref.startswith(stamp):
+            digest = ref[len(stamp) :].strip() or None
+    except OSError:
+        pass
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                hasher.update(block)
+        digest = hasher.hexdigest()
+        try:
+            _write_text(ref_path, stamp + digest)
+        except OSError as e:
+            logger.warning("Could not record the hash of %s: %s", file_path, e)
+    with _memo_lock:
+        _hash_memo[memo_key] = digest
+        if len(_hash_memo) > _HASH_MEMO_SIZE:
+            _hash_memo.popitem(last=False)
+    return digest
+
+
+def _hash_ref_path(abs_path: str) -> str:
+    name = hashlib.blake2b(abs_path.encode(), digest_size=20).hexdigest()
+    return os.path.join(CACHE_DIR, "hashes", name[:2], name)
+
+
+def _write_text(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def cache_key(file_path: str, **read_kwargs) -> str:
+    """Content address of an input (every part, in order) plus its read options."""
+    paths = resolve_input_paths(file_path)
+    if not paths:
+        raise FileNotFoundError(f"The file at {file_path} does not exist.")
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(f"v{CACHE_VERSION}".encode())
+    hasher.update(repr(sorted((k, repr(v)) for k, v in read_kwargs.items())).encode())
+    for path in paths:
+        hasher.update(content_hash(path).encode())
+    return hasher.hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, "columnar", f"{key}.arrow")
+
+
+def arrow_compatible(df: pd.DataFrame, all_objects: bool = False) -> pd.DataFrame:
+    """
+    df with mixed-type object columns (every object column with all_objects)
+    cast to strings (nulls kept), so the feeds whose values drift can still
+    be stored as Arrow.
+    """
+    mixed = [
+        col
+        for col in df.columns
+        if df[col].dtype == object
+        and (
+            all_objects
+            or pd.api.types.infer_dtype(df[col], skipna=True) in _MIXED_KINDS
+        )
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for col in mixed:
+        df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def load_columnar(
+    file_path: str, loader: Callable[..., pd.DataFrame] = read_input, **read_kwargs
+) -> pd.DataFrame:
+    """
+    Return file_path as a DataFrame, memory-mapping its Arrow IPC conversion
+    when one exists and creating it after the first text parse otherwise.
+    Mixed-type object columns come back as strings either way. Files are
+    touched on every hit and the least recently used ones are removed once
+    the cache grows past SALES_AGENT_COLUMNAR_CACHE_MB. Falls back to plain
+    parsing when pyarrow is unavailable.
+    """
+    if not CACHE_ENABLED:
+        return loader(file_path, **read_kwargs)
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return loader(file_path, **read_kwargs)
+
+    path = cache_path(cache_key(file_path, **read_kwargs))
+    if os.path.exists(path):
+        try:
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas()
+            attrs = (table.schema.metadata or {}).get(_ATTRS_KEY)
+            if attrs:
+                df.attrs.update(json.loads(attrs))
+            record(rows=len(df), bytes=os.path.getsize(path))
+            os.utime(path)
+            return df
+        except Exception as e:
+            logger.warning("Ignoring unreadable columnar cache %s: %s", path, e)
+
+    df = arrow_compatible(loader(file_path, **read_kwargs))
+    try:
+        try:
+            _write_arrow(df, path)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            # Values no one Arrow type holds, e.g. Decimals of very different
+            # scales or ints past 64 bits.
+            df = arrow_compatible(df, all_objects=True)
+            _write_arrow(df, path)
+    except Exception as e:
+        logger.warning("Skipping columnar cache for %s: %s", file_path, e)
+    else:
+        evict(keep=path)
+    return df
+
+
+def evict(max_bytes: float = CACHE_MB * 1024 * 1024, keep: Optional[str] = None):
+    """Remove the least recently used conversions until the cache fits max_bytes."""
+    directory = os.path.join(CACHE_DIR, "columnar")
+    with _evict_lock:
+        entries = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith(".arrow"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _write_arrow(df: pd.DataFrame, path: str):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if df.attrs:
+        # Keep frame metadata such as the dtype plan alongside the data.
+        metadata = dict(table.schema.metadata or {})
+        metadata[_ATTRS_KEY] = json.dumps(df.attrs, default=str).encode()
+        table = table.replace_schema_metadata(metadata)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write next to the target and rename so concurrent runs never read a
+    # half-written file.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
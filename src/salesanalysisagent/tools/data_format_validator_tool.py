@@ -0,0 +1,60 @@
+from pprint import pprint
+from typing import Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, ConfigDict, Field
+
+from salesanalysisagent.tools.data_format_validator import (
+    detect_format_changes,
+    get_target_info,
+)
+from salesanalysisagent.tools.format_rules import plan_format_fixes
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.shape_profiler import raw_sample
+from salesanalysisagent.tools.tracing import traced
+
+
+class FormatChangeDetectorInput(BaseModel):
+    file_path: str = Field(..., description="Path to the new CSV file")
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class FormatChangeDetectorTool(BaseTool):
+    name: str = "data_format_validator"
+    description: str = (
+        "Detects semantic data format changes between source CSV and target table and suggests a Pandas function to align data"
+    )
+    args_schema: Type[BaseModel] = FormatChangeDetectorInput
+
+    @traced()
+    @compact_payload
+    def _run(self, file_path: str, **kwargs) -> str:
+        try:
+            detected = detect_format_changes(file_path)
+            format_profile = detected["format_profile"]
+            # Raw text samples so the LLM sees the original layouts.
+            source_sample = raw_sample(file_path)
+            target_sample = raw_sample(detected["target_path"])
+            fixes = plan_format_fixes(
+                file_path, format_profile, detected["table_name"]
+            )
+
+            pprint(source_sample)
+            pprint(target_sample)
+            return {
+                "source_sample_data": source_sample,
+                "target_sampple_data": target_sample,
+                "format_profile": format_profile,
+                "drifted_columns": fixes["drifted"],
+                "rule_based_fixes": fixes["transforms"],
+                "uncovered_columns": fixes["uncovered"],
+                "database_name": detected["database_name"],
+                "table_name": detected["table_name"],
+                "target_database_type": "mysql",
+            }
+
+        except Exception as e:
+            return f"Error comparing data formats: {str(e)}"
+
+    def get_target_info(self, file_name, json_file_path="mapping.json"):
+        return get_target_info(file_name, json_file_path)
@@ -4,9 +4,34 @@ from pydantic import BaseModel, Field
 import os
 import pandas as pd
 
+from salesanalysisagent.tools.file_reader import (
+    DEFAULT_CHUNK_MEMORY_MB,
+    detect_format,
+    iter_chunks,
+)
+from salesanalysisagent.tools.multipart_reader import (
+    is_multipart,
+    iter_part_chunks,
+    resolve_input_paths,
+)
+from salesanalysisagent.tools.dataset_registry import load_dataframe
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.tracing import traced
+
 
 class DataLoaderToolInput(BaseModel):
-    file_path: str = Field(..., description="Path to the sales data file.")
+    file_path: str = Field(
+        ...,
+        description="Path to the sales data file, or a directory / glob of part files.",
+    )
+    stream: bool = Field(
+        False,
+        description="Read the file in bounded-size chunks instead of loading it whole.",
+    )
+    max_chunk_memory_mb: float = Field(
+        DEFAULT_CHUNK_MEMORY_MB,
+        description="Memory ceiling for a single chunk when streaming.",
+    )
 
 
 class DataLoaderTool(BaseTool):
@@ -20,10 +45,25 @@ class DataLoaderTool(BaseTool):
     )
     args_schema: Type[BaseModel] = DataLoaderToolInput
 
-    def _run(self, file_path: str) -> pd.DataFrame:
+    @traced()
+    @compact_payload
+    def _run(
+        self,
+        file_path: str,
+        stream: bool = False,
+        max_chunk_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB,
+    ) -> pd.DataFrame:
+        if is_multipart(file_path):
+            return self._load_parts(file_path, stream, max_chunk_memory_mb)
+
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"The file at {file_path} does not exist.")
 
+        if stream:
+            return self._stream_summary(
+                file_path, iter_chunks(file_path, max_memory_mb=max_chunk_memory_mb)
+            )
+
         # if not file_path.lower().endswith((".csv", ".txt")):
         #     raise ValueError(f"Only .csv or .txt files are supported.")
 
@@ -37,14 +77,15 @@ class DataLoaderTool(BaseTool):
 
         # return df
         ext = os.path.splitext(file_path)[1].lower()
+        file_format = detect_format(file_path)
         try:
-            if ext == ".csv":
-                df = pd.read_csv(file_path)
+            if file_format == "csv":
+                df = load_dataframe(file_path)
                 return {"format": "csv", "dataframe": df}
-            elif ext == ".parquet":
-                df = pd.read_parquet(file_path)
+            elif file_format == "parquet":
+                df = load_dataframe(file_path)
                 return {"format": "parquet", "dataframe": df}
-            elif ext in [".xls", ".xlsx"]:
+            elif file_format == "excel":
                 xls = pd.ExcelFile(file_path)
                 sheet_data = {sheet: xls.parse(sheet) for sheet in xls.sheet_names}
                 return {
@@ -56,3 +97,60 @@ class DataLoaderTool(BaseTool):
                 return {"error": f"Unsupported file type: {ext}"}
         except Exception as e:
             return {"error": f"Failed to read file: {str(e)}"}
+
+    def _load_parts(
+        self, file_path: str, stream: bool, max_chunk_memory_mb: float
+    ) -> dict:
+        paths = resolve_input_paths(file_path)
+        if not paths:
+            raise FileNotFoundError(f"No data files found for {file_path}.")
+
+        if stream:
+            summary = self._stream_summary(
+                paths[0],
+                iter_part_chunks(paths, max_memory_mb=max_chunk_memory_mb),
+            )
+            summary["parts"] = len(paths)
+            return summary
+
+        try:
+            df = load_dataframe(file_path)
+        except Exception as e:
+            return {"error": f"Failed to read part files: {str(e)}"}
+        return {"format": detect_format(paths[0]), "parts": len(paths), "dataframe": df}
+
+    def _stream_summary(self, file_path: str, chunk_iter) -> dict:
+        file_format = detect_format(file_path)
+        if file_format is None:
+            ext = os.path.splitext(file_path)[1].lower()
+            return {"error": f"Unsupported file type: {ext}"}
+
+        chunks = 0
+        rows = 0
+        sheets = {}
+        preview = None
+        columns = None
+        try:
+            for chunk in chunk_iter:
+                chunks += 1
+                rows += len(chunk)
+                if "sheet_name" in chunk.attrs:
+                    sheet = chunk.attrs["sheet_name"]
+                    sheets[sheet] = sheets.get(sheet, 0) + len(chunk)
+                if preview is None:
+                    preview = chunk.head()
+                    columns = list(chunk.columns)
+        except Exception as e:
+            return {"error": f"Failed to read file: {str(e)}"}
+
+        summary = {
+            "format": file_format,
+            "streamed": True,
+            "chunks": chunks,
+            "rows": rows,
+            "columns": columns,
+            "preview": preview,
+        }
+        if sheets:
+            summary["sheets"] = sheets
+        return summary
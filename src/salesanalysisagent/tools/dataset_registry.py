@@ -0,0 +1,172 @@
+import itertools
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import pandas as pd
+
+from salesanalysisagent.tools.columnar_cache import load_columnar
+from salesanalysisagent.tools.dtype_optimizer import optimize_dtypes
+from salesanalysisagent.tools.multipart_reader import read_input, resolve_input_paths
+
+DEFAULT_MAX_MB = int(os.environ.get("SALES_AGENT_REGISTRY_MB", "1024"))
+OPTIMIZE_DTYPES = os.environ.get("SALES_AGENT_OPTIMIZE_DTYPES", "1") != "0"
+# Keyword arguments read_input accepts; anything else fails before a parse.
+READ_OPTIONS = ("max_workers",)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def check_read_options(read_kwargs: dict):
+    unknown = sorted(set(read_kwargs) - set(READ_OPTIONS))
+    if unknown:
+        raise TypeError(
+            f"Unsupported read options {', '.join(unknown)}; "
+            f"read_input accepts {', '.join(READ_OPTIONS)}."
+        )
+
+
+class DatasetRegistry:
+    """
+    Run-scoped cache of parsed input frames so every tool in one crew kickoff
+    shares a single parse of each file.
+
+    Entries are keyed by absolute path + mtime + size of every file behind the
+    input (so an edited file is re-read) and evicted least-recently-used once
+    the cached frames exceed max_bytes. Cached frames are shared between
+    tools: callers must copy before mutating.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}
+        # Never reset, so a stale handle can't resolve to a newer frame.
+        self._handles = itertools.count(1)
+
+    def key_for(self, file_path: str, **read_kwargs) -> tuple:
+        paths = resolve_input_paths(file_path)
+        if not paths:
+            raise FileNotFoundError(f"The file at {file_path} does not exist.")
+        stats = []
+        for path in paths:
+            stat = os.stat(path)
+            stats.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+        options = tuple(sorted((k, repr(v)) for k, v in read_kwargs.items()))
+        return (os.path.abspath(file_path), tuple(stats), options)
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: tuple, df: pd.DataFrame):
+        nbytes = frame_nbytes(df)
+        with self._lock:
+            if key in self._frames:
+                self.current_bytes -= self._frames.pop(key)[1]
+            if nbytes > self.max_bytes:
+                # Too big to keep; the caller still gets the frame.
+                return
+            self._frames[key] = (df, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                evicted_key, (_, evicted) = self._frames.popitem(last=False)
+                self.current_bytes -= evicted
+                self._loading.pop(evicted_key, None)
+
+    def get_or_load(
+        self,
+        file_path: str,
+        loader: Optional[Callable[..., pd.DataFrame]] = None,
+        **read_kwargs,
+    ) -> pd.DataFrame:
+        """
+        Return the parsed frame for file_path, parsing it with loader
+        (default: read_input) only on the first request.
+        """
+        if loader is None:
+            check_read_options(read_kwargs)
+        key = self.key_for(file_path, **read_kwargs)
+        df = self.get(key)
+        if df is not None:
+            self.hits += 1
+            return df
+
+        # One parse per key even when tools ask concurrently; the key's lock
+        # lives until its frame is evicted.
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            df = self.get(key)
+            if df is not None:
+                self.hits += 1
+                return df
+            self.misses += 1
+            df = (loader or read_input)(file_path, **read_kwargs)
+            self.put(key, df)
+        return df
+
+    def register(self, df: pd.DataFrame) -> str:
+        """
+        Keep an in-memory frame (e.g. a tool result) and return a handle the
+        LLM can pass back to tools instead of the data itself.
+        """
+        with self._lock:
+            handle = f"df:{next(self._handles):x}"
+        self.put(("handle", handle), df)
+        return handle
+
+    def resolve(self, handle: str) -> Optional[pd.DataFrame]:
+        return self.get(("handle", handle))
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._loading.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+def _parse(file_path: str, **read_kwargs) -> pd.DataFrame:
+    df = read_input(file_path, **read_kwargs)
+    if OPTIMIZE_DTYPES:
+        df, _ = optimize_dtypes(df)
+    return df
+
+
+def _load(file_path: str, **read_kwargs) -> pd.DataFrame:
+    return load_columnar(file_path, loader=_parse, **read_kwargs)
+
+
+_registry = DatasetRegistry()
+
+
+def get_registry() -> DatasetRegistry:
+    return _registry
+
+
+def load_dataframe(file_path: str, **read_kwargs) -> pd.DataFrame:
+    """
+    Parse file_path once per run and return the shared frame. The first parse
+    goes through the columnar cache, so later runs skip text parsing too, and
+    through the dtype optimizer (plan in df.attrs["dtype_plan"]).
+    """
+    check_read_options(read_kwargs)
+    return _registry.get_or_load(file_path, loader=_load, **read_kwargs)
+
+
+def reset_registry():
+    """Drop every cached frame; called at the end of each crew kickoff."""
+    _registry.clear()
@@ -0,0 +1,236 @@
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+DEFAULT_HOST = os.environ.get("SALES_AGENT_DB_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("SALES_AGENT_DB_PORT", "3306"))
+# No built-in credentials: unset means the driver's own defaults (option
+# files, unix socket auth) apply.
+DEFAULT_USER = os.environ.get("SALES_AGENT_DB_USER")
+DEFAULT_PASSWORD = os.environ.get("SALES_AGENT_DB_PASSWORD")
+DEFAULT_POOL_SIZE = int(os.environ.get("SALES_AGENT_DB_POOL_SIZE", "5"))
+HEALTH_CHECK_INTERVAL = float(os.environ.get("SALES_AGENT_DB_HEALTH_CHECK_S", "30"))
+
+# Per-database routing, e.g.
+#   {"pos_data": {"host": "10.0.0.5", "user": "etl"},
+#    "staging": {"backend": "sqlite", "path": "/tmp/staging.db"}}
+ROUTES = json.loads(os.environ.get("SALES_AGENT_DB_ROUTES", "{}"))
+
+
+def ping(connection) -> bool:
+    """Return True when the connection can still run a query."""
+    try:
+        if hasattr(connection, "is_connected"):
+            return connection.is_connected()
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable DB-API connections.
+
+    Idle connections are handed out most-recently-used first and are pinged
+    before reuse when they have been idle longer than health_check_interval.
+    Every connection is rolled back on release, so no borrower inherits an
+    open transaction (or its REPEATABLE READ snapshot) from the one before.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        max_size: int = DEFAULT_POOL_SIZE,
+        health_check: Callable[[object], bool] = ping,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL,
+    ):
+        self.factory = factory
+        self.max_size = max_size
+        self.health_check = health_check
+        self.health_check_interval = health_check_interval
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.created = 0
+
+    def acquire(self, timeout: Optional[float] = None):
+        if not self._slots.acquire(timeout=timeout if timeout is not None else -1):
+            raise TimeoutError(
+                f"No database connection available within {timeout}s "
+                f"(pool size {self.max_size})."
+            )
+        try:
+            while True:
+                try:
+                    connection, last_used = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                idle_for = time.monotonic() - last_used
+                if idle_for < self.health_check_interval or self.health_check(
+                    connection
+                ):
+                    return connection
+                self._close(connection)
+            connection = self.factory()
+            self.created += 1
+            return connection
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, connection, discard: bool = False):
+        """Return a connection; uncommitted work is rolled back, not kept."""
+        try:
+            if not discard:
+                try:
+                    connection.rollback()
+                except Exception:
+                    discard = True
+            if discard:
+                self._close(connection)
+            else:
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection; uncommitted work is rolled back on return."""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close_all(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def mysql_factory(host, port, user, password, database, **connect_kwargs):
+    def connect():
+        import mysql.connector
+
+        credentials = {"user": user, "password": password}
+        return mysql.connector.connect(
+            host=host,
+            port=port,
+            database=database,
+            **{key: value for key, value in credentials.items() if value is not None},
+            **connect_kwargs,
+        )
+
+    return connect
+
+
+def sqlite_factory(path):
+    def connect():
+        import sqlite3
+
+        return sqlite3.connect(path, check_same_thread=False)
+
+    return connect
+
+
+def route_for(database_name: str, **overrides) -> dict:
+    """Connection settings for database_name: defaults < ROUTES < overrides."""
+    route = {
+        "backend": "mysql",
+        "host": DEFAULT_HOST,
+        "port": DEFAULT_PORT,
+        "user": DEFAULT_USER,
+        "password": DEFAULT_PASSWORD,
+        "database": database_name,
+    }
+    route.update(ROUTES.get(database_name, {}))
+    route.update({key: value for key, value in overrides.items() if value is not None})
+    return route
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def server_key(database_name: str) -> tuple:
+    """
+    Identify the server behind database_name, so callers can batch work for
+    databases that share one (registered pools are their own server).
+    """
+    with _pools_lock:
+        if database_name in _pools and database_name not in ROUTES:
+            return ("pool", database_name)
+    route = route_for(database_name)
+    return tuple(
+        sorted(
+            (k, str(v)) for k, v in route.items() if k not in ("database", "password")
+        )
+    )
+
+
+def _pool_key(route: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in route.items() if k != "password"))
+
+
+def register_pool(database_name: str, pool: ConnectionPool):
+    """Route database_name to a caller-built pool (e.g. a SQLite stand-in)."""
+    with _pools_lock:
+        _pools[database_name] = pool
+
+
+def get_pool(database_name: str, **overrides) -> ConnectionPool:
+    """
+    Return the shared pool for database_name, creating it on first use.
+    Keyword overrides (host, user, password, port, ...) select a separate pool.
+    """
+    overrides = {key: value for key, value in overrides.items() if value is not None}
+    with _pools_lock:
+        if not overrides and database_name in _pools:
+            return _pools[database_name]
+
+        route = route_for(database_name, **overrides)
+        key = database_name if not overrides else _pool_key(route)
+        pool = _pools.get(key)
+        if pool is None:
+            backend = route.pop("backend")
+            max_size = int(route.pop("pool_size", DEFAULT_POOL_SIZE))
+            if backend == "sqlite":
+                factory = sqlite_factory(route["path"])
+            else:
+                factory = mysql_factory(**route)
+            pool = ConnectionPool(factory, max_size=max_size)
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def get_connection(database_name: str, timeout: Optional[float] = None, **overrides):
+    """Borrow a pooled connection to database_name."""
+    with get_pool(database_name, **overrides).connection(timeout) as connection:
+        yield connection
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close_all()
+        _pools.clear()
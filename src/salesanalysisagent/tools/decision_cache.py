@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from salesanalysisagent.tools.columnar_cache import CACHE_DIR
+from salesanalysisagent.tools.shape_profiler import relaxed_shape
+
+DECISION_CACHE_MB = float(os.environ.get("SALES_AGENT_DECISION_CACHE_MB", "64"))
+DECISION_CACHE_ENABLED = os.environ.get("SALES_AGENT_DECISION_CACHE", "1") != "0"
+
+# Bump when prompts or task wiring change so older answers are not replayed.
+DECISION_VERSION = 3
+
+
+def canonical_json(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def shape_fingerprint(format_profile: dict) -> dict:
+    """
+    Column -> sorted source and target shape sets (counts left out on purpose,
+    number magnitudes too, see relaxed_shape).
+    """
+    return {
+        col: {
+            side: sorted({relaxed_shape(shape) for shape in report[side]})
+            for side in ("source", "target")
+        }
+        for col, report in format_profile.items()
+    }
+
+
+def fingerprint(
+    task_name: str, schema_diff: dict, shapes: Optional[dict], table_version: str
+) -> str:
+    """Cache key of one task's answer for a given drift and target table version."""
+    payload = canonical_json(
+        {
+            "version": DECISION_VERSION,
+            "task": task_name,
+            "schema_difference": schema_diff,
+            "shapes": shapes,
+            "table_version": table_version,
+        }
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DecisionCache:
+    """
+    Task outputs (generated code / SQL) on disk, one JSON file per fingerprint.
+
+    Files are touched on every hit, and the least recently used ones are
+    removed once the directory grows past max_bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str = os.path.join(CACHE_DIR, "decisions"),
+        max_bytes: int = int(DECISION_CACHE_MB * 1024 * 1024),
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        entry = dict(entry, created=time.time())
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+    def invalidate_table(self, database_name: str, table_name: Optional[str] = None):
+        """Drop every decision made against a table (or a whole database)."""
+        if not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if entry.get("database_name") == database_name and table_name in (
+                    None,
+                    entry.get("table_name"),
+                ):
+                    os.remove(path)
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            for _, _, path in self._entries():
+                os.remove(path)
+
+
+_decision_cache = DecisionCache()
+
+
+def get_decision_cache() -> DecisionCache:
+    return _decision_cache
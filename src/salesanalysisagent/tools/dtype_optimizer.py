@@ -0,0 +1,164 @@
+import re
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_ROWS = 10_000
+CATEGORY_MAX_RATIO = 0.5
+CATEGORY_MIN_ROWS = 100
+
+# Tried in order: ISO layouts, then month-first, then day-first. Every value
+# has to parse, so a feed with any day above 12 still falls through to its
+# day-first layout; an all-ambiguous sample is read month-first.
+DATE_FORMATS = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%Y%m%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m-%d-%Y",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d-%m-%Y",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+)
+
+# Integer columns named like keys keep int64: a downcast product_id would
+# wrap on arithmetic and stop matching wider ids from other feeds.
+_IDENTIFIER = re.compile(r"(?i:(?:^|[_\s-])(?:id|key|code|no|number))$|[a-z0-9]I[dD]$")
+
+
+def is_identifier(name) -> bool:
+    """True for id, product_id, store_key, productId and the like."""
+    return bool(_IDENTIFIER.search(str(name)))
+
+
+def _non_empty_strings(values: pd.Series) -> pd.Series:
+    values = values.dropna().astype(str).str.strip()
+    return values[values != ""]
+
+
+def infer_date_format(values: pd.Series) -> Optional[str]:
+    """
+    Return the first format in DATE_FORMATS that parses every non-empty value,
+    or None when the values are not dates.
+    """
+    values = _non_empty_strings(values)
+    if values.empty:
+        return None
+    # Cheap rejection before trying formats: dates contain digits and no letters.
+    if not values.str.contains(r"\d", regex=True).all():
+        return None
+    if values.str.contains(r"[A-SU-Za-z]", regex=True).any():
+        return None
+
+    for fmt in DATE_FORMATS:
+        parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+        if parsed.notna().all():
+            return fmt
+    return None
+
+
+def _sample(series: pd.Series, sample_rows: int) -> pd.Series:
+    if len(series) <= sample_rows:
+        return series
+    return series.sample(n=sample_rows, random_state=0)
+
+
+def _plan_column(series: pd.Series, sample_rows: int) -> Optional[dict]:
+    if pd.api.types.is_bool_dtype(series):
+        return None
+
+    if pd.api.types.is_integer_dtype(series):
+        if is_identifier(series.name):
+            return None
+        downcast = pd.to_numeric(series, downcast="integer")
+        if downcast.dtype != series.dtype:
+            return {"dtype": downcast.dtype.name}
+        return None
+
+    if pd.api.types.is_float_dtype(series):
+        as_float32 = series.astype("float32")
+        lossless = (as_float32.astype(series.dtype) == series) | series.isna()
+        if series.dtype != np.float32 and lossless.all():
+            return {"dtype": "float32"}
+        return None
+
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        fmt = infer_date_format(_sample(series, sample_rows))
+        if fmt is not None:
+            return {"dtype": "datetime64[ns]", "format": fmt}
+
+        non_null = series.count()
+        if non_null >= CATEGORY_MIN_ROWS:
+            if series.nunique() / non_null <= CATEGORY_MAX_RATIO:
+                return {"dtype": "category"}
+    return None
+
+
+def plan_dtypes(df: pd.DataFrame, sample_rows: int = SAMPLE_ROWS) -> dict:
+    """
+    Choose compact dtypes for a frame.
+
+    Numeric bounds are checked over the full column, and identifier-like
+    integer columns (product_id, store_key, ...) are left alone; date
+    detection runs on a sample of up to sample_rows values and is validated
+    on the full column by apply_dtype_plan.
+
+    Returns:
+        plan (dict): Column name -> {"dtype": ..., "format": ...} for the
+        columns that can shrink.
+    """
+    plan = {}
+    for col in df.columns:
+        entry = _plan_column(df[col], sample_rows)
+        if entry is not None:
+            plan[col] = entry
+    return plan
+
+
+def apply_dtype_plan(df: pd.DataFrame, plan: dict) -> Tuple[pd.DataFrame, dict]:
+    """
+    Apply a dtype plan, skipping date columns that do not parse over the full
+    column.
+
+    Returns:
+        df (pd.DataFrame): The converted frame.
+        applied (dict): The subset of the plan that was applied.
+    """
+    converted = {}
+    applied = {}
+    for col, entry in plan.items():
+        series = df[col]
+        dtype = entry["dtype"]
+        if dtype.startswith("datetime64"):
+            parsed = pd.to_datetime(series, format=entry["format"], errors="coerce")
+            if (parsed.isna() & series.notna()).any():
+                continue
+            converted[col] = parsed
+        elif dtype.startswith(("int", "uint")):
+            converted[col] = pd.to_numeric(series, downcast="integer")
+        else:
+            converted[col] = series.astype(dtype)
+        applied[col] = entry
+
+    if converted:
+        df = pd.DataFrame(
+            {col: converted.get(col, df[col]) for col in df.columns}, copy=False
+        )
+    return df, applied
+
+
+def optimize_dtypes(
+    df: pd.DataFrame, sample_rows: int = SAMPLE_ROWS
+) -> Tuple[pd.DataFrame, dict]:
+    """Plan and apply compact dtypes; the applied plan is kept in df.attrs["dtype_plan"]."""
+    df, applied = apply_dtype_plan(df, plan_dtypes(df, sample_rows))
+    df.attrs["dtype_plan"] = applied
+    return df, applied
+
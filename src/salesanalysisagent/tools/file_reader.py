@@ -0,0 +1,193 @@
+import os
+from typing import Iterator, Optional, Union
+
+import pandas as pd
+
+from salesanalysisagent.tools.sniffer import read_csv_kwargs
+from salesanalysisagent.tools.tracing import record, span
+
+CSV_EXTENSIONS = (".csv", ".txt")
+PARQUET_EXTENSIONS = (".parquet",)
+EXCEL_EXTENSIONS = (".xls", ".xlsx")
+
+DEFAULT_CHUNK_MEMORY_MB = 64
+SAMPLE_ROWS = 1000
+
+
+def detect_format(file_path: str) -> Optional[str]:
+    """Return "csv", "parquet" or "excel" based on the file extension, or None."""
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in CSV_EXTENSIONS:
+        return "csv"
+    if ext in PARQUET_EXTENSIONS:
+        return "parquet"
+    if ext in EXCEL_EXTENSIONS:
+        return "excel"
+    return None
+
+
+def read_file(file_path: str, **read_kwargs) -> pd.DataFrame:
+    """
+    Read a whole CSV/TXT, Parquet or Excel file into one DataFrame.
+    Excel files return their first sheet; files without a known extension
+    are read as CSV.
+    """
+    file_format = detect_format(file_path)
+    with span("read_file", "io", path=file_path, format=file_format or "csv"):
+        if file_format == "parquet":
+            df = pd.read_parquet(file_path)
+        elif file_format == "excel":
+            df = pd.read_excel(file_path)
+        else:
+            df = pd.read_csv(file_path, **read_csv_kwargs(file_path, **read_kwargs))
+        record(rows=len(df), bytes=os.path.getsize(file_path))
+    return df
+
+
+def estimate_rows_per_chunk(sample: pd.DataFrame, max_memory_mb: float) -> int:
+    """
+    Estimate how many rows fit into max_memory_mb based on the in-memory
+    size of a sample frame (object columns are measured deeply).
+    """
+    if sample.empty:
+        return SAMPLE_ROWS
+    bytes_per_row = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    return max(1, int(max_memory_mb * 1024 * 1024 // max(bytes_per_row, 1)))
+
+
+def iter_chunks(
+    file_path: str,
+    max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB,
+    sheet_name: Optional[Union[str, int]] = None,
+    **read_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV/TXT, Parquet or Excel file as DataFrame chunks whose
+    in-memory size stays around max_memory_mb.
+
+    Args:
+        file_path (str): Path to the data file.
+        max_memory_mb (float): Memory ceiling for a single chunk.
+        sheet_name (str | int): Excel sheet name or position to stream
+            (default: every sheet in order).
+        **read_kwargs: Extra options passed to pd.read_csv for text files,
+            on top of the sniffed dialect.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of the file. Excel chunks carry the
+        sheet they came from in chunk.attrs["sheet_name"].
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file at {file_path} does not exist.")
+
+    file_format = detect_format(file_path)
+    if file_format == "parquet":
+        chunks = _iter_parquet_chunks(file_path, max_memory_mb)
+    elif file_format == "excel":
+        chunks = _iter_excel_chunks(file_path, max_memory_mb, sheet_name)
+    else:
+        # Same as read_file: anything that is not Parquet/Excel is text.
+        chunks = _iter_csv_chunks(file_path, max_memory_mb, **read_kwargs)
+    # No span here: a generator outlives its caller's stack frame, so rows and
+    # bytes are credited to whichever span is consuming the stream.
+    record(bytes=os.path.getsize(file_path))
+    try:
+        for chunk in chunks:
+            record(rows=len(chunk))
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def _iter_csv_chunks(file_path, max_memory_mb, **read_kwargs):
+    read_kwargs = read_csv_kwargs(file_path, **read_kwargs)
+    sample = pd.read_csv(file_path, nrows=SAMPLE_ROWS, **read_kwargs)
+    rows_per_chunk = estimate_rows_per_chunk(sample, max_memory_mb)
+    del sample
+
+    with pd.read_csv(file_path, chunksize=rows_per_chunk, **read_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def _iter_parquet_chunks(file_path, max_memory_mb):
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    if metadata.num_rows == 0:
+        return
+
+    # Row group sizes are uncompressed Arrow sizes; string columns grow when
+    # converted to Python objects, so the smaller of the metadata estimate
+    # and a measured sample batch wins.
+    total_bytes = sum(
+        metadata.row_group(i).total_byte_size for i in range(metadata.num_row_groups)
+    )
+    rows_per_chunk = max(
+        1, int(max_memory_mb * 1024 * 1024 * metadata.num_rows // max(total_bytes, 1))
+    )
+    first = next(parquet_file.iter_batches(batch_size=SAMPLE_ROWS)).to_pandas()
+    rows_per_chunk = min(rows_per_chunk, estimate_rows_per_chunk(first, max_memory_mb))
+    del first
+
+    for batch in parquet_file.iter_batches(batch_size=rows_per_chunk):
+        yield batch.to_pandas()
+
+
+def _select_sheets(sheet_names, sheet_name):
+    if sheet_name is None:
+        return sheet_names
+    if isinstance(sheet_name, int):
+        return [sheet_names[sheet_name]]
+    return [sheet_name]
+
+
+def _iter_excel_chunks(file_path, max_memory_mb, sheet_name=None):
+    if os.path.splitext(file_path)[1].lower() == ".xls":
+        # xlrd has no streaming reader, so legacy workbooks are parsed per
+        # sheet and only the slicing is bounded.
+        xls = pd.ExcelFile(file_path)
+        sheets = _select_sheets(xls.sheet_names, sheet_name)
+        for sheet in sheets:
+            df = xls.parse(sheet)
+            rows_per_chunk = estimate_rows_per_chunk(
+                df.head(SAMPLE_ROWS), max_memory_mb
+            )
+            for start in range(0, len(df), rows_per_chunk):
+                chunk = df.iloc[start : start + rows_per_chunk]
+                chunk.attrs["sheet_name"] = sheet
+                yield chunk
+        return
+
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheets = _select_sheets(workbook.sheetnames, sheet_name)
+        for sheet in sheets:
+            rows = workbook[sheet].iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                continue
+            columns = [
+                str(col) if col is not None else f"Unnamed: {i}"
+                for i, col in enumerate(header)
+            ]
+
+            rows_per_chunk = SAMPLE_ROWS
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= rows_per_chunk:
+                    chunk = pd.DataFrame(batch, columns=columns)
+                    chunk.attrs["sheet_name"] = sheet
+                    rows_per_chunk = estimate_rows_per_chunk(chunk, max_memory_mb)
+                    batch = []
+                    yield chunk
+            if batch:
+                chunk = pd.DataFrame(batch, columns=columns)
+                chunk.attrs["sheet_name"] = sheet
+                yield chunk
+    finally:
+        workbook.close()
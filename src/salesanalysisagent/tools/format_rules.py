@@ -0,0 +1,290 @@
+import inspect
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.dtype_optimizer import infer_date_format
+from salesanalysisagent.tools.file_reader import DEFAULT_CHUNK_MEMORY_MB
+from salesanalysisagent.tools.multipart_reader import iter_raw_chunks
+from salesanalysisagent.tools.shape_profiler import (
+    CURRENCY_CODES,
+    NULL_SHAPE,
+    relaxed_shape,
+)
+
+ID_VARCHAR_LENGTH = 64
+
+_SYMBOLS = r"[$€£¥₹]"
+_CODES = "|".join(CURRENCY_CODES)
+_AMOUNT = re.compile(
+    rf"^\s*(?P<prefix>(?:{_SYMBOLS}|(?:{_CODES})\s?)?)"
+    rf"(?P<number>[+-]?\d[\d,]*(?:\.(?P<decimals>\d+))?)"
+    rf"(?P<suffix>(?:\s?(?:{_CODES})|{_SYMBOLS})?)\s*$"
+)
+
+
+# Transform helpers. They only depend on numpy / pandas so their source can be
+# copied verbatim into the generated fix_data_format_change function.
+
+
+def trim_whitespace(series):
+    return series.where(series.isna(), series.astype(str).str.strip())
+
+
+def reformat_currency(series, prefix="", suffix="", decimals=2):
+    numbers = pd.to_numeric(
+        series.astype(str).str.replace(r"[^\d.\-]", "", regex=True), errors="coerce"
+    )
+    if not prefix and not suffix:
+        return numbers.round(decimals)
+    text = np.char.mod(f"%.{decimals}f", numbers.to_numpy(dtype=float))
+    formatted = prefix + pd.Series(text, index=series.index) + suffix
+    return formatted.where(numbers.notna())
+
+
+def relayout_dates(series, source_format, target_format):
+    parsed = pd.to_datetime(
+        series.astype(str).str.strip(), format=source_format, errors="coerce"
+    )
+    return parsed.dt.strftime(target_format)
+
+
+def widen_id(series):
+    return series.where(series.isna(), series.astype(str).str.strip())
+
+
+@dataclass(frozen=True)
+class Transform:
+    """One rule applied to one column, e.g. currency re-layout of "price"."""
+
+    column: str
+    rule: str
+    params: dict = field(default_factory=dict)
+    ddl: Optional[str] = None
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        return RULES[self.rule][1](series, **self.params)
+
+    def to_dict(self) -> dict:
+        return {
+            "column": self.column,
+            "rule": self.rule,
+            "params": self.params,
+            "ddl": self.ddl,
+        }
+
+
+def _shapes(report: dict, side: str) -> dict:
+    """Non-null shape -> example value for one side of a compare_shapes entry."""
+    return {
+        shape: example
+        for shape, example in report["examples"][side].items()
+        if shape != NULL_SHAPE
+    }
+
+
+def _match_trim(column: str, report: dict) -> Optional[dict]:
+    target = {relaxed_shape(shape.strip()) for shape in _shapes(report, "target")}
+    if all(relaxed_shape(shape.strip()) in target for shape in report["new_shapes"]):
+        return {}
+    return None
+
+
+def _amount_layout(value: str) -> Optional[dict]:
+    match = _AMOUNT.match(value)
+    if match is None:
+        return None
+    return {
+        "prefix": match.group("prefix"),
+        "suffix": match.group("suffix"),
+        "decimals": len(match.group("decimals") or ""),
+    }
+
+
+def _match_currency(column: str, report: dict) -> Optional[dict]:
+    source = _shapes(report, "source")
+    target = _shapes(report, "target")
+    if not source or not target:
+        return None
+    target_layout = _amount_layout(next(iter(target.values())))
+    source_layouts = [_amount_layout(value) for value in source.values()]
+    if target_layout is None or None in source_layouts:
+        return None
+    # Plain numbers on both sides are a type question, not a currency layout.
+    if not any(
+        layout["prefix"] or layout["suffix"]
+        for layout in [target_layout] + source_layouts
+    ):
+        return None
+    return target_layout
+
+
+def _match_date(column: str, report: dict) -> Optional[dict]:
+    source = _shapes(report, "source")
+    target = _shapes(report, "target")
+    if not source or not target:
+        return None
+    source_format = infer_date_format(pd.Series(list(source.values())))
+    target_format = infer_date_format(pd.Series([next(iter(target.values()))]))
+    if source_format is None or target_format is None:
+        return None
+    return {"source_format": source_format, "target_format": target_format}
+
+
+def _match_id(column: str, report: dict) -> Optional[dict]:
+    target = _shapes(report, "target")
+    if not target or not all(re.fullmatch("9+", shape) for shape in target):
+        return None
+    if not any("a" in shape for shape in report["new_shapes"]):
+        return None
+    source = _shapes(report, "source")
+    if not all(re.fullmatch(r"[9a_\-]+", shape) for shape in source):
+        return None
+    return {}
+
+
+# Tried in order; the first rule that matches a drifted column wins.
+RULES = {
+    "trim": (_match_trim, trim_whitespace),
+    "currency": (_match_currency, reformat_currency),
+    "date": (_match_date, relayout_dates),
+    "id_widening": (_match_id, widen_id),
+}
+
+
+def match_rules(
+    format_profile: dict, table_name: Optional[str] = None
+) -> Tuple[List[Transform], List[str]]:
+    """
+    Match every drifted column of a compare_shapes report against RULES.
+
+    Returns:
+        transforms (list): One Transform per covered column.
+        uncovered (list): Drifted columns no rule covers.
+    """
+    transforms = []
+    uncovered = []
+    for column, report in format_profile.items():
+        if not report["drift"]:
+            continue
+        for rule, (matcher, _) in RULES.items():
+            params = matcher(column, report)
+            if params is None:
+                continue
+            ddl = None
+            if rule == "id_widening" and table_name:
+                ddl = (
+                    f"ALTER TABLE {table_name} MODIFY COLUMN {column} "
+                    f"VARCHAR({ID_VARCHAR_LENGTH})"
+                )
+            transforms.append(Transform(column, rule, params, ddl))
+            break
+        else:
+            uncovered.append(column)
+    return transforms, uncovered
+
+
+def apply_transforms(df: pd.DataFrame, transforms: List[Transform]) -> pd.DataFrame:
+    """
+    Apply transforms to a raw (string) frame.
+
+    Raises:
+        ValueError: When a transform turns non-empty values into nulls.
+    """
+    df = df.copy()
+    for transform in transforms:
+        if transform.column not in df.columns:
+            continue
+        values = df[transform.column]
+        converted = transform.apply(values)
+        present = values.notna() & (values.astype(str).str.strip() != "")
+        lost = present & converted.isna()
+        if lost.any():
+            raise ValueError(
+                f"Rule '{transform.rule}' does not fit column '{transform.column}' "
+                f"(first value {values[lost].iloc[0]!r}, {int(lost.sum())} rows)."
+            )
+        df[transform.column] = converted
+    return df
+
+
+def verify_transforms(
+    file_path: str,
+    transforms: List[Transform],
+    max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB,
+) -> List[str]:
+    """
+    Stream a file as raw text and apply every transform to each chunk.
+
+    Returns:
+        failed (list): Columns whose rule does not fit every row.
+    """
+    pending = list(transforms)
+    failed = []
+    for chunk in iter_raw_chunks(file_path, max_memory_mb):
+        for transform in list(pending):
+            try:
+                apply_transforms(chunk[[transform.column]], [transform])
+            except (KeyError, ValueError):
+                pending.remove(transform)
+                failed.append(transform.column)
+        if not pending:
+            break
+    return failed
+
+
+def render_transform_code(transforms: List[Transform]) -> str:
+    """Self-contained source of fix_data_format_change for a set of transforms."""
+    helpers = []
+    for transform in transforms:
+        helper = RULES[transform.rule][1]
+        if helper not in helpers:
+            helpers.append(helper)
+
+    lines = ["import numpy as np", "import pandas as pd", "", ""]
+    for helper in helpers:
+        lines.append(inspect.getsource(helper).rstrip())
+        lines.extend(["", ""])
+
+    lines.append("def fix_data_format_change(source_df):")
+    lines.append("    df = source_df.copy()")
+    for transform in transforms:
+        if transform.ddl:
+            lines.append(f"    # Target column needs widening first: {transform.ddl}")
+        args = "".join(f", {key}={value!r}" for key, value in transform.params.items())
+        helper = RULES[transform.rule][1].__name__
+        lines.append(
+            f"    df[{transform.column!r}] = {helper}(df[{transform.column!r}]{args})"
+        )
+    lines.append("    return df")
+    return "\n".join(lines) + "\n"
+
+
+def plan_format_fixes(
+    file_path: str, format_profile: dict, table_name: Optional[str] = None
+) -> dict:
+    """
+    Cover a feed's format drift with the rule library where possible.
+
+    Rules are verified against every row of the source; columns whose rule
+    does not fit are reported as uncovered so the LLM task can handle them.
+
+    Returns:
+        dict: {"drifted", "transforms", "uncovered", "code"}; code is None
+        when nothing is covered.
+    """
+    drifted = [col for col, report in format_profile.items() if report["drift"]]
+    transforms, uncovered = match_rules(format_profile, table_name)
+    if transforms:
+        failed = set(verify_transforms(file_path, transforms))
+        uncovered += [t.column for t in transforms if t.column in failed]
+        transforms = [t for t in transforms if t.column not in failed]
+    return {
+        "drifted": drifted,
+        "transforms": [transform.to_dict() for transform in transforms],
+        "uncovered": uncovered,
+        "code": render_transform_code(transforms) if transforms else None,
+    }
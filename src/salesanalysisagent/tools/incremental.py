@@ -0,0 +1,344 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import warnings
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.columnar_cache import CACHE_DIR, content_hash
+
+INCREMENTAL_DIR = os.environ.get(
+    "SALES_AGENT_INCREMENTAL_DIR", os.path.join(CACHE_DIR, "incremental")
+)
+
+_SECONDS_PER_DAY = 86_400
+_NUMBER_KINDS = {"integer", "floating", "mixed-integer-float", "decimal", "boolean"}
+_DATETIME_KINDS = {"datetime", "datetime64", "date"}
+_DATE_TEXT = re.compile(r"\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}")
+
+
+def _text_dates(series: pd.Series) -> Optional[pd.Series]:
+    """Epoch seconds of a text column whose values all parse as dates, else None."""
+    values = series.dropna()
+    if values.empty or not _DATE_TEXT.match(str(values.iloc[0])):
+        return None
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        parsed = pd.to_datetime(series, errors="coerce")
+    if parsed.isna().sum() != series.isna().sum():
+        return None
+    return pd.Series(watermark_seconds(parsed), index=series.index)
+
+
+def _canonical_column(series: pd.Series) -> pd.Series:
+    """
+    One column in a form that hashes the same whether it comes from a
+    transformed frame or is read back from the target table: numbers as
+    float64 (non-integral values rounded through float32, like a MySQL FLOAT
+    column stores them), datetimes as epoch seconds, everything else as text.
+    Text columns holding only numbers or only dates (e.g. a source file read
+    as strings) count as numbers or datetimes.
+    """
+    kind = pd.api.types.infer_dtype(series, skipna=True)
+    if pd.api.types.is_datetime64_any_dtype(series) or kind in _DATETIME_KINDS:
+        return pd.Series(watermark_seconds(series), index=series.index)
+    numbers = None
+    if pd.api.types.is_numeric_dtype(series) or kind in _NUMBER_KINDS:
+        numbers = pd.to_numeric(series, errors="coerce")
+    elif kind in ("mixed", "string"):
+        # e.g. floats and Decimals read back from one DECIMAL column.
+        numbers = pd.to_numeric(series, errors="coerce")
+        if numbers.isna().sum() != series.isna().sum():
+            numbers = None
+            dates = _text_dates(series) if kind == "string" else None
+            if dates is not None:
+                return dates
+    if numbers is not None:
+        values = numbers.astype("float64").to_numpy()
+        with np.errstate(invalid="ignore", over="ignore"):
+            rounded = values.astype(np.float32).astype(np.float64)
+        return pd.Series(
+            np.where(values == np.trunc(values), values, rounded), index=series.index
+        )
+    text = series.astype(object).where(series.notna(), None)
+    return text.map(str, na_action="ignore")
+
+
+def row_hashes(df: pd.DataFrame, columns: Optional[List[str]] = None) -> np.ndarray:
+    """uint64 hash of every row over columns (default: all), column-wise vectorised."""
+    columns = list(columns or df.columns)
+    canonical = pd.DataFrame(
+        {col: _canonical_column(df[col]) for col in columns}, index=df.index
+    )
+    return pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+
+
+def watermark_seconds(series: pd.Series) -> np.ndarray:
+    """Epoch seconds (float, NaN for nulls) of a date / datetime column."""
+    values = pd.to_datetime(series, errors="coerce")
+    if values.dt.tz is not None:
+        values = values.dt.tz_convert(None)
+    seconds = values.astype("datetime64[s]").astype("int64").astype("float64")
+    return np.where(values.isna(), np.nan, seconds)
+
+
+def _member(sorted_hashes: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+    if not len(sorted_hashes):
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.searchsorted(sorted_hashes, hashes)
+    positions[positions == len(sorted_hashes)] = 0
+    return sorted_hashes[positions] == hashes
+
+
+class HashIndex:
+    """
+    Sorted, unique uint64 row hashes (8 bytes per row), optionally paired with
+    each row's watermark so rows that fall out of the lookback window can be
+    pruned. Membership is one np.searchsorted over a whole chunk.
+
+    Rows added during a run go to a small sorted delta, so an add costs the
+    size of the delta rather than of the whole index; merge() folds the
+    delta in once, before the index is pruned or saved. Bulk builds
+    (extend) sort everything once.
+    """
+
+    def __init__(
+        self, hashes: Optional[np.ndarray] = None, values: Optional[np.ndarray] = None
+    ):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.values = np.empty(0, dtype=np.float64)
+        self._delta_hashes = np.empty(0, dtype=np.uint64)
+        self._delta_values = np.empty(0, dtype=np.float64)
+        if hashes is not None and len(hashes):
+            self.extend([hashes], [values])
+
+    def __len__(self) -> int:
+        return len(self.hashes) + len(self._delta_hashes)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        return _member(self.hashes, hashes) | _member(self._delta_hashes, hashes)
+
+    def add(self, hashes: np.ndarray, values: Optional[np.ndarray] = None):
+        """Insert a chunk of hashes into the run's delta (known ones are skipped)."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if values is None:
+            values = np.full(len(hashes), np.nan)
+        hashes, first = np.unique(hashes, return_index=True)
+        values = np.asarray(values, dtype=np.float64)[first]
+        new = ~self.contains(hashes)
+        hashes, values = hashes[new], values[new]
+        positions = np.searchsorted(self._delta_hashes, hashes)
+        self._delta_hashes = np.insert(self._delta_hashes, positions, hashes)
+        self._delta_values = np.insert(self._delta_values, positions, values)
+
+    def extend(self, hashes: List[np.ndarray], values: List[Optional[np.ndarray]]):
+        """Add many chunks at once with a single sort, e.g. when seeding."""
+        values = [
+            np.full(len(h), np.nan) if v is None else np.asarray(v, dtype=np.float64)
+            for h, v in zip(hashes, values)
+        ]
+        all_hashes = np.concatenate(
+            [self.hashes, self._delta_hashes]
+            + [np.asarray(h, dtype=np.uint64) for h in hashes]
+        )
+        all_values = np.concatenate([self.values, self._delta_values] + values)
+        all_hashes, first = np.unique(all_hashes, return_index=True)
+        self.hashes, self.values = all_hashes, all_values[first]
+        self._delta_hashes = np.empty(0, dtype=np.uint64)
+        self._delta_values = np.empty(0, dtype=np.float64)
+
+    def merge(self):
+        if len(self._delta_hashes):
+            self.extend([], [])
+
+    def prune(self, before: float):
+        """Drop rows whose watermark is older than before (null watermarks stay)."""
+        self.merge()
+        keep = ~(self.values < before)
+        self.hashes, self.values = self.hashes[keep], self.values[keep]
+
+    def save(self, path: str):
+        self.merge()
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, hashes=self.hashes, values=self.values)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Optional["HashIndex"]:
+        try:
+            with np.load(path) as data:
+                index = cls()
+                index.hashes, index.values = data["hashes"], data["values"]
+                return index
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+class IncrementalFeed:
+    """
+    Watermark and dedupe state of one feed (e.g. one vendor into one table),
+    so a resent or overlapping file only appends rows the target lacks.
+
+    State lives in <directory>/<feed>/: state.json (content hashes of the
+    files already ingested, the max watermark_column value) and index.npz
+    (the HashIndex). filter() drops, per chunk and without per-row lookups,
+    rows already in the index and repeats within the run; rows with the same
+    key_columns values count as the same row. The index only covers rows
+    from the watermark minus lookback_days on; for late rows older than
+    that, backfill(start, stop) (when set) returns the target's rows with
+    start <= watermark < stop so they are checked like the rest. Nothing is
+    persisted until commit(), which is meant to run after the load
+    succeeded; after a failed load, reset() so the next run seeds the index
+    from the target table (seed()) again.
+    """
+
+    def __init__(
+        self,
+        feed: str,
+        key_columns: Optional[List[str]] = None,
+        watermark_column: Optional[str] = None,
+        lookback_days: float = 1.0,
+        directory: str = INCREMENTAL_DIR,
+    ):
+        self.feed = feed
+        self.key_columns = key_columns
+        self.watermark_column = watermark_column
+        self.lookback_days = lookback_days
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]", "_", feed))
+        self._lock = threading.Lock()
+        self.state = self._load_state()
+        self.index = HashIndex.load(os.path.join(self.path, "index.npz"))
+        self.seeded = self.index is not None
+        if self.index is None:
+            self.index = HashIndex()
+        self.skipped = 0
+        self.backfill: Optional[Callable[[float, float], Iterable[pd.DataFrame]]] = None
+        # Oldest watermark the index covers; fixed for the run (apart from
+        # backfills), so a file's newest rows don't push out its older ones.
+        self._horizon = self._cutoff(self.watermark)
+
+    def _load_state(self) -> dict:
+        try:
+            path = os.path.join(self.path, "state.json")
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {"files": [], "watermark": None}
+
+    @property
+    def watermark(self) -> Optional[float]:
+        return self.state.get("watermark")
+
+    def _cutoff(self, watermark: Optional[float]) -> Optional[float]:
+        if watermark is None:
+            return None
+        return watermark - self.lookback_days * _SECONDS_PER_DAY
+
+    def file_seen(self, file_path: str) -> bool:
+        """True when this exact file content was already ingested."""
+        return content_hash(file_path) in self.state["files"]
+
+    def seed(self, chunks: Iterable[pd.DataFrame]):
+        """Build the index (and watermark) from the target table's rows."""
+        hashes, values = [], []
+        for chunk in chunks:
+            chunk_hashes, chunk_values = self._hash_chunk(chunk)
+            hashes.append(chunk_hashes)
+            values.append(chunk_values)
+        # One sort for the whole table instead of one per chunk.
+        self.index.extend(hashes, values)
+        self.seeded = True
+        self._horizon = self._cutoff(self.watermark)
+
+    def _hash_chunk(self, chunk: pd.DataFrame):
+        """Row hashes and watermarks of chunk; advances the feed's watermark."""
+        hashes = row_hashes(chunk, self.key_columns)
+        values = None
+        if self.watermark_column is not None:
+            values = watermark_seconds(chunk[self.watermark_column])
+            if len(values) and not np.all(np.isnan(values)):
+                newest = float(np.nanmax(values))
+                if self.watermark is None or newest > self.watermark:
+                    self.state["watermark"] = newest
+        return hashes, values
+
+    def _extend_horizon(self, chunk: pd.DataFrame):
+        """Backfill the index with the target's rows as old as chunk's oldest."""
+        if self.backfill is None or self._horizon is None:
+            return
+        values = watermark_seconds(chunk[self.watermark_column])
+        late = values[values < self._horizon]
+        if not len(late):
+            return
+        oldest = float(late.min())
+        hashes, values = [], []
+        for rows in self.backfill(oldest, self._horizon):
+            hashes.append(row_hashes(rows, self.key_columns))
+            values.append(watermark_seconds(rows[self.watermark_column]))
+        self.index.extend(hashes, values)
+        self._horizon = oldest
+
+    def filter(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """The rows of chunk that are new; they are remembered for this run."""
+        with self._lock:
+            if self.watermark_column is not None:
+                self._extend_horizon(chunk)
+            hashes = row_hashes(chunk, self.key_columns)
+            keep = ~self.index.contains(hashes)
+            # Repeats inside the chunk: keep the first occurrence.
+            first = np.zeros(len(chunk), dtype=bool)
+            first[np.unique(hashes, return_index=True)[1]] = True
+            keep &= first
+            new = chunk[keep]
+            self.skipped += len(chunk) - len(new)
+            if len(new):
+                self.index.add(*self._hash_chunk(new))
+            return new
+
+    def commit(self, file_paths: Iterable[str] = ()):
+        """Persist the index and watermark, marking file_paths as ingested."""
+        with self._lock:
+            for file_path in file_paths:
+                digest = content_hash(file_path)
+                if digest not in self.state["files"]:
+                    self.state["files"].append(digest)
+            cutoff = self._cutoff(self.watermark)
+            if cutoff is not None:
+                self.index.prune(cutoff)
+            self._horizon = cutoff
+            self.index.save(os.path.join(self.path, "index.npz"))
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self.state, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, os.path.join(self.path, "state.json"))
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def reset(self):
+        """Forget everything; the next run re-seeds from the target table."""
+        with self._lock:
+            self.state = {"files": [], "watermark": None}
+            self.index = HashIndex()
+            self.seeded = False
+            self._horizon = None
+            for name in ("state.json", "index.npz"):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
@@ -3,10 +3,16 @@ from typing import Type
 from pydantic import BaseModel, Field
 import pandas as pd
 
+from salesanalysisagent.tools.dataset_registry import load_dataframe
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.schema_validator import type_family
+from salesanalysisagent.tools.tracing import traced
+
 
 class InspectToolInput(BaseModel):
     file_path: str = Field(
-        ..., description="Path to the sales data file (.csv or .txt)."
+        ...,
+        description="Path to the sales data file (.csv or .txt), or a directory / glob of part files.",
     )
 
 
@@ -17,13 +23,24 @@ class InspectTool(BaseTool):
     )
     args_schema: Type[BaseModel] = InspectToolInput
 
+    @traced()
+    @compact_payload
     def _run(self, file_path: str) -> str:
         try:
-            df = pd.read_csv(file_path)
+            df = load_dataframe(file_path)
         except Exception as e:
             raise RuntimeError(f"Could not read file: {str(e)}")
 
         preview = df.head().to_string()
-        schema = df.dtypes.apply(lambda dt: dt.name).to_dict()
+        # Logical types, not the compact storage dtypes (int8, float32,
+        # category) the loader picked.
+        schema = {
+            col: type_family(
+                dtype.categories.dtype
+                if isinstance(dtype, pd.CategoricalDtype)
+                else dtype
+            )
+            for col, dtype in df.dtypes.items()
+        }
 
         return f"Preview of data:\n{preview}\n\nSchema:\n{schema}"
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from crewai.knowledge.source.text_file_knowledge_source import TextFileKnowledgeSource
+
+from salesanalysisagent.tools.columnar_cache import CACHE_DIR, content_hash
+from salesanalysisagent.tools.tracing import span
+
+KNOWLEDGE_CACHE_ENABLED = os.environ.get("SALES_AGENT_KNOWLEDGE_CACHE", "1") != "0"
+MANIFEST_PATH = os.path.join(CACHE_DIR, "knowledge", "manifest.json")
+
+_manifest_lock = threading.Lock()
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_manifest(manifest: dict, path: str = MANIFEST_PATH):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def embedder_fingerprint(embedding_function) -> str:
+    """Class and config of an embedding function (model, dimensions, ...)."""
+    description = {
+        "class": f"{type(embedding_function).__module__}."
+        f"{type(embedding_function).__qualname__}"
+    }
+    try:
+        description["config"] = embedding_function.get_config()
+    except Exception:
+        pass
+    payload = json.dumps(description, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CachedTextFileKnowledgeSource(TextFileKnowledgeSource):
+    """
+    TextFileKnowledgeSource that only embeds when something changed.
+
+    The vectors already live in crewAI's persistent Chroma collection; a
+    manifest next to the columnar cache records which file contents, chunking
+    and embedder produced them. When all three match and the collection still
+    holds that many chunks, add() skips embedding entirely. Otherwise the
+    collection is emptied and rebuilt, so edited files leave no stale chunks
+    behind. Assumes the source is the only one writing to its collection.
+    """
+
+    def _fingerprint(self, embedding_function) -> dict:
+        files = {
+            str(path): content_hash(str(path)) for path in self.safe_file_paths
+        }
+        return {
+            "files": files,
+            "chunking": [self.chunk_size, self.chunk_overlap],
+            "embedder": embedder_fingerprint(embedding_function),
+        }
+
+    def _collection(self):
+        """(rag client, collection name, chroma collection or None)."""
+        client = self.storage._get_client()
+        name = (
+            f"knowledge_{self.storage.collection_name}"
+            if self.storage.collection_name
+            else "knowledge"
+        )
+        try:
+            collection = client.client.get_collection(name)
+        except Exception:
+            collection = None
+        return client, name, collection
+
+    def add(self) -> None:
+        # Re-chunk from scratch: Crew.copy adds the same source again and the
+        # base class would keep extending self.chunks.
+        self.chunks = [
+            chunk for text in self.content.values() for chunk in self._chunk_text(text)
+        ]
+        if not KNOWLEDGE_CACHE_ENABLED or self.storage is None:
+            self._save_documents()
+            return
+
+        with span("knowledge_add", "io", chunks=len(self.chunks)) as add_span:
+            client, name, collection = self._collection()
+            fingerprint = self._fingerprint(getattr(client, "embedding_function", None))
+            with _manifest_lock:
+                entry = load_manifest().get(name)
+            cached = (
+                entry is not None
+                and entry["fingerprint"] == fingerprint
+                and collection is not None
+                and collection.count() == entry["chunks"]
+            )
+            if add_span is not None:
+                add_span.attrs["cached"] = cached
+            if cached:
+                return
+
+            if collection is not None and collection.count():
+                self.storage.reset()
+            self._save_documents()
+            with _manifest_lock:
+                manifest = load_manifest()
+                manifest[name] = {
+                    "fingerprint": fingerprint,
+                    "chunks": len(self.chunks),
+                }
+                save_manifest(manifest)
+
+
+def forget(collection_name: Optional[str] = None):
+    """Drop manifest entries (all, or one collection) so the next add() re-embeds."""
+    with _manifest_lock:
+        manifest = load_manifest()
+        if collection_name is None:
+            manifest = {}
+        else:
+            manifest.pop(collection_name, None)
+        save_manifest(manifest)
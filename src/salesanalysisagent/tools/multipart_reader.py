@@ -0,0 +1,220 @@
+import glob
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Union
+
+import pandas as pd
+
+from salesanalysisagent.tools.file_reader import (
+    DEFAULT_CHUNK_MEMORY_MB,
+    detect_format,
+    iter_chunks,
+    read_file,
+)
+from salesanalysisagent.tools.sniffer import read_csv_kwargs
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def _natural_key(path: str):
+    # part-2 sorts before part-10
+    return [
+        int(token) if token.isdigit() else token.lower()
+        for token in re.split(r"(\d+)", os.path.basename(path))
+    ]
+
+
+def is_multipart(file_path: str) -> bool:
+    """True when file_path is a directory or a glob pattern rather than one file."""
+    return os.path.isdir(file_path) or bool(_GLOB_CHARS.search(file_path))
+
+
+def resolve_input_paths(file_path: str) -> List[str]:
+    """
+    Expand a file, directory or glob pattern into an ordered list of part files.
+    Directories contribute every supported data file directly inside them.
+    """
+    if os.path.isdir(file_path):
+        candidates = [
+            os.path.join(file_path, name)
+            for name in os.listdir(file_path)
+            if not name.startswith(".")
+        ]
+    elif _GLOB_CHARS.search(file_path):
+        candidates = glob.glob(file_path)
+    else:
+        return [file_path] if os.path.exists(file_path) else []
+
+    parts = [
+        path
+        for path in candidates
+        if os.path.isfile(path) and detect_format(path) is not None
+    ]
+    return sorted(parts, key=_natural_key)
+
+
+def read_header(file_path: str) -> List[str]:
+    """Return the column names of a part without reading its rows."""
+    file_format = detect_format(file_path)
+    if file_format == "csv":
+        return list(
+            pd.read_csv(file_path, **read_csv_kwargs(file_path, nrows=0)).columns
+        )
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+
+        return list(pq.ParquetFile(file_path).schema_arrow.names)
+    return list(pd.read_excel(file_path, nrows=0).columns)
+
+
+def _read_part(file_path: str) -> pd.DataFrame:
+    return read_file(file_path)
+
+
+def _take(paths: Iterator[str], n: int) -> List[str]:
+    return [path for _, path in zip(range(n), paths)]
+
+
+def _pool_size(paths: List[str], max_workers: Optional[int]) -> int:
+    return max(1, min(len(paths), max_workers or os.cpu_count() or 1))
+
+
+def _check_columns(path: str, columns: List[str], expected: List[str]):
+    if columns != expected:
+        missing = [col for col in expected if col not in columns]
+        extra = [col for col in columns if col not in expected]
+        raise ValueError(
+            f"Part {path} does not match the schema of the first part: "
+            f"missing={missing}, extra={extra}, columns={columns}"
+        )
+
+
+def check_consistent_schema(
+    paths: List[str], max_workers: Optional[int] = None
+) -> List[str]:
+    """
+    Read the header of every part in parallel and make sure they all agree.
+
+    Returns:
+        columns (list): The shared column list.
+    """
+    if not paths:
+        raise FileNotFoundError("No input files found.")
+
+    if len(paths) == 1:
+        return read_header(paths[0])
+
+    with ProcessPoolExecutor(max_workers=_pool_size(paths, max_workers)) as pool:
+        headers = list(pool.map(read_header, paths))
+
+    for path, columns in zip(paths[1:], headers[1:]):
+        _check_columns(path, columns, headers[0])
+    return headers[0]
+
+
+def iter_parts(
+    paths: List[str], max_workers: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Parse the parts across a process pool and yield them in input order,
+    validating each part's columns against the first one as it arrives.
+    Parts are submitted as earlier ones are consumed, so only about
+    max_workers parsed parts are held at a time.
+    """
+    if not paths:
+        raise FileNotFoundError("No input files found.")
+
+    if len(paths) == 1:
+        yield _read_part(paths[0])
+        return
+
+    workers = _pool_size(paths, max_workers)
+    remaining = iter(paths)
+    expected = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # At most one part per worker is parsed ahead of the consumer.
+        window = deque(
+            (path, pool.submit(_read_part, path)) for path in _take(remaining, workers)
+        )
+        while window:
+            path, future = window.popleft()
+            df = future.result()
+            for next_path in _take(remaining, 1):
+                window.append((next_path, pool.submit(_read_part, next_path)))
+            columns = list(df.columns)
+            if expected is None:
+                expected = columns
+            else:
+                _check_columns(path, columns, expected)
+            yield df
+
+
+def read_parts(paths: List[str], max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Read every part in parallel and concatenate them in order."""
+    return pd.concat(list(iter_parts(paths, max_workers)), ignore_index=True)
+
+
+def iter_part_chunks(
+    paths: List[str],
+    max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB,
+    max_workers: Optional[int] = None,
+    **read_kwargs,
+) -> Iterator[pd.DataFrame]:
+    """Stream bounded-size chunks of every part in order after a header check."""
+    check_consistent_schema(paths, max_workers)
+    for path in paths:
+        for chunk in iter_chunks(path, max_memory_mb=max_memory_mb, **read_kwargs):
+            chunk.attrs["part"] = path
+            yield chunk
+
+
+def iter_raw_chunks(
+    file_path: str,
+    max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB,
+    sheet_name: Union[str, int] = 0,
+) -> Iterator[pd.DataFrame]:
+    """
+    Chunks of a file (or every part behind a directory / glob) as raw text:
+    every value a string, empty cells kept as "" rather than read as NaN.
+    Workbooks stream only sheet_name, the first sheet by default, which is
+    the sheet read_input loads.
+    """
+    read_kwargs = {"dtype": str, "keep_default_na": False}
+    if is_multipart(file_path):
+        chunks = iter_part_chunks(
+            resolve_input_paths(file_path),
+            max_memory_mb,
+            sheet_name=sheet_name,
+            **read_kwargs,
+        )
+    else:
+        chunks = iter_chunks(
+            file_path, max_memory_mb=max_memory_mb, sheet_name=sheet_name, **read_kwargs
+        )
+    return _as_raw_text(chunks, file_path)
+
+
+def _as_raw_text(chunks, file_path):
+    # dtype and keep_default_na only reach pd.read_csv; Parquet and Excel
+    # chunks are cast here so every format streams the same raw strings.
+    try:
+        for chunk in chunks:
+            if detect_format(chunk.attrs.get("part", file_path)) != "csv":
+                text = chunk.astype(object).where(chunk.notna(), "").astype(str)
+                text.attrs.update(chunk.attrs)
+                chunk = text
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def read_input(file_path: str, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Read a single file, or every part behind a directory / glob, as one frame."""
+    paths = resolve_input_paths(file_path)
+    if not paths:
+        raise FileNotFoundError(f"The file at {file_path} does not exist.")
+    if len(paths) == 1 and not is_multipart(file_path):
+        return read_file(paths[0])
+    return read_parts(paths, max_workers)
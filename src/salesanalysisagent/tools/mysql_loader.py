@@ -0,0 +1,627 @@
+import itertools
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.db_pool import get_pool
+from salesanalysisagent.tools.incremental import IncrementalFeed
+from salesanalysisagent.tools.schema_catalog import get_catalog
+
+# Client / server errors meaning LOAD DATA LOCAL INFILE is switched off.
+LOCAL_INFILE_DISABLED = {1148, 2068, 3948, 3950}
+NO_SUCH_TABLE = 1146
+
+
+def _column_text(series: pd.Series) -> pd.Series:
+    """
+    One column as LOAD DATA text, converted once for the whole column:
+    \\N for nulls, backslashes, tabs and newlines escaped in strings.
+    """
+    nulls = series.isna()
+    if pd.api.types.is_bool_dtype(series):
+        text = series.map({True: "1", False: "0"})
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        text = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif pd.api.types.is_numeric_dtype(series):
+        text = series.astype(str)
+    else:
+        text = (
+            series.astype(str)
+            .str.replace("\\", "\\\\", regex=False)
+            .str.replace("\t", "\\t", regex=False)
+            .str.replace("\n", "\\n", regex=False)
+            .str.replace("\r", "\\r", regex=False)
+        )
+    return text.where(~nulls, "\\N")
+
+
+def _python_values(series: pd.Series) -> Callable[[pd.Series], list]:
+    """
+    Converter for slices of one column into the Python values the connector
+    binds (None for nulls), chosen once per column from its dtype.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        to_python = lambda part: part.array.to_pydatetime()  # noqa: E731
+    elif pd.api.types.is_timedelta64_dtype(series):
+        to_python = lambda part: part.array.to_pytimedelta()  # noqa: E731
+    else:
+        # numpy scalars become int / float / bool on the cast to object.
+        return lambda part: part.to_numpy(dtype=object, na_value=None).tolist()
+
+    def convert(part: pd.Series) -> list:
+        # Timestamp / Timedelta are not adaptable by the connector.
+        values = np.array(to_python(part), dtype=object)
+        values[part.isna().to_numpy()] = None
+        return values.tolist()
+
+    return convert
+
+
+def iter_row_batches(df: pd.DataFrame, batch_size: int) -> Iterator[List[tuple]]:
+    """
+    Rows of df as lists of tuples, batch_size at a time, built from the
+    column arrays; only one batch of Python objects exists at once.
+    """
+    columns = [df.iloc[:, j] for j in range(df.shape[1])]
+    converters = [_python_values(col) for col in columns]
+    for start in range(0, len(df), batch_size):
+        stop = start + batch_size
+        parts = [
+            convert(col.iloc[start:stop]) for col, convert in zip(columns, converters)
+        ]
+        yield list(zip(*parts))
+
+
+def to_load_data_text(df: pd.DataFrame) -> str:
+    """Tab separated rows in the format _load_file's LOAD DATA statement reads."""
+    if df.empty:
+        return ""
+    columns = [_column_text(df[col]) for col in df.columns]
+    lines = columns[0]
+    if len(columns) > 1:
+        lines = lines.str.cat(columns[1:], sep="\t")
+    return "\n".join(lines.tolist()) + "\n"
+
+
+class MySQLConnector:
+    """
+    Borrows a connection from the shared salesanalysisagent pool so repeated
+    loads reuse TCP/auth handshakes; close() hands it back to the pool.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        database: str,
+        allow_local_infile: bool = True,
+    ):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        # Client side switch for LOAD DATA LOCAL INFILE (bulk_load).
+        self.allow_local_infile = allow_local_infile
+        self.connection = None
+        self._pool = None
+
+    def connect(self):
+        from mysql.connector import Error
+
+        try:
+            self._pool = get_pool(
+                self.database,
+                host=self.host,
+                user=self.user,
+                password=self.password,
+                allow_local_infile=self.allow_local_infile,
+            )
+            self.connection = self._pool.acquire()
+            if self.connection.is_connected():
+                print("Connected to MySQL")
+        except Error as e:
+            raise ConnectionError(f"Error connecting to MySQL: {e}")
+
+    def close(self):
+        if self.connection is not None and self._pool is not None:
+            self._pool.release(self.connection, discard=not self.connection.is_connected())
+            self.connection = None
+            print("MySQL connection returned to pool.")
+
+
+class MySQLTableWriter:
+    def __init__(self, connector: MySQLConnector):
+        self.connector = connector
+
+    def create_table_if_not_exists(self, table_name: str, df: pd.DataFrame):
+        cursor = self.connector.connection.cursor()
+
+        columns = []
+        for col in df.columns:
+            dtype = "TEXT"
+            if pd.api.types.is_integer_dtype(df[col]):
+                dtype = "INT"
+            elif pd.api.types.is_float_dtype(df[col]):
+                dtype = "FLOAT"
+            columns.append(f"`{col}` {dtype}")
+
+        columns_sql = ", ".join(columns)
+        create_stmt = f"CREATE TABLE IF NOT EXISTS `{table_name}` ({columns_sql});"
+        cursor.execute(create_stmt)
+        cursor.close()
+        # DDL may have changed the table; drop its cached column metadata.
+        get_catalog().invalidate(self.connector.database, table_name)
+        print(f"Ensured table `{table_name}` exists.")
+
+    def insert_data(
+        self,
+        table_name: str,
+        df: pd.DataFrame,
+        batch_size: int = 1000,
+        commit_rows: Optional[int] = None,
+        pending_rows: int = 0,
+        commit_tail: bool = True,
+    ) -> int:
+        """
+        Multi-row INSERTs (executemany rewrites each batch into one statement),
+        committed every commit_rows rows, or after every batch when unset.
+        Rows are built per batch from the column arrays (iter_row_batches).
+        pending_rows are rows an earlier call left uncommitted on the same
+        connection; with commit_tail=False the rows after the last commit stay
+        open too. Returns the rows left uncommitted.
+        """
+        cursor = self.connector.connection.cursor()
+        placeholders = ", ".join(["%s"] * len(df.columns))
+        columns = ", ".join([f"`{col}`" for col in df.columns])
+        insert_stmt = f"INSERT INTO `{table_name}` ({columns}) VALUES ({placeholders})"
+
+        uncommitted = pending_rows
+        for i, batch in zip(
+            range(0, len(df), batch_size), iter_row_batches(df, batch_size)
+        ):
+            cursor.executemany(insert_stmt, batch)
+            uncommitted += len(batch)
+            if commit_rows is None or uncommitted >= commit_rows:
+                self.connector.connection.commit()
+                uncommitted = 0
+            print(f"Inserted batch {i} - {i+len(batch)}")
+        if uncommitted and commit_tail:
+            self.connector.connection.commit()
+            uncommitted = 0
+
+        cursor.close()
+        print("Data inserted successfully.")
+        return uncommitted
+
+    def insert_chunks(
+        self,
+        table_name: str,
+        chunks: Iterable[pd.DataFrame],
+        batch_size: int = 1000,
+        create_table: bool = True,
+    ):
+        """Insert a stream of DataFrame chunks, creating the table from the first one."""
+        total = 0
+        for i, chunk in enumerate(chunks):
+            if i == 0 and create_table:
+                self.create_table_if_not_exists(table_name, chunk)
+            self.insert_data(table_name, chunk, batch_size=batch_size)
+            total += len(chunk)
+            print(f"Inserted chunk {i} ({total} rows so far)")
+        print(f"Streamed {total} rows into `{table_name}`.")
+
+    def iter_table(
+        self,
+        table_name: str,
+        columns: List[str],
+        where: str = "",
+        params: tuple = (),
+        chunksize: int = 100_000,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream columns of the table's rows as DataFrames of chunksize rows."""
+        columns_sql = ", ".join(f"`{col}`" for col in columns)
+        cursor = self.connector.connection.cursor()
+        try:
+            cursor.execute(f"SELECT {columns_sql} FROM `{table_name}` {where}", params)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    return
+                yield pd.DataFrame.from_records(rows, columns=columns)
+        finally:
+            cursor.close()
+
+    def _load_file(self, table_name: str, path: str, columns: List[str]) -> int:
+        columns_sql = ", ".join(f"`{col}`" for col in columns)
+        path = path.replace("\\", "/").replace("'", "\\'")
+        cursor = self.connector.connection.cursor()
+        try:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE '{path}' INTO TABLE `{table_name}` "
+                "CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' "
+                f"LINES TERMINATED BY '\\n' ({columns_sql})"
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def local_infile_enabled(self, table_name: str, columns: List[str]) -> bool:
+        """Probe LOAD DATA LOCAL with an empty file; False when it is refused."""
+        fd, path = tempfile.mkstemp(suffix=".tsv")
+        os.close(fd)
+        try:
+            self._load_file(table_name, path, columns)
+            return True
+        except Exception as e:
+            if getattr(e, "errno", None) in LOCAL_INFILE_DISABLED:
+                print(f"LOAD DATA LOCAL INFILE unavailable ({e.errno}), using INSERTs.")
+                return False
+            raise
+        finally:
+            os.remove(path)
+
+    def bulk_load(
+        self,
+        table_name: str,
+        chunks: Iterable[pd.DataFrame],
+        commit_rows: int = 500_000,
+        create_table: bool = True,
+        local_infile: Optional[bool] = None,
+        batch_size: int = 10_000,
+    ) -> int:
+        """
+        Load a stream of DataFrame chunks through MySQL's bulk path: rows are
+        spooled to a temp file and loaded with LOAD DATA LOCAL INFILE, one
+        load and commit per commit_rows rows. When local_infile is disabled
+        (or local_infile=False) the chunks go through multi-row INSERTs with
+        the same commit granularity instead.
+        """
+        total = 0
+        spooled = 0
+        pending = 0
+        columns = None
+        fd, spool_path = tempfile.mkstemp(suffix=".tsv")
+        spool = os.fdopen(fd, "w", encoding="utf-8", newline="")
+
+        def flush():
+            spool.flush()
+            loaded = self._load_file(table_name, spool_path, columns)
+            self.connector.connection.commit()
+            spool.seek(0)
+            spool.truncate()
+            print(f"Loaded {loaded} rows ({total} so far)")
+
+        try:
+            for i, chunk in enumerate(chunks):
+                if i == 0:
+                    columns = list(chunk.columns)
+                    if create_table:
+                        self.create_table_if_not_exists(table_name, chunk)
+                    if local_infile is None:
+                        local_infile = self.local_infile_enabled(table_name, columns)
+                total += len(chunk)
+                if not local_infile:
+                    # Chunks share one transaction up to commit_rows rows.
+                    pending = self.insert_data(
+                        table_name,
+                        chunk,
+                        batch_size=batch_size,
+                        commit_rows=commit_rows,
+                        pending_rows=pending,
+                        commit_tail=False,
+                    )
+                    continue
+                spool.write(to_load_data_text(chunk))
+                spooled += len(chunk)
+                if spooled >= commit_rows:
+                    flush()
+                    spooled = 0
+            if spooled:
+                flush()
+            if pending:
+                self.connector.connection.commit()
+        finally:
+            spool.close()
+            os.remove(spool_path)
+        print(f"Bulk loaded {total} rows into `{table_name}`.")
+        return total
+
+
+class _PooledConnector:
+    """Connector-shaped view of one borrowed pool connection."""
+
+    def __init__(self, connection, database: str):
+        self.connection = connection
+        self.database = database
+
+
+def partition_codes(
+    df: pd.DataFrame, partitions: int, key: Optional[str] = None
+) -> np.ndarray:
+    """
+    Partition number of every row: a hash of key, so a key always lands on
+    the same connection, or contiguous row ranges when key is None.
+    """
+    if key is not None:
+        hashes = pd.util.hash_pandas_object(df[key], index=False).to_numpy()
+        return (hashes % np.uint64(partitions)).astype(np.int64)
+    return np.arange(len(df), dtype=np.int64) * partitions // max(len(df), 1)
+
+
+class PartitionedLoader:
+    """
+    Load a stream of DataFrame chunks over several pooled connections.
+
+    Every chunk is split into workers partitions (by a hash of
+    partition_key, or by row range) and partition p goes to worker thread p,
+    which borrows a connection from the connector's pool per piece, so rows
+    of one key are written in order by one writer. Each piece is written and
+    committed as one transaction (LOAD DATA LOCAL INFILE, or
+    multi-row INSERTs when that is unavailable), so a failed piece is rolled
+    back and retried on a fresh connection without duplicating rows. Queues
+    between the reader and the workers are bounded, which keeps at most
+    about 2 * workers pieces in memory. The connector's connection stays
+    with the caller, so the pool (SALES_AGENT_DB_POOL_SIZE) needs workers + 1
+    connections for full concurrency. After the load the table's row count
+    must have grown by exactly the rows written; this assumes nothing else
+    writes to the table meanwhile.
+    """
+
+    def __init__(
+        self,
+        connector: MySQLConnector,
+        workers: int = 4,
+        partition_key: Optional[str] = None,
+        retries: int = 3,
+        backoff_s: float = 1.0,
+        local_infile: Optional[bool] = None,
+        batch_size: int = 10_000,
+    ):
+        self.connector = connector
+        self.writer = MySQLTableWriter(connector)
+        self.workers = workers
+        self.partition_key = partition_key
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.local_infile = local_infile
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+    def count_rows(self, table_name: str) -> int:
+        """
+        COUNT(*) on a connection of its own, ended right after: a read on the
+        caller's connection (autocommit off) would keep answering from the
+        REPEATABLE READ snapshot its first SELECT opened.
+        """
+        with self.connector._pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"SELECT COUNT(*) FROM `{table_name}`")
+                (count,) = cursor.fetchone()
+            finally:
+                cursor.close()
+            connection.rollback()
+        return count
+
+    def _write(self, connection, table_name: str, part: pd.DataFrame):
+        writer = MySQLTableWriter(_PooledConnector(connection, self.connector.database))
+        writer.bulk_load(
+            table_name,
+            [part],
+            commit_rows=len(part),
+            create_table=False,
+            local_infile=self.local_infile,
+            batch_size=self.batch_size,
+        )
+
+    def _write_piece(self, index: int, piece: int, table_name: str, part):
+        """Write one piece on a borrowed connection, retrying on a fresh one."""
+        pool = self.connector._pool
+        for attempt in range(self.retries + 1):
+            connection = pool.acquire()
+            try:
+                self._write(connection, table_name, part)
+            except Exception as e:
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                pool.release(connection, discard=True)
+                if attempt == self.retries:
+                    raise RuntimeError(
+                        f"Partition {index} piece {piece} failed after "
+                        f"{attempt + 1} attempts: {e}"
+                    ) from e
+                delay = self.backoff_s * 2**attempt
+                print(
+                    f"[WARN] Partition {index} piece {piece} failed ({e}); "
+                    f"retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+            else:
+                pool.release(connection)
+                return
+
+    def _worker(self, index: int, tasks: queue.Queue, table_name: str, state: dict):
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            if state["error"] is not None:
+                # Keep draining so the reader never blocks on a full queue.
+                continue
+            piece, part = task
+            try:
+                self._write_piece(index, piece, table_name, part)
+            except Exception as e:
+                state["error"] = e
+                continue
+            with self._lock:
+                state["rows"] += len(part)
+                state["pieces"] += 1
+                elapsed = time.perf_counter() - state["start"]
+                print(
+                    f"Partition {index}: piece {piece} done, {len(part)} rows "
+                    f"({state['rows']} total, "
+                    f"{state['rows'] / max(elapsed, 1e-9):,.0f} rows/s)"
+                )
+
+    def load(
+        self,
+        table_name: str,
+        chunks: Iterable[pd.DataFrame],
+        create_table: bool = True,
+    ) -> int:
+        """Load every chunk; returns the rows written and verifies the count."""
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return 0
+        if create_table:
+            self.writer.create_table_if_not_exists(table_name, first)
+        if self.local_infile is None:
+            self.local_infile = self.writer.local_infile_enabled(
+                table_name, list(first.columns)
+            )
+        # End the caller's transaction (DDL, the probe, seed reads) before
+        # the workers write.
+        self.connector.connection.commit()
+        before = self.count_rows(table_name)
+
+        state = {"rows": 0, "pieces": 0, "error": None}
+        queues = [queue.Queue(maxsize=2) for _ in range(self.workers)]
+        threads = [
+            threading.Thread(
+                target=self._worker,
+                args=(index, tasks, table_name, state),
+                name=f"partition-{index}",
+                daemon=True,
+            )
+            for index, tasks in enumerate(queues)
+        ]
+        state["start"] = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        submitted = 0
+        try:
+            for piece, chunk in enumerate(itertools.chain([first], chunks)):
+                if state["error"] is not None:
+                    break
+                codes = partition_codes(chunk, self.workers, self.partition_key)
+                for index, tasks in enumerate(queues):
+                    part = chunk[codes == index]
+                    if len(part):
+                        tasks.put((piece, part))
+                        submitted += len(part)
+        finally:
+            for tasks in queues:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+        if state["error"] is not None:
+            raise state["error"]
+
+        loaded = self.count_rows(table_name) - before
+        if loaded != submitted:
+            raise RuntimeError(
+                f"Consistency check failed for `{table_name}`: wrote {submitted} "
+                f"rows but the table grew by {loaded}."
+            )
+        elapsed = time.perf_counter() - state["start"]
+        print(
+            f"Loaded {submitted} rows into `{table_name}` over {self.workers} "
+            f"connections in {elapsed:.1f}s ({state['pieces']} pieces)."
+        )
+        return submitted
+
+
+def seed_feed(writer: MySQLTableWriter, feed: IncrementalFeed, table_name, columns):
+    """
+    Build feed's hash index from the target table, only from the lookback
+    window when the feed has a watermark column. A missing table seeds empty.
+    """
+    where, params = "", ()
+    if feed.watermark_column is not None:
+        column = f"`{feed.watermark_column}`"
+        where = (
+            f"WHERE {column} >= DATE_SUB((SELECT MAX({column}) FROM `{table_name}`), "
+            "INTERVAL %s SECOND)"
+        )
+        params = (int(feed.lookback_days * 86_400),)
+        if feed.watermark_column not in columns:
+            columns = columns + [feed.watermark_column]
+    try:
+        feed.seed(writer.iter_table(table_name, columns, where, params))
+    except Exception as e:
+        if getattr(e, "errno", None) != NO_SUCH_TABLE:
+            raise
+        feed.seed([])
+    print(f"Seeded dedupe index of `{table_name}` with {len(feed.index)} rows.")
+
+
+def backfill_feed(writer: MySQLTableWriter, feed: IncrementalFeed, table_name, columns):
+    """
+    Let feed check rows older than its index against the target table: each
+    backfill reads the rows in one watermark range, then ends the read.
+    """
+    if feed.watermark_column is None:
+        return
+    column = f"`{feed.watermark_column}`"
+    where = f"WHERE {column} >= %s AND {column} < %s"
+    if feed.watermark_column not in columns:
+        columns = columns + [feed.watermark_column]
+
+    def backfill(start: float, stop: float) -> Iterator[pd.DataFrame]:
+        params = tuple(
+            pd.Timestamp(seconds, unit="s").to_pydatetime() for seconds in (start, stop)
+        )
+        try:
+            yield from writer.iter_table(table_name, columns, where, params)
+        finally:
+            writer.connector.connection.rollback()
+        print(f"Backfilled dedupe index of `{table_name}` to {params[0]}.")
+
+    feed.backfill = backfill
+
+
+def append_new_rows(
+    loader: PartitionedLoader,
+    feed: IncrementalFeed,
+    table_name: str,
+    chunks: Iterable[pd.DataFrame],
+    file_path: Optional[str] = None,
+) -> int:
+    """
+    Incremental append: load only the rows of chunks that feed has not seen
+    (see IncrementalFeed), then record them. A file whose exact content was
+    already ingested is skipped without reading it.
+    """
+    if file_path is not None and feed.file_seen(file_path):
+        print(f"{file_path} was already ingested into `{table_name}`, skipping.")
+        return 0
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return 0
+    columns = feed.key_columns or list(first.columns)
+    if not feed.seeded:
+        seed_feed(loader.writer, feed, table_name, columns)
+    backfill_feed(loader.writer, feed, table_name, columns)
+    new_rows = (feed.filter(chunk) for chunk in itertools.chain([first], chunks))
+    try:
+        loaded = loader.load(table_name, new_rows)
+    except Exception:
+        # Part of the rows may be in the table; re-seed from it next run.
+        feed.reset()
+        raise
+    feed.commit([file_path] if file_path is not None else [])
+    print(f"Appended {loaded} new rows, skipped {feed.skipped} already loaded.")
+    return loaded
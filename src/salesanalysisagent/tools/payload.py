@@ -0,0 +1,209 @@
+import functools
+import json
+import math
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.dataset_registry import get_registry
+from salesanalysisagent.tools.shape_profiler import NULL_SHAPE, shape_signatures
+
+TOKEN_BUDGET = int(os.environ.get("SALES_AGENT_TOOL_TOKEN_BUDGET", "2000"))
+SHAPE_SAMPLE_ROWS = 10_000
+
+# Compaction levels, tried in order until the rendered payload fits the budget.
+LEVELS = (
+    {"sample_rows": 10, "top_shapes": 5, "max_items": None, "max_chars": 2000},
+    {"sample_rows": 5, "top_shapes": 3, "max_items": 20, "max_chars": 500},
+    {"sample_rows": 2, "top_shapes": 1, "max_items": 8, "max_chars": 200},
+)
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when available, else ~4 characters per token."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
+
+
+def resolve_frame(value: str) -> Optional[pd.DataFrame]:
+    """Return the frame behind a data handle, or None when value is not one."""
+    if isinstance(value, str) and value.startswith("df:"):
+        df = get_registry().resolve(value.strip())
+        if df is None:
+            raise KeyError(f"Data handle {value} has expired; reload the file.")
+        return df
+    return None
+
+
+def _sample_shapes(df: pd.DataFrame) -> pd.DataFrame:
+    if len(df) > SHAPE_SAMPLE_ROWS:
+        df = df.sample(n=SHAPE_SAMPLE_ROWS, random_state=0)
+    shapes = {}
+    for col in df.columns:
+        values = df[col]
+        col_shapes = shape_signatures(values)
+        col_shapes[(values.isna() | (values.astype(str).str.strip() == "")).values] = (
+            NULL_SHAPE
+        )
+        shapes[col] = col_shapes
+    return pd.DataFrame(shapes, index=df.index)
+
+
+def stratified_sample(df: pd.DataFrame, n: int, shapes: pd.DataFrame = None):
+    """
+    Up to n rows chosen so that rare value shapes of every column show up
+    (rarest first, round robin over columns), topped up with random rows.
+    """
+    if len(df) <= n:
+        return df
+    if shapes is None:
+        shapes = _sample_shapes(df)
+    queues = []
+    for col in shapes.columns:
+        counts = shapes[col].value_counts(ascending=True)
+        first_rows = shapes[col].drop_duplicates()
+        first_rows = pd.Series(first_rows.index, index=first_rows.values)
+        queues.append([first_rows[shape] for shape in counts.index])
+
+    picks = []
+    while len(picks) < n and any(queues):
+        for queue in queues:
+            while queue and queue[0] in picks:
+                queue.pop(0)
+            if queue and len(picks) < n:
+                picks.append(queue.pop(0))
+    if len(picks) < n:
+        rest = df.index.difference(picks)
+        extra = rest[np.random.default_rng(0).permutation(len(rest))[: n - len(picks)]]
+        picks.extend(extra)
+    return df.loc[picks]
+
+
+def _column_summary(series: pd.Series, top_shapes: int, shapes: pd.Series) -> dict:
+    summary = {
+        "dtype": series.dtype.name,
+        "nulls": int(series.isna().sum()),
+        "distinct": int(series.nunique()),
+    }
+    if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(
+        series
+    ):
+        if series.notna().any():
+            summary["min"] = series.min()
+            summary["max"] = series.max()
+    else:
+        top = series.value_counts().head(3)
+        summary["top"] = {str(value): int(count) for value, count in top.items()}
+    top = shapes.value_counts().head(top_shapes)
+    summary["shapes"] = {shape: int(count) for shape, count in top.items()}
+    return summary
+
+
+def summarize_frame(df: pd.DataFrame, level: dict = LEVELS[0]) -> dict:
+    """
+    Compact stand-in for a DataFrame: per-column summaries with shape
+    histograms, a small stratified sample and a handle to the full frame.
+    """
+    handle = get_registry().register(df)
+    shapes = _sample_shapes(df)
+    return {
+        "handle": handle,
+        "rows": len(df),
+        # Shape histograms are counted over a sample of this many rows.
+        "shape_sample_rows": len(shapes),
+        "columns": {
+            str(col): _column_summary(df[col], level["top_shapes"], shapes[col])
+            for col in df.columns
+        },
+        "sample": stratified_sample(df, level["sample_rows"], shapes).to_dict(
+            orient="records"
+        ),
+    }
+
+
+def _limit(items: list, max_items: Optional[int]):
+    if max_items is None or len(items) <= max_items:
+        return items, 0
+    return items[:max_items], len(items) - max_items
+
+
+def to_payload(value, level: dict = LEVELS[0]):
+    """Replace frames with summaries and cap long collections and strings."""
+    if isinstance(value, pd.DataFrame):
+        return summarize_frame(value, level)
+    if isinstance(value, pd.Series):
+        return summarize_frame(value.to_frame(), level)
+    if isinstance(value, dict):
+        items, dropped = _limit(list(value.items()), level["max_items"])
+        payload = {str(key): to_payload(item, level) for key, item in items}
+        if dropped:
+            payload["..."] = f"{dropped} more entries"
+        return payload
+    if isinstance(value, (list, tuple)):
+        items, dropped = _limit(list(value), level["max_items"])
+        payload = [to_payload(item, level) for item in items]
+        if dropped:
+            payload.append(f"... {dropped} more items")
+        return payload
+    if isinstance(value, str) and len(value) > level["max_chars"]:
+        return value[: level["max_chars"]] + f"... [{len(value)} chars]"
+    return value
+
+
+def compact(value, budget: int = TOKEN_BUDGET) -> str:
+    """
+    Render a tool result for the LLM within budget tokens, compacting
+    harder at each level and truncating as a last resort.
+    """
+    if isinstance(value, str) and estimate_tokens(value) <= budget:
+        return value
+    text = ""
+    for level in LEVELS:
+        text = to_payload(value, level)
+        if not isinstance(text, str):
+            text = json.dumps(text, default=str)
+        tokens = estimate_tokens(text)
+        if tokens <= budget:
+            return text
+    # Rough cut by characters, then trim until the count fits.
+    keep = max(len(text) * budget // tokens, 0)
+    marker = f" ... [truncated from {tokens} tokens to a {budget} token budget]"
+    while keep > 0 and estimate_tokens(text[:keep] + marker) > budget:
+        keep = keep * 9 // 10
+    return text[:keep] + marker
+
+
+def compact_payload(func=None, *, budget: Optional[int] = None):
+    """Decorator for a tool's _run: compact its return value to the token budget."""
+
+    def decorate(run):
+        @functools.wraps(run)
+        def wrapper(*args, **kwargs):
+            return compact(run(*args, **kwargs), budget or TOKEN_BUDGET)
+
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
+
+
+@functools.lru_cache(maxsize=None)
+def budgeted(tool_class: type) -> type:
+    """Subclass of a third-party tool whose _run output is compacted like ours."""
+    return type(
+        tool_class.__name__,
+        (tool_class,),
+        {"__module__": __name__, "_run": compact_payload(tool_class._run)},
+    )
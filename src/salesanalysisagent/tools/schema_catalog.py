@@ -0,0 +1,182 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from salesanalysisagent.tools.db_pool import get_connection, server_key
+from salesanalysisagent.tools.decision_cache import get_decision_cache
+from salesanalysisagent.tools.tracing import record, span
+
+CATALOG_TTL = float(os.environ.get("SALES_AGENT_CATALOG_TTL_S", "300"))
+
+_COLUMNS_QUERY = (
+    "SELECT TABLE_SCHEMA, TABLE_NAME, COLUMN_NAME, DATA_TYPE, COLUMN_TYPE, "
+    "CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION, NUMERIC_SCALE, IS_NULLABLE, "
+    "ORDINAL_POSITION "
+    "FROM INFORMATION_SCHEMA.COLUMNS "
+    "WHERE (TABLE_SCHEMA, TABLE_NAME) IN ({placeholders}) "
+    "ORDER BY TABLE_SCHEMA, TABLE_NAME, ORDINAL_POSITION"
+)
+
+
+class SchemaCatalog:
+    """
+    Cache of target column metadata read from INFORMATION_SCHEMA.
+
+    Tables are loaded in one query per database server, kept for ttl seconds
+    and dropped early by invalidate() after DDL.
+    """
+
+    def __init__(self, ttl: float = CATALOG_TTL):
+        self.ttl = ttl
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def load(self, tables: Iterable[Tuple[str, str]]):
+        """Fetch column metadata for every (database, table) pair in batched queries."""
+        by_server = {}
+        for database_name, table_name in set(tables):
+            by_server.setdefault(server_key(database_name), []).append(
+                (database_name, table_name)
+            )
+
+        for server_tables in by_server.values():
+            columns = {key: {} for key in server_tables}
+            with get_connection(server_tables[0][0]) as connection, span(
+                "catalog_columns", "db", tables=len(server_tables)
+            ):
+                if isinstance(connection, sqlite3.Connection):
+                    rows = self._sqlite_rows(connection, server_tables)
+                else:
+                    rows = self._information_schema_rows(connection, server_tables)
+                record(rows=len(rows))
+
+            for row in rows:
+                key = (row[0], row[1])
+                columns.setdefault(key, {})[row[2]] = {
+                    "data_type": row[3],
+                    "column_type": row[4],
+                    "max_length": row[5],
+                    "precision": row[6],
+                    "scale": row[7],
+                    "nullable": row[8] == "YES",
+                    "position": row[9],
+                }
+
+            loaded_at = time.monotonic()
+            with self._lock:
+                for key, table_columns in columns.items():
+                    self._tables[key] = (loaded_at, table_columns)
+
+    @staticmethod
+    def _information_schema_rows(connection, tables):
+        placeholders = ", ".join(["(%s, %s)"] * len(tables))
+        params = [value for pair in tables for value in pair]
+        cursor = connection.cursor()
+        try:
+            cursor.execute(_COLUMNS_QUERY.format(placeholders=placeholders), params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _sqlite_rows(connection, tables):
+        # SQLite stand-in: no INFORMATION_SCHEMA, so read each table's pragma.
+        rows = []
+        for database_name, table_name in tables:
+            cursor = connection.execute(f"PRAGMA table_info('{table_name}')")
+            for cid, name, column_type, notnull, _, _ in cursor.fetchall():
+                column_type = column_type.lower()
+                rows.append(
+                    (
+                        database_name,
+                        table_name,
+                        name,
+                        column_type.split("(")[0],
+                        column_type,
+                        None,
+                        None,
+                        None,
+                        "NO" if notnull else "YES",
+                        cid + 1,
+                    )
+                )
+        return rows
+
+    def get_table(self, database_name: str, table_name: str) -> dict:
+        """Column name -> metadata for a table, loading it when missing or expired."""
+        key = (database_name, table_name)
+        with self._lock:
+            entry = self._tables.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.load([key])
+            with self._lock:
+                entry = self._tables[key]
+        return entry[1]
+
+    def get_schema(self, database_name: str, table_name: str) -> dict:
+        """Column name -> SQL column type (e.g. "varchar(50)", "decimal(10,2)")."""
+        return {
+            column: meta["column_type"]
+            for column, meta in self.get_table(database_name, table_name).items()
+        }
+
+    def table_version(self, database_name: str, table_name: str) -> str:
+        """Short hash of a table's column definitions; changes after any DDL."""
+        payload = json.dumps(
+            self.get_table(database_name, table_name), sort_keys=True, default=str
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+    def invalidate(
+        self, database_name: Optional[str] = None, table_name: Optional[str] = None
+    ):
+        """Forget cached metadata for one table, one database or everything."""
+        with self._lock:
+            if database_name is None:
+                self._tables.clear()
+                return
+            for key in list(self._tables):
+                if key[0] == database_name and table_name in (None, key[1]):
+                    del self._tables[key]
+
+
+_catalog = SchemaCatalog()
+
+
+def get_catalog() -> SchemaCatalog:
+    return _catalog
+
+
+def load_mapping_tables(mapping_path: str):
+    """Warm the catalog with every table named in a mapping.json file in one pass."""
+    with open(mapping_path, "r") as file:
+        mapping = json.load(file)
+    tables = [
+        (entry.get("database_name"), entry.get("table_name"))
+        for entry in mapping.values()
+        if entry.get("database_name") and entry.get("table_name")
+    ]
+    if tables:
+        _catalog.load(tables)
+
+
+def run_ddl(database_name: str, table_name: str, statement: str):
+    """
+    Execute a DDL statement against the target and invalidate the table's
+    metadata and every cached crew decision made against it.
+    """
+    with get_connection(database_name) as connection, span(
+        "ddl", "db", database=database_name, sql=statement
+    ):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+        connection.commit()
+    _catalog.invalidate(database_name, table_name)
+    get_decision_cache().invalidate_table(database_name, table_name)
@@ -3,6 +3,9 @@ import pandas as pd
 from crewai.tools import BaseTool
 from typing import Type, Union
 
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.tracing import traced
+
 
 class SchemaMappingToolInput(BaseModel):
     df: Union[pd.DataFrame, dict] = Field(..., description="The input data to map")
@@ -15,6 +18,8 @@ class SchemaMappingTool(BaseTool):
     description: str = "Maps an input dataframe (or dict) with unknown schema to a standard sales schema."
     args_schema: Type[BaseModel] = SchemaMappingToolInput
 
+    @traced()
+    @compact_payload
     def _run(self, df: Union[pd.DataFrame, dict]) -> pd.DataFrame:
         if isinstance(df, dict):
             df = pd.DataFrame(df)
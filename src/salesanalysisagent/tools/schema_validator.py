@@ -1,15 +1,32 @@
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-import mysql.connector
 import pandas as pd
-from crewai.tools import BaseTool
+
+from salesanalysisagent.tools.db_pool import get_connection
+from salesanalysisagent.tools.multipart_reader import iter_raw_chunks
+from salesanalysisagent.tools.schema_catalog import get_catalog
+from salesanalysisagent.tools.tracing import record, span
+from salesanalysisagent.tools.type_profiler import profile_file, profile_schema
 
 
 def get_schema(csv_file_path, sample_size=100):
     try:
-        df = pd.read_csv(csv_file_path, nrows=sample_size)
-        schema = dict(df.dtypes.apply(lambda dt: dt.name))
+        # The sample rows are the raw head of the file (first chunk only, no
+        # full parse). Types come from a streaming scan of the whole file,
+        # not the sample, so a late "3A" in an integer column still shows up.
+        # The profile (with first offending rows) is kept in
+        # df.attrs["type_profile"].
+        chunks = iter_raw_chunks(csv_file_path, max_memory_mb=1)
+        try:
+            first = next(chunks, None)
+        finally:
+            chunks.close()
+        df = first.head(sample_size) if first is not None else pd.DataFrame()
+        profile = profile_file(csv_file_path)
+        schema = profile_schema(profile)
+        df.attrs["type_profile"] = profile
         return df, schema
 
     except Exception as e:
@@ -18,53 +35,51 @@ def get_schema(csv_file_path, sample_size=100):
 
 
 def get_target_data_and_sample(
-    username: str,
-    password: str,
-    host: str,
     table_name: str,
     database_name: str,
+    username: str = None,
+    password: str = None,
+    host: str = None,
 ):
     """
-    Connects to a MySQL database and returns 10 sample rows from the specified table and its schema.
+    Borrows a pooled connection to the target database and returns 10 sample rows from the specified table and its schema.
 
     Args:
-        username (str): MySQL username
-        password (str): MySQL password
-        host (str): MySQL host (e.g., '127.0.0.1')
-        table (str): Table to query
-        database (str): Database name (default: 'pos_data')
+        table_name (str): Table to query
+        database_name (str): Database name, also used to pick the connection route
+        username (str): MySQL username (default: pool configuration)
+        password (str): MySQL password (default: pool configuration)
+        host (str): MySQL host (default: pool configuration)
 
     Returns:
         df (pd.DataFrame): Sample data (10 rows)
         schema (dict): Column name -> dtype
     """
     try:
-        connection = mysql.connector.connect(
-            host=host, database=database_name, user=username, password=password
-        )
-
-        if connection.is_connected():
+        with get_connection(
+            database_name, host=host, user=username, password=password
+        ) as connection:
             cursor = connection.cursor()
-            query = f"SELECT * FROM {table_name} LIMIT 10"
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            column_names = [i[0] for i in cursor.description]
+            try:
+                query = f"SELECT * FROM {table_name} LIMIT 10"
+                with span("sample_rows", "db", database=database_name, sql=query):
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                    record(rows=len(rows))
+                column_names = [i[0] for i in cursor.description]
+            finally:
+                cursor.close()
 
-            # Load into DataFrame
-            df = pd.DataFrame(rows, columns=column_names)
-            schema = dict(df.dtypes)
+        # Load into DataFrame
+        df = pd.DataFrame(rows, columns=column_names)
+        schema = dict(df.dtypes)
 
-            return df, schema
+        return df, schema
 
     except Exception as e:
         print("Failed to connect or fetch data:", e)
         return None, None
 
-    finally:
-        if connection.is_connected():
-            cursor.close()
-            connection.close()
-
 
 def get_target_info(file_name, json_file_path="mapping.json"):
     try:
@@ -99,6 +114,29 @@ def map_dtype_to_sql(dtype: str) -> str:
     return "TEXT"
 
 
+def type_family(dtype) -> str:
+    """
+    Coarse type family shared by pandas dtypes and SQL column types, so a
+    pandas source schema can be diffed against catalog SQL types
+    (int64 ~ bigint, float64 ~ decimal(10,2), object ~ varchar(50), ...).
+    """
+    name = str(dtype).lower()
+    if "bool" in name or name.startswith("tinyint(1)"):
+        return "boolean"
+    if any(t in name for t in ("datetime", "timestamp", "date", "time", "year")):
+        return "datetime"
+    if "int" in name:
+        return "integer"
+    if any(t in name for t in ("float", "double", "decimal", "numeric", "real")):
+        return "decimal"
+    if any(
+        t in name
+        for t in ("char", "text", "object", "str", "enum", "set", "category", "json")
+    ):
+        return "string"
+    return name
+
+
 def compare_schemas(source, target):
 
     only_in_source = [col for col in source if col not in target]
@@ -107,7 +145,7 @@ def compare_schemas(source, target):
     type_mismatches = {
         col: (source[col], target[col])
         for col in source
-        if col in target and source[col] != target[col]
+        if col in target and type_family(source[col]) != type_family(target[col])
     }
 
     return {
@@ -117,48 +155,126 @@ def compare_schemas(source, target):
     }
 
 
-class SchemaValidatorTool(BaseTool):
-    name: str = "schema_validator"
-    description: str = (
-        "Validates the schema of a CSV file against a target database table using a mapping file, and generates SQL to fix mismatches."
+def validate_schema(file_path: str, sample_target: bool = True) -> dict:
+    """
+    Diff the source file's schema against its target table from mapping.json.
+    Target rows are only sampled with sample_target, or when the catalog
+    cannot provide the target schema.
+
+    Returns:
+        dict: Target database/table, schema difference, target schema, type
+        widenings found in the source and sample rows from both sides.
+    """
+    print(f"file path = {file_path}")
+    # source_schema = dict(df.dtypes.apply(lambda dt: dt.name))
+    source_df, source_schema = get_schema(file_path)
+    db_name, table_name = get_target_info(os.path.basename(file_path))
+    # Real SQL column types from INFORMATION_SCHEMA; the sampled
+    # dtypes are only a fallback when the catalog is unavailable.
+    try:
+        target_schema = get_catalog().get_schema(db_name, table_name)
+    except Exception as e:
+        print(f"Schema catalog unavailable, using sampled dtypes: {e}")
+        target_schema = {}
+    target_df = sampled_schema = None
+    if sample_target or not target_schema:
+        target_df, sampled_schema = get_target_data_and_sample(
+            database_name=db_name,
+            table_name=table_name,
+        )
+    target_schema = target_schema or sampled_schema or {}
+    schema_diff = compare_schemas(source_schema, target_schema)
+
+    return {
+        "database_name": db_name,
+        "table_name": table_name,
+        "schema_difference": schema_diff,
+        "target_schema": target_schema,
+        "source_type_widenings": {
+            col: info["widenings"]
+            for col, info in source_df.attrs["type_profile"]["columns"].items()
+            if info["widenings"]
+        },
+        "source_data": source_df,
+        "target_data": target_df,
+        "target_database_type": "mysql",
+    }
+
+
+def has_drift(schema_diff: dict) -> bool:
+    return any(
+        schema_diff.get(key)
+        for key in ("only_in_source", "only_in_target", "type_mismatches")
     )
 
-    # def _run(self, df: pd.DataFrame, file_path: str, **kwargs) -> str:
-    def _run(self, file_path: str, **kwargs) -> str:
-        try:
-            print(f"file path = {file_path}")
-            # source_schema = dict(df.dtypes.apply(lambda dt: dt.name))
-            source_df, source_schema = get_schema(file_path)
-            db_name, table_name = get_target_info(os.path.basename(file_path))
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            print(f"script_dir = {script_dir}")
-            dir_name = os.path.dirname(file_path)
-            target_df, target_schema = get_target_data_and_sample(
-                host="127.0.0.1",
-                username="root",
-                password="password",
-                database_name=db_name,
-                table_name=table_name,
-            )
-            # target_df, target_schema = get_schema(
-            #     os.path.join(dir_name, table_name)
-            #     # os.path.join(script_dir, "../data/extra_column", table_name)
-            # )
-            schema_diff = compare_schemas(source_schema, target_schema)
-
-            # return (
-            #     db_name,
-            #     table_name,
-            #     schema_diff,
-            # )
-            return {
-                "database_name": db_name,
-                "table_name": table_name,
-                "schema_difference": schema_diff,
-                "source_data": source_df,
-                "target_data": target_df,
-                "target_database_type": "mysql",
-            }
-
-        except Exception as e:
-            return f"Error while validating schema: {str(e)}"
+
+def discover_feeds(root: str, json_file_path="mapping.json") -> list:
+    """Every file under root whose name is a feed in mapping.json, in path order."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(script_dir, "../", "data", json_file_path), "r") as file:
+        feed_names = set(json.load(file))
+
+    feeds = []
+    for dir_path, _, file_names in os.walk(root):
+        feeds.extend(
+            os.path.join(dir_path, name) for name in file_names if name in feed_names
+        )
+    return sorted(feeds)
+
+
+def _source_schema(file_path: str):
+    # Worker side: only the streaming type scan. Nothing is parsed into a
+    # frame or written to the columnar cache from the pool processes.
+    try:
+        return profile_schema(profile_file(file_path))
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+
+
+def validate_feeds(file_paths: list, max_workers: int = None) -> dict:
+    """
+    Diff many feeds at once without the LLM: source types are profiled across
+    a process pool and every target table is read from the catalog in one
+    batched metadata query.
+
+    Returns:
+        report (dict): {"checked": n, "drifted": [paths], "feeds": {path: result}}
+    """
+    if not file_paths:
+        return {"checked": 0, "drifted": [], "feeds": {}}
+
+    workers = max(1, min(len(file_paths), max_workers or os.cpu_count() or 1))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        source_schemas = list(pool.map(_source_schema, file_paths))
+
+    targets = {path: get_target_info(os.path.basename(path)) for path in file_paths}
+    catalog = get_catalog()
+    catalog.load([target for target in targets.values() if all(target)])
+
+    feeds = {}
+    drifted = []
+    for path, source_schema in zip(file_paths, source_schemas):
+        db_name, table_name = targets[path]
+        if source_schema is None:
+            feeds[path] = {"error": "Could not read source file."}
+            drifted.append(path)
+            continue
+        if not (db_name and table_name):
+            feeds[path] = {"error": "No target table in mapping file."}
+            drifted.append(path)
+            continue
+
+        target_schema = catalog.get_schema(db_name, table_name)
+        schema_diff = compare_schemas(source_schema, target_schema)
+        feeds[path] = {
+            "database_name": db_name,
+            "table_name": table_name,
+            "schema_difference": schema_diff,
+            "drifted": has_drift(schema_diff),
+        }
+        if feeds[path]["drifted"]:
+            drifted.append(path)
+
+    return {"checked": len(file_paths), "drifted": drifted, "feeds": feeds}
+
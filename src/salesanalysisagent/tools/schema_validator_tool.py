@@ -0,0 +1,22 @@
+from crewai.tools import BaseTool
+
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.schema_validator import validate_schema
+from salesanalysisagent.tools.tracing import traced
+
+
+class SchemaValidatorTool(BaseTool):
+    name: str = "schema_validator"
+    description: str = (
+        "Validates the schema of a CSV file against a target database table using a mapping file, and generates SQL to fix mismatches."
+    )
+
+    # def _run(self, df: pd.DataFrame, file_path: str, **kwargs) -> str:
+    @traced()
+    @compact_payload
+    def _run(self, file_path: str, **kwargs) -> str:
+        try:
+            return validate_schema(file_path)
+
+        except Exception as e:
+            return f"Error while validating schema: {str(e)}"
@@ -0,0 +1,160 @@
+import re
+from typing import Iterable
+
+import pandas as pd
+
+from salesanalysisagent.tools.file_reader import DEFAULT_CHUNK_MEMORY_MB
+from salesanalysisagent.tools.multipart_reader import (
+    is_multipart,
+    iter_raw_chunks,
+    resolve_input_paths,
+)
+
+CURRENCY_CODES = ("USD", "EUR", "GBP", "INR", "JPY", "CAD", "AUD")
+NULL_SHAPE = "<null>"
+TOP_SHAPES = 20
+
+# Currency codes are swapped for placeholder characters while letter runs are
+# collapsed, so "10.00 USD" keeps its suffix ("9.9 USD") while "aaa" -> "a".
+_CODE_MARKERS = {code: chr(0xE000 + i) for i, code in enumerate(CURRENCY_CODES)}
+_CODES_PATTERN = r"(?<![A-Za-z])(" + "|".join(CURRENCY_CODES) + r")(?![A-Za-z])"
+# One number with optional prefix / suffix text: "$9,999.99", "a-999", "99 USD".
+_NUMBER_SHAPE = re.compile(r"[^9]*9+(?:,999)*(?:\.9+)?[^9]*")
+
+
+def shape_signatures(values: pd.Series) -> pd.Series:
+    """
+    Vectorised shape of each value: digits -> "9" (run lengths kept), letter
+    runs -> "a", whitespace runs -> " ", punctuation and currency codes kept
+    as-is. "$10.00" -> "$99.99", " 10.00 USD" -> " 99.99 USD",
+    "2024/03/01" -> "9999/99/99", "01/03/2024" -> "99/99/9999".
+    """
+    shapes = values.astype(str)
+    shapes = shapes.str.replace(r"\d", "9", regex=True)
+    shapes = shapes.str.replace(
+        _CODES_PATTERN, lambda m: _CODE_MARKERS[m.group(1)], regex=True
+    )
+    shapes = shapes.str.replace(r"[A-Za-z]+", "a", regex=True)
+    shapes = shapes.str.replace(r"\s+", " ", regex=True)
+    for code, marker in _CODE_MARKERS.items():
+        shapes = shapes.str.replace(marker, code, regex=False)
+    return shapes
+
+
+def relaxed_shape(shape: str) -> str:
+    """
+    shape without digit run lengths when it is a single number (amounts,
+    counts, ids), so "9.99" and "999.99" are one layout while date layouts
+    such as "9999-99-99" and "99-99-9999" stay apart.
+    """
+    if _NUMBER_SHAPE.fullmatch(shape):
+        return re.sub("9+(?:,999)*", "9", shape)
+    return shape
+
+
+def _add_chunk(column_state: dict, values: pd.Series):
+    counts = values.value_counts(dropna=False)
+    if counts.empty:
+        return
+    uniques = counts.index.to_series(index=range(len(counts)))
+    null_mask = uniques.isna() | (uniques.astype(str).str.strip() == "")
+    shapes = shape_signatures(uniques)
+    shapes[null_mask.values] = NULL_SHAPE
+
+    by_shape = pd.Series(counts.values).groupby(shapes.values).sum()
+    first_values = pd.Series(uniques.values, index=shapes.values)
+    first_values = first_values[~first_values.index.duplicated()]
+    histogram = column_state["shapes"]
+    examples = column_state["examples"]
+    for shape, count in by_shape.items():
+        histogram[shape] = histogram.get(shape, 0) + int(count)
+        if shape not in examples:
+            examples[shape] = str(first_values[shape])
+
+
+def profile_shape_chunks(chunks: Iterable[pd.DataFrame]) -> dict:
+    """
+    Shape histograms over every row of a chunk stream. Signatures are only
+    computed for the distinct values of each chunk, so cost follows
+    cardinality rather than row count.
+    """
+    columns = {}
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        for col in chunk.columns:
+            state = columns.setdefault(col, {"shapes": {}, "examples": {}})
+            _add_chunk(state, chunk[col])
+
+    for state in columns.values():
+        state["shapes"] = dict(
+            sorted(state["shapes"].items(), key=lambda item: -item[1])
+        )
+    return {"rows": rows, "columns": columns}
+
+
+def profile_shapes(
+    file_path: str, max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB
+) -> dict:
+    """Shape histograms of a file (or every part behind a directory / glob) as raw text."""
+    return profile_shape_chunks(iter_raw_chunks(file_path, max_memory_mb))
+
+
+def _top(histogram: dict, top: int) -> dict:
+    return dict(list(histogram.items())[:top])
+
+
+def compare_shapes(source: dict, target: dict, top: int = TOP_SHAPES) -> dict:
+    """
+    Compare two shape profiles column by column.
+
+    Returns:
+        dict: Column -> {"source", "target", "new_shapes", "examples", "drift"}
+        for columns present on both sides; drift is True when the source has
+        non-null shapes never seen in the target. Numbers that only differ in
+        magnitude (see relaxed_shape) are not new shapes.
+    """
+    report = {}
+    for col, source_state in source["columns"].items():
+        target_state = target["columns"].get(col)
+        if target_state is None:
+            continue
+        known = {relaxed_shape(shape) for shape in target_state["shapes"]}
+        new_shapes = [
+            shape
+            for shape in source_state["shapes"]
+            if relaxed_shape(shape) not in known and shape != NULL_SHAPE
+        ]
+        report[col] = {
+            "source": _top(source_state["shapes"], top),
+            "target": _top(target_state["shapes"], top),
+            "new_shapes": new_shapes,
+            "examples": {
+                "source": {
+                    shape: source_state["examples"][shape]
+                    for shape in _top(source_state["shapes"], top)
+                },
+                "target": {
+                    shape: target_state["examples"][shape]
+                    for shape in _top(target_state["shapes"], top)
+                },
+            },
+            "drift": bool(new_shapes),
+        }
+    return report
+
+
+def raw_sample(file_path: str, n: int = 10) -> pd.DataFrame:
+    """A few raw (unparsed) rows from the start of a file, for display."""
+    if is_multipart(file_path):
+        file_path = resolve_input_paths(file_path)[0]
+    chunks = iter_raw_chunks(file_path, max_memory_mb=1)
+    first = next(chunks, None)
+    chunks.close()
+    if first is None:
+        return pd.DataFrame()
+    return first.sample(n=min(n, len(first)), random_state=0)
+
+
+def shape_report_for_files(source_path: str, target_path: str) -> dict:
+    return compare_shapes(profile_shapes(source_path), profile_shapes(target_path))
@@ -0,0 +1,126 @@
+import codecs
+import os
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+SAMPLE_BYTES = 64 * 1024
+CANDIDATE_DELIMITERS = (",", "\t", ";", "|")
+_SAMPLE_LINES = 50
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+_OPTIONS_CACHE_SIZE = 1024
+_options_cache = OrderedDict()
+_options_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ReadOptions:
+    """How to parse a delimited text file in a single pass."""
+
+    encoding: str = "utf-8"
+    delimiter: str = ","
+    header_row: int = 0
+    skipinitialspace: bool = False
+
+    def to_read_csv_kwargs(self) -> dict:
+        return {
+            "encoding": self.encoding,
+            "sep": self.delimiter,
+            "skiprows": self.header_row,
+            "skipinitialspace": self.skipinitialspace,
+        }
+
+
+def _detect_encoding(head: bytes) -> str:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the sample boundary is fine.
+        if e.start >= len(head) - 3:
+            return "utf-8"
+        return "latin-1"
+
+
+def _detect_delimiter(lines) -> str:
+    header = lines[0]
+    best, best_score = ",", (-1, -1)
+    for delimiter in CANDIDATE_DELIMITERS:
+        header_count = header.count(delimiter)
+        if header_count == 0:
+            continue
+        # Score by how many rows agree with the header's field count first,
+        # then by the number of fields.
+        counts = Counter(line.count(delimiter) for line in lines)
+        score = (counts[header_count], header_count)
+        if score > best_score:
+            best, best_score = delimiter, score
+    return best
+
+
+def sniff(file_path: str, sample_bytes: int = SAMPLE_BYTES) -> ReadOptions:
+    """
+    Detect encoding, delimiter, header row offset and whether fields carry
+    padding after the delimiter by looking only at the first sample_bytes of
+    the file. Results for the last _OPTIONS_CACHE_SIZE files are cached per
+    path + mtime + size.
+    """
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    with _options_lock:
+        options = _options_cache.get(cache_key)
+        if options is not None:
+            _options_cache.move_to_end(cache_key)
+            return options
+
+    with open(file_path, "rb") as f:
+        head = f.read(sample_bytes)
+
+    encoding = _detect_encoding(head)
+    text = head.decode(encoding, errors="ignore")
+    lines = text.splitlines()
+    if len(head) == sample_bytes and len(lines) > 1:
+        lines = lines[:-1]  # last line is probably truncated
+
+    header_row = 0
+    while header_row < len(lines) and not lines[header_row].strip():
+        header_row += 1
+
+    sample = [line for line in lines[header_row:] if line.strip()][:_SAMPLE_LINES]
+    if not sample:
+        options = ReadOptions(encoding=encoding, header_row=header_row)
+    else:
+        delimiter = _detect_delimiter(sample)
+        padded = any(
+            field.startswith((" ", "\t")) and delimiter != "\t"
+            for line in sample
+            for field in line.split(delimiter)[1:]
+        )
+        options = ReadOptions(
+            encoding=encoding,
+            delimiter=delimiter,
+            header_row=header_row,
+            skipinitialspace=padded,
+        )
+
+    with _options_lock:
+        _options_cache[cache_key] = options
+        if len(_options_cache) > _OPTIONS_CACHE_SIZE:
+            _options_cache.popitem(last=False)
+    return options
+
+
+def read_csv_kwargs(file_path: str, **overrides) -> dict:
+    """Sniffed pd.read_csv options for file_path, with explicit overrides applied."""
+    kwargs = sniff(file_path).to_read_csv_kwargs()
+    kwargs.update(overrides)
+    return kwargs
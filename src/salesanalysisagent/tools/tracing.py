@@ -0,0 +1,368 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+# Opt-in: a traced run writes its spans under SALES_AGENT_TRACE_DIR.
+TRACING_ENABLED = os.environ.get("SALES_AGENT_TRACING", "0") != "0"
+# tracemalloc hooks every allocation and slows pandas parsing several times
+# over, so peak memory per span is opt-in.
+TRACE_MEMORY = os.environ.get("SALES_AGENT_TRACE_MEMORY", "0") != "0"
+TRACE_DIR = os.environ.get("SALES_AGENT_TRACE_DIR", "traces")
+
+_COUNTERS = ("rows", "bytes", "prompt_tokens", "completion_tokens")
+
+
+class Span:
+    """One timed operation (tool call, LLM call, DB query, ...)."""
+
+    def __init__(self, name: str, category: str, parent: Optional["Span"], attrs):
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.attrs = dict(attrs)
+        self.counts = {}
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.start_epoch = time.time()
+        self.cpu_start = time.thread_time()
+        self.wall_s = None
+        self.cpu_s = None
+        self.mem_start = 0
+        self.mem_peak = 0
+        self.error = None
+
+    def add(self, **counts):
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "category": self.category,
+            "parent": self.parent.name if self.parent else None,
+            "thread": self.thread_id,
+            "start": self.start_epoch,
+            "wall_ms": round(self.wall_s * 1000, 3),
+            "cpu_ms": round(self.cpu_s * 1000, 3),
+            "peak_mem_mb": round(max(self.mem_peak - self.mem_start, 0) / 2**20, 3),
+            "error": self.error,
+            **self.counts,
+            **self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects nested spans per thread. Peak memory (SALES_AGENT_TRACE_MEMORY=1)
+    comes from tracemalloc and is process-wide, so spans running concurrently
+    share their peaks; tracing memory starts with the first open span and
+    stops when the last one closes.
+    """
+
+    def __init__(self):
+        self.spans = []
+        self._open = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tracing_memory = False
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current(self) -> Optional[Span]:
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _bubble_peak(self):
+        # Called under the lock: credit the peak so far to every open span
+        # before resetting it for the next measurement window.
+        if not tracemalloc.is_tracing():
+            return 0
+        current, peak = tracemalloc.get_traced_memory()
+        for span in self._open:
+            span.mem_peak = max(span.mem_peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def start_span(
+        self, name: str, category: str, parent: Optional[Span] = None, **attrs
+    ) -> Span:
+        span = Span(name, category, parent or self.current(), attrs)
+        with self._lock:
+            if TRACE_MEMORY and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing_memory = True
+            span.mem_start = self._bubble_peak()
+            span.mem_peak = span.mem_start
+            self._open.append(span)
+        return span
+
+    def end_span(self, span: Span, error: Optional[BaseException] = None):
+        span.wall_s = time.perf_counter() - span.start
+        if span.thread_id == threading.get_ident():
+            span.cpu_s = time.thread_time() - span.cpu_start
+        else:
+            span.cpu_s = 0.0
+        if error is not None:
+            span.error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self._bubble_peak()
+            if span in self._open:
+                self._open.remove(span)
+            self.spans.append(span)
+            if not self._open and self._tracing_memory:
+                # Only stop what this tracer started.
+                tracemalloc.stop()
+                self._tracing_memory = False
+
+    @contextmanager
+    def span(self, name: str, category: str, **attrs):
+        if not TRACING_ENABLED:
+            yield None
+            return
+        span = self.start_span(name, category, **attrs)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            stack.pop()
+            self.end_span(span, e)
+            raise
+        stack.pop()
+        self.end_span(span)
+
+    def record(self, **counts):
+        """Add rows / bytes / token counts to the innermost open span of this thread."""
+        span = self.current()
+        if span is not None:
+            span.add(**counts)
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self._open = []
+            if self._tracing_memory:
+                tracemalloc.stop()
+                self._tracing_memory = False
+
+    def export_jsonl(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def export_chrome(self, path: str):
+        """Chrome trace-event format, viewable in chrome://tracing or Perfetto."""
+        events = []
+        for span in self.spans:
+            details = span.to_dict()
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start_epoch * 1e6,
+                    "dur": span.wall_s * 1e6,
+                    "pid": os.getpid(),
+                    "tid": span.thread_id,
+                    "args": {
+                        key: value
+                        for key, value in details.items()
+                        if key not in ("name", "category", "thread", "start")
+                    },
+                }
+            )
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events}, f, default=str)
+
+    def export(self, label: str, directory: str = TRACE_DIR) -> str:
+        """Write <directory>/<timestamp>-<label>.jsonl and .trace.json; returns the stem."""
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        stem = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe}")
+        self.export_jsonl(stem + ".jsonl")
+        self.export_chrome(stem + ".trace.json")
+        return stem
+
+    def summary(self) -> list:
+        """Spans aggregated by category and name, slowest first."""
+        rows = {}
+        for span in self.spans:
+            row = rows.setdefault(
+                (span.category, span.name),
+                {
+                    "category": span.category,
+                    "name": span.name,
+                    "calls": 0,
+                    "wall_ms": 0.0,
+                    "cpu_ms": 0.0,
+                    "peak_mem_mb": 0.0,
+                    **{key: 0 for key in _COUNTERS},
+                },
+            )
+            details = span.to_dict()
+            row["calls"] += 1
+            row["wall_ms"] += details["wall_ms"]
+            row["cpu_ms"] += details["cpu_ms"]
+            row["peak_mem_mb"] = max(row["peak_mem_mb"], details["peak_mem_mb"])
+            for key in _COUNTERS:
+                row[key] += span.counts.get(key, 0)
+        return sorted(rows.values(), key=lambda row: -row["wall_ms"])
+
+    def format_summary(self) -> str:
+        header = (
+            f"{'category':<8} {'name':<32} {'calls':>5} {'wall ms':>10} "
+            f"{'cpu ms':>10} {'peak MB':>8} {'rows':>10} {'bytes':>12} "
+            f"{'prompt tk':>9} {'compl tk':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['category']:<8} {row['name'][:32]:<32} {row['calls']:>5} "
+                f"{row['wall_ms']:>10.1f} {row['cpu_ms']:>10.1f} "
+                f"{row['peak_mem_mb']:>8.1f} {row['rows']:>10} {row['bytes']:>12} "
+                f"{row['prompt_tokens']:>9} {row['completion_tokens']:>9}"
+            )
+        return "\n".join(lines)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, category: str, **attrs):
+    return _tracer.span(name, category, **attrs)
+
+
+def record(**counts):
+    _tracer.record(**counts)
+
+
+def traced(category: str = "tool", name: Optional[str] = None):
+    """
+    Decorator: run the function inside a span. For tool _run methods the
+    span is named after the tool (self.name).
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span_name = name
+            if span_name is None:
+                owner = args[0] if args else None
+                span_name = getattr(owner, "name", None) or func.__qualname__
+            with _tracer.span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+_llm_spans = {}
+_listening = False
+
+
+def listen_to_crewai():
+    """
+    Open a span for every crewAI LLM call and task via the event bus. Token
+    counts are estimated from the messages and the response text.
+    """
+    global _listening
+    if _listening or not TRACING_ENABLED:
+        return
+    try:
+        from crewai.events import (
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+    except ImportError:
+        from crewai.utilities.events import (
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+            TaskCompletedEvent,
+            TaskFailedEvent,
+            TaskStartedEvent,
+            crewai_event_bus,
+        )
+    from salesanalysisagent.tools.payload import estimate_tokens
+
+    def open_span(key, name, category, **attrs):
+        span = _tracer.start_span(name, category, **attrs)
+        _tracer._stack().append(span)
+        _llm_spans[key] = span
+        return span
+
+    def close_span(key, error=None):
+        span = _llm_spans.pop(key, None)
+        if span is None:
+            return None
+        stack = _tracer._stack()
+        if span in stack:
+            stack.remove(span)
+        _tracer.end_span(span, error)
+        return span
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        span = open_span(
+            ("llm", threading.get_ident(), id(source)),
+            f"llm {event.model or getattr(source, 'model', '')}",
+            "llm",
+        )
+        span.add(prompt_tokens=estimate_tokens(json.dumps(event.messages, default=str)))
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        span = close_span(("llm", threading.get_ident(), id(source)))
+        if span is not None:
+            span.add(completion_tokens=estimate_tokens(str(event.response)))
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        close_span(
+            ("llm", threading.get_ident(), id(source)), RuntimeError(event.error)
+        )
+
+    @crewai_event_bus.on(TaskStartedEvent)
+    def on_task_started(source, event):
+        task = getattr(event, "task", None) or source
+        agent = getattr(task, "agent", None)
+        open_span(
+            ("task", threading.get_ident(), id(task)),
+            getattr(task, "name", None) or "task",
+            "task",
+            agent=getattr(agent, "role", None),
+        )
+
+    @crewai_event_bus.on(TaskCompletedEvent)
+    def on_task_completed(source, event):
+        task = getattr(event, "task", None) or source
+        close_span(("task", threading.get_ident(), id(task)))
+
+    @crewai_event_bus.on(TaskFailedEvent)
+    def on_task_failed(source, event):
+        task = getattr(event, "task", None) or source
+        close_span(
+            ("task", threading.get_ident(), id(task)), RuntimeError(event.error)
+        )
+
+    _listening = True
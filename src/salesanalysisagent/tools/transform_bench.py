@@ -0,0 +1,457 @@
+import ast
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from multiprocessing.connection import wait
+from typing import List, Optional
+
+import pandas as pd
+
+from salesanalysisagent.tools.multipart_reader import iter_raw_chunks
+from salesanalysisagent.tools.transform_registry import (
+    compile_blocks,
+    extract_code_blocks,
+)
+
+BENCH_ROWS = int(os.environ.get("SALES_AGENT_BENCH_ROWS", "1000000"))
+MIN_ROWS_PER_SEC = float(os.environ.get("SALES_AGENT_BENCH_MIN_ROWS_PER_SEC", "200000"))
+# Candidates must also reach this fraction of the throughput of a vectorised
+# reference pass over the same frame, timed in the same worker.
+RELATIVE_FLOOR = float(os.environ.get("SALES_AGENT_BENCH_RELATIVE_FLOOR", "0.02"))
+BENCH_TIMEOUT_S = float(os.environ.get("SALES_AGENT_BENCH_TIMEOUT", "60"))
+BENCH_MEMORY_MB = int(os.environ.get("SALES_AGENT_BENCH_MEMORY_MB", "4096"))
+BENCH_WORKERS = int(os.environ.get("SALES_AGENT_BENCH_WORKERS", "2"))
+
+# Distinct raw rows the synthetic input is resampled from.
+SEED_ROWS = 10_000
+DEFAULT_FUNCTIONS = ("fix_data_format_change", "cast_columns")
+
+# Row-wise idioms named in the hint of a function that misses the floor; the
+# measured throughput alone decides whether it passes.
+_APPLY_ROWS = "row-wise .apply(axis=1)"
+_ROW_LOOPS = "iterrows / itertuples loops"
+_CELL_LOOPS = "scalar .at / .iat access in a loop"
+_ROW_WISE = (_APPLY_ROWS, _ROW_LOOPS, _CELL_LOOPS)
+
+
+def _is_row_apply(node: ast.Call) -> bool:
+    return node.func.attr == "apply" and any(
+        keyword.arg == "axis"
+        and isinstance(keyword.value, ast.Constant)
+        and keyword.value.value in (1, "columns")
+        for keyword in node.keywords
+    )
+
+
+def row_wise_patterns(source: str) -> List[str]:
+    """Row-wise idioms found in a function's source, for the feedback message."""
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return []
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+            if node.func.attr in ("iterrows", "itertuples"):
+                found.add(_ROW_LOOPS)
+            elif _is_row_apply(node):
+                found.add(_APPLY_ROWS)
+        elif isinstance(node, (ast.For, ast.While)):
+            for inner in ast.walk(node):
+                if (
+                    isinstance(inner, ast.Subscript)
+                    and isinstance(inner.value, ast.Attribute)
+                    and inner.value.attr in ("at", "iat")
+                ):
+                    found.add(_CELL_LOOPS)
+    return [label for label in _ROW_WISE if label in found]
+
+
+def defined_functions(source: str) -> dict:
+    """Top-level function name -> its source."""
+    return {
+        node.name: ast.get_source_segment(source, node)
+        for node in ast.parse(source).body
+        if isinstance(node, ast.FunctionDef)
+    }
+
+
+def seed_sample(file_path: str, rows: int = SEED_ROWS) -> pd.DataFrame:
+    """Up to rows raw (string) rows from the start of a feed."""
+    chunks = iter_raw_chunks(file_path)
+    first = next(chunks, None)
+    chunks.close()
+    if first is None:
+        raise ValueError(f"No rows in {file_path}")
+    if len(first) > rows:
+        first = first.sample(n=rows, random_state=0)
+    return first.reset_index(drop=True)
+
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def _proc_status_bytes(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _start_peak_rss() -> Optional[int]:
+    """
+    Reset the RSS high-water mark (Linux) and return the current RSS, so the
+    peak after the call is what the call itself added. Elsewhere falls back
+    to ru_maxrss, which may already sit above what the call needs.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return _proc_status_bytes("VmRSS")
+    except OSError:
+        return _peak_rss_bytes()
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    peak = _proc_status_bytes("VmHWM")
+    if peak is not None:
+        return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _limit_resources(memory_mb: int, timeout_s: float):
+    # Unix only: allow memory_mb of address space on top of what the worker
+    # already maps, and raise TimeoutError once the candidate runs too long.
+    # Elsewhere only the parent's timeout applies.
+    try:
+        import resource
+
+        limit = _address_space_bytes() + memory_mb * 1024 * 1024
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+    try:
+        import signal
+
+        def on_timeout(signum, frame):
+            raise TimeoutError(f"no result after {timeout_s:.0f} s")
+
+        signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    except (ImportError, AttributeError, ValueError):
+        pass
+
+
+def _baseline_rows_per_sec(df: pd.DataFrame) -> Optional[float]:
+    """Throughput of one vectorised string pass over every column of df."""
+    start = time.perf_counter()
+    for col in df.columns:
+        df[col].astype(str).str.strip()
+    seconds = time.perf_counter() - start
+    return len(df) / seconds if seconds else None
+
+
+def _run_candidate(
+    source: str,
+    function_name: str,
+    seed: pd.DataFrame,
+    rows: int,
+    kwargs: dict,
+    memory_mb: int,
+    timeout_s: float,
+) -> dict:
+    """Worker: time one function over a resampled copy of seed."""
+    result = {"function": function_name, "rows": rows, "error": None}
+    workdir = tempfile.mkdtemp(prefix="transform-bench-")
+    # Files the candidate writes land in a scratch directory.
+    os.chdir(workdir)
+    try:
+        df = seed.sample(n=rows, replace=True, random_state=0).reset_index(drop=True)
+        # Limits go on before any candidate code runs, module level included.
+        _limit_resources(memory_mb, timeout_s)
+        namespace = {"__name__": "candidate"}
+        exec(compile(source, "<candidate>", "exec"), namespace)
+        func = namespace.get(function_name)
+        if not callable(func):
+            raise NameError(f"{function_name} is not defined")
+        baseline = _baseline_rows_per_sec(df)
+        # Peak memory comes from the worker's RSS high-water mark, which unlike
+        # tracemalloc does not slow the candidate down.
+        rss_before = _start_peak_rss()
+        start = time.perf_counter()
+        output = func(df, **kwargs)
+        seconds = time.perf_counter() - start
+        rss_after = _peak_rss_bytes()
+        result.update(
+            seconds=round(seconds, 4),
+            rows_per_sec=round(rows / seconds) if seconds else None,
+            baseline_rows_per_sec=round(baseline) if baseline else None,
+            peak_mem_mb=(
+                round((rss_after - rss_before) / 2**20, 1)
+                if rss_before is not None and rss_after is not None
+                else None
+            ),
+            output_rows=len(output) if hasattr(output, "__len__") else None,
+        )
+    except BaseException as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        try:
+            import signal
+
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        except (ImportError, AttributeError):
+            pass
+        os.chdir(tempfile.gettempdir())
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def _run_transform(
+    sources: dict,
+    steps: tuple,
+    entry_point: str,
+    file_path: str,
+    memory_mb: int,
+    timeout_s: float,
+) -> dict:
+    """Worker: chain the steps' entry_point over every raw chunk of file_path."""
+    from salesanalysisagent.tools.schema_validator import type_family
+
+    result = {"rows": 0, "schema": None, "error": None}
+    workdir = tempfile.mkdtemp(prefix="transform-run-")
+    os.chdir(workdir)
+    try:
+        _limit_resources(memory_mb, timeout_s)
+        funcs = []
+        for step in steps:
+            if step not in sources:
+                continue
+            namespace = {"__name__": f"transform_{step}"}
+            exec(compile(sources[step], f"<{step}>", "exec"), namespace)
+            if callable(namespace.get(entry_point)):
+                funcs.append(namespace[entry_point])
+        if not funcs:
+            raise NameError(f"{entry_point} is not defined in {', '.join(sources)}")
+        for chunk in iter_raw_chunks(file_path):
+            for func in funcs:
+                chunk = func(chunk)
+            if not isinstance(chunk, pd.DataFrame):
+                raise TypeError(f"{entry_point} returned {type(chunk).__name__}")
+            schema = {
+                str(col): type_family(dtype) for col, dtype in chunk.dtypes.items()
+            }
+            if result["schema"] is None:
+                result["schema"] = schema
+            elif schema != result["schema"]:
+                raise ValueError(
+                    f"output schema changed after {result['rows']:,} rows: "
+                    f"{result['schema']} -> {schema}"
+                )
+            result["rows"] += len(chunk)
+    except BaseException as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        try:
+            import signal
+
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        except (ImportError, AttributeError):
+            pass
+        os.chdir(tempfile.gettempdir())
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def _isolated_call(sender, target, job):
+    try:
+        outcome = target(*job)
+    except BaseException as e:
+        outcome = e
+    try:
+        sender.send(outcome)
+    except Exception as e:
+        # The outcome (e.g. a custom exception) may not pickle.
+        sender.send(RuntimeError(f"{type(outcome).__name__}: {e}"))
+    finally:
+        sender.close()
+
+
+def run_isolated(
+    target, jobs: List[tuple], timeout_s: float, workers: int = BENCH_WORKERS
+) -> list:
+    """
+    target(*job) for every job, each in a fresh spawned process (at most
+    workers at a time), so nothing a candidate imports, patches or leaks
+    survives into the next one or into the crew's process. A job that raises,
+    dies or has no result timeout_s after it started yields the exception in
+    place of its result; a job still running then is killed, not awaited.
+    """
+    context = multiprocessing.get_context("spawn")
+    outcomes = [None] * len(jobs)
+    pending = list(enumerate(jobs))
+    running = {}
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, workers):
+                index, job = pending.pop(0)
+                receiver, sender = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=_isolated_call, args=(sender, target, job), daemon=True
+                )
+                process.start()
+                sender.close()
+                running[receiver] = (index, process, time.monotonic() + timeout_s)
+
+            next_deadline = min(deadline for _, _, deadline in running.values())
+            for receiver in wait(
+                list(running), max(0, next_deadline - time.monotonic())
+            ):
+                index, process, _ = running.pop(receiver)
+                try:
+                    outcomes[index] = receiver.recv()
+                except EOFError:
+                    # Killed before sending anything, e.g. by the OOM killer.
+                    process.join()
+                    outcomes[index] = RuntimeError(
+                        f"worker exited with code {process.exitcode}"
+                    )
+                receiver.close()
+                process.join()
+
+            now = time.monotonic()
+            for receiver, (index, process, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[receiver]
+                    process.kill()
+                    process.join()
+                    receiver.close()
+                    outcomes[index] = TimeoutError(f"no result after {timeout_s:.0f} s")
+    finally:
+        for receiver, (_, process, _) in running.items():
+            process.kill()
+            process.join()
+            receiver.close()
+    return outcomes
+
+
+def run_transform(
+    sources: dict, steps: tuple, entry_point: str, file_path: str, timeout_s: float
+) -> dict:
+    """
+    Run stored transform code over a whole feed in a sandboxed subprocess
+    (the same limits as the benchmark) instead of importing it here.
+
+    Returns:
+        dict: {"rows", "schema", "error"}; schema maps each output column to
+        its type family.
+    """
+    job = (sources, steps, entry_point, file_path, BENCH_MEMORY_MB, timeout_s)
+    (outcome,) = run_isolated(_run_transform, [job], timeout_s + 60, workers=1)
+    if isinstance(outcome, Exception):
+        error = f"{type(outcome).__name__}: {outcome}"
+        return {"rows": 0, "schema": None, "error": error}
+    return outcome
+
+
+def benchmark_transforms(
+    source: str,
+    file_path: str,
+    function_names: Optional[List[str]] = None,
+    rows: int = BENCH_ROWS,
+    kwargs: Optional[dict] = None,
+    min_rows_per_sec: float = MIN_ROWS_PER_SEC,
+    timeout_s: float = BENCH_TIMEOUT_S,
+) -> dict:
+    """
+    Time candidate transform functions on a synthetic copy of a feed scaled
+    to rows rows, each in its own subprocess with memory and time limits.
+    A function passes when it reaches both min_rows_per_sec and
+    RELATIVE_FLOOR of the vectorised baseline.
+
+    Returns:
+        dict: {"passed", "rows", "min_rows_per_sec", "results"}; every result
+        carries rows_per_sec, baseline_rows_per_sec, peak_mem_mb and error,
+        plus a hint on how to speed the function up when it is rejected.
+    """
+    code = compile_blocks(extract_code_blocks(source), "candidate")
+    if code is None:
+        raise ValueError("No Python code that compiles in the candidate source.")
+    defined = defined_functions(code)
+    names = function_names or [name for name in DEFAULT_FUNCTIONS if name in defined]
+    if not names:
+        raise ValueError(
+            f"None of {', '.join(DEFAULT_FUNCTIONS)} is defined; "
+            f"found {', '.join(defined) or 'no functions'}."
+        )
+    seed = seed_sample(file_path)
+
+    jobs = [
+        (code, name, seed, rows, kwargs or {}, BENCH_MEMORY_MB, timeout_s)
+        for name in names
+    ]
+    # Spawning and importing pandas comes on top of the run itself.
+    outcomes = run_isolated(_run_candidate, jobs, timeout_s + 60)
+    results = []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, TimeoutError):
+            outcome = {"function": name, "rows": rows, "error": "timed out"}
+        elif isinstance(outcome, Exception):
+            error = f"{type(outcome).__name__}: {outcome}"
+            outcome = {"function": name, "rows": rows, "error": error}
+        results.append(outcome)
+
+    for result in results:
+        speed = result.get("rows_per_sec") or 0
+        floor = max(
+            min_rows_per_sec,
+            RELATIVE_FLOOR * (result.get("baseline_rows_per_sec") or 0),
+        )
+        result["passed"] = result["error"] is None and speed >= floor
+        if result["passed"]:
+            continue
+        error = result["error"] or ""
+        if error and not error.startswith(("TimeoutError", "timed out")):
+            result["hint"] = (
+                "The function failed on the scaled-up input; fix the error and "
+                "keep it vectorised."
+            )
+            continue
+        if error:
+            slow = f"It did not finish {rows:,} rows within {timeout_s:.0f} s."
+        else:
+            slow = f"{speed:,} rows/sec is below the {floor:,.0f} rows/sec floor."
+        idioms = row_wise_patterns(defined.get(result["function"]) or "")
+        result["hint"] = (
+            f"{slow} Replace {', '.join(idioms) or 'Python-level loops'} with "
+            "vectorised pandas operations (.str methods, pd.to_numeric, "
+            "pd.to_datetime with an explicit format, np.where) and regenerate."
+        )
+    return {
+        "passed": all(result["passed"] for result in results),
+        "rows": rows,
+        "min_rows_per_sec": min_rows_per_sec,
+        "results": results,
+    }
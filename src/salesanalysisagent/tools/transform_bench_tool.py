@@ -0,0 +1,37 @@
+from typing import Optional, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from salesanalysisagent.tools.payload import compact_payload
+from salesanalysisagent.tools.tracing import traced
+from salesanalysisagent.tools.transform_bench import benchmark_transforms
+
+
+class TransformBenchmarkInput(BaseModel):
+    code: str = Field(..., description="Python source of the generated transform")
+    file_path: str = Field(..., description="Path to the source data file")
+    function_names: Optional[str] = Field(
+        None,
+        description="Comma separated functions to time "
+        "(default: fix_data_format_change, cast_columns)",
+    )
+
+
+class TransformBenchmarkTool(BaseTool):
+    name: str = "transform_benchmark"
+    description: str = (
+        "Times generated pandas transform functions on a scaled-up copy of the source data in an isolated process and reports rows/sec, peak memory and whether they pass the throughput floor, with a hint naming the row-wise idioms to replace. Rewrite and re-run any function that does not pass."
+    )
+    args_schema: Type[BaseModel] = TransformBenchmarkInput
+
+    @traced()
+    @compact_payload
+    def _run(self, code: str, file_path: str, function_names: str = None, **kwargs):
+        try:
+            names = None
+            if function_names:
+                names = [name.strip() for name in function_names.split(",")]
+            return benchmark_transforms(code, file_path, names)
+        except Exception as e:
+            return f"Error benchmarking transform: {str(e)}"
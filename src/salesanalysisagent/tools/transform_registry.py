@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+from salesanalysisagent.tools.columnar_cache import CACHE_DIR, cache_key
+from salesanalysisagent.tools.decision_cache import canonical_json
+
+TRANSFORM_REGISTRY_ENABLED = (
+    os.environ.get("SALES_AGENT_TRANSFORM_REGISTRY", "1") != "0"
+)
+TRANSFORM_DIR = os.environ.get(
+    "SALES_AGENT_TRANSFORM_DIR", os.path.join(CACHE_DIR, "transforms")
+)
+# Seconds a stored transform may take over a whole feed in its sandbox.
+TRANSFORM_TIMEOUT_S = float(os.environ.get("SALES_AGENT_TRANSFORM_TIMEOUT", "600"))
+# Input fingerprints remembered per version as already verified.
+VERIFIED_FILES = int(os.environ.get("SALES_AGENT_TRANSFORM_VERIFIED_FILES", "256"))
+
+# Modules whose fix_data_format_change(source_df) make up a feed's transform,
+# in the order they run: the rule library first, then the LLM's function for
+# the columns the rules left uncovered.
+FORMAT_STEPS = ("rules", "data_format_check_task")
+ENTRY_POINT = "fix_data_format_change"
+
+_FENCE = re.compile(r"^```[ \t]*([\w+-]*)[ \t]*$")
+_PYTHON_FENCES = {"", "python", "python3", "py"}
+
+
+def extract_code_blocks(raw: str) -> List[str]:
+    """
+    Python code blocks of a task output; prose and non-Python fences (sql,
+    json, ...) are dropped. Output without any fence counts as one block.
+    """
+    blocks = []
+    lines = None
+    keep = False
+    for line in raw.splitlines():
+        fence = _FENCE.match(line.strip())
+        if fence and lines is None:
+            lines, keep = [], fence.group(1).lower() in _PYTHON_FENCES
+        elif fence:
+            if keep:
+                blocks.append("\n".join(lines))
+            lines = None
+        elif lines is not None:
+            lines.append(line.rstrip())
+    if not blocks and "```" not in raw:
+        blocks = [raw]
+    return blocks
+
+
+def compile_blocks(blocks: List[str], name: str) -> Optional[str]:
+    """Join the blocks that compile into one module source (None if none do)."""
+    compiled = []
+    for block in blocks:
+        try:
+            compile(block, name, "exec")
+        except SyntaxError as e:
+            print(f"[WARN] Dropping code block from {name}: {str(e)}")
+            continue
+        compiled.append(block.strip())
+    if not compiled:
+        return None
+    return "\n\n\n".join(compiled) + "\n"
+
+
+def schema_fingerprint(
+    schema_diff: dict, target_schema: dict, shapes: Optional[dict]
+) -> str:
+    """Registry key of a feed: its schema diff, the target schema and value shapes."""
+    payload = canonical_json(
+        {
+            "schema_difference": schema_diff,
+            "target_schema": target_schema,
+            "shapes": shapes,
+        }
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def run_steps(sources: Dict[str, str], file_path: str) -> dict:
+    """
+    Chain the FORMAT_STEPS in sources over file_path in a sandboxed
+    subprocess; stored code never runs in the agent's process.
+    """
+    from salesanalysisagent.tools.transform_bench import run_transform
+
+    return run_transform(
+        sources, FORMAT_STEPS, ENTRY_POINT, file_path, TRANSFORM_TIMEOUT_S
+    )
+
+
+class RegisteredTransform:
+    """One stored version: the source of each format step and its output schema."""
+
+    def __init__(
+        self,
+        fingerprint: str,
+        entry: dict,
+        sources: Dict[str, str],
+        registry: Optional["TransformRegistry"] = None,
+    ):
+        self.fingerprint = fingerprint
+        self.version = entry["version"]
+        self.path = entry["path"]
+        self.entry = entry
+        self.sources = sources
+        self.registry = registry
+
+    def task_output(self) -> str:
+        """The steps as a task output: one code block per step, in run order."""
+        steps = [name for name in FORMAT_STEPS if name in self.sources]
+        return "\n\n".join(
+            f"Step {i} ({name}), applied to the output of the step before:\n"
+            f"```python\n{self.sources[name]}```"
+            for i, name in enumerate(steps, 1)
+        )
+
+    def verify(self, file_path: str) -> Optional[str]:
+        """
+        Run the transform over file_path; the first error or an output schema
+        that differs from the one recorded at registration, else None. An
+        input whose content already passed against this version is not run
+        again.
+        """
+        file_key = cache_key(file_path)
+        if file_key in self.entry.get("verified", ()):
+            return None
+        result = run_steps(self.sources, file_path)
+        if result["error"] is not None:
+            return result["error"]
+        if result["schema"] != self.entry.get("output_schema"):
+            return (
+                f"output schema {result['schema']} differs from the registered "
+                f"{self.entry.get('output_schema')}"
+            )
+        if self.registry is not None:
+            self.registry.mark_verified(self, file_key)
+        return None
+
+
+class TransformRegistry:
+    """
+    Compiled transform code per schema fingerprint.
+
+    Each registration writes <directory>/<fingerprint[:16]>/v<n>/<step>.py,
+    one module per FORMAT_STEPS output that had Python code, and points
+    index.json at the newest version with the output schema it produced.
+    The index is held in memory and re-read only when its mtime changes, so
+    a lookup is a stat and a dict access.
+    """
+
+    def __init__(self, directory: str = TRANSFORM_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self._index = {}
+        self._index_mtime = None
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            self._index, self._index_mtime = {}, None
+            return
+        if mtime != self._index_mtime:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self._index = json.load(f)
+            self._index_mtime = mtime
+
+    def _write_index(self):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def lookup(self, fingerprint: str) -> Optional[dict]:
+        with self._lock:
+            self._refresh()
+            return self._index.get(fingerprint)
+
+    def register(
+        self, fingerprint: str, outputs: Dict[str, str], file_path: str, **meta
+    ) -> Optional[dict]:
+        """
+        Store the Python code of the FORMAT_STEPS outputs (step -> raw output;
+        other task outputs are ignored) as the next version for fingerprint,
+        once it ran cleanly over file_path in the sandbox.
+
+        Returns:
+            dict: The index entry, or None when no step had code that compiles
+            or the code failed on file_path.
+        """
+        sources = {}
+        for task_name in FORMAT_STEPS:
+            if task_name not in outputs:
+                continue
+            source = compile_blocks(extract_code_blocks(outputs[task_name]), task_name)
+            if source is not None:
+                sources[task_name] = source
+        if not sources:
+            return None
+        result = run_steps(sources, file_path)
+        if result["error"] is not None:
+            print(f"[WARN] Transform not registered: {result['error']}")
+            return None
+
+        with self._lock:
+            self._refresh()
+            version = self._index.get(fingerprint, {}).get("version", 0) + 1
+            path = os.path.join(self.directory, fingerprint[:16], f"v{version}")
+            os.makedirs(path, exist_ok=True)
+            for task_name, source in sources.items():
+                with open(
+                    os.path.join(path, f"{task_name}.py"), "w", encoding="utf-8"
+                ) as f:
+                    f.write(f"# {task_name}, transform {fingerprint[:16]} v{version}\n")
+                    f.write(source)
+            entry = dict(
+                meta,
+                file_path=file_path,
+                output_schema=result["schema"],
+                verified=[cache_key(file_path)],
+                version=version,
+                path=path,
+                modules=sorted(sources),
+                created=time.time(),
+            )
+            self._index[fingerprint] = entry
+            self._write_index()
+        return entry
+
+    def mark_verified(self, transform: RegisteredTransform, file_key: str):
+        """Remember that file_key ran cleanly on transform's version."""
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(transform.fingerprint)
+            if entry is None or entry["version"] != transform.version:
+                return
+            verified = [key for key in entry.get("verified", []) if key != file_key]
+            entry["verified"] = (verified + [file_key])[-VERIFIED_FILES:]
+            self._write_index()
+            transform.entry = entry
+
+    def load(self, fingerprint: str) -> Optional[RegisteredTransform]:
+        """Read the newest version for fingerprint (memoised per version)."""
+        entry = self.lookup(fingerprint)
+        if entry is None:
+            return None
+        key = (fingerprint, entry["version"])
+        transform = self._loaded.get(key)
+        if transform is None:
+            sources = {}
+            for task_name in entry["modules"]:
+                path = os.path.join(entry["path"], f"{task_name}.py")
+                with open(path, "r", encoding="utf-8") as f:
+                    sources[task_name] = f.read()
+            transform = self._loaded[key] = RegisteredTransform(
+                fingerprint, entry, sources, self
+            )
+        transform.entry = entry
+        return transform
+
+
+_registry = TransformRegistry()
+
+
+def get_transform_registry() -> TransformRegistry:
+    return _registry
@@ -0,0 +1,183 @@
+import os
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import pandas as pd
+
+from salesanalysisagent.tools.dtype_optimizer import infer_date_format
+from salesanalysisagent.tools.file_reader import DEFAULT_CHUNK_MEMORY_MB
+from salesanalysisagent.tools.multipart_reader import (
+    iter_raw_chunks,
+    resolve_input_paths,
+)
+
+# Type lattice: every type can only widen to the right.
+#   empty -> integer -> decimal -> string
+#   empty -> date ---------------> string
+_NEXT_TYPES = {
+    "empty": ("integer", "decimal", "date", "string"),
+    "integer": ("decimal", "string"),
+    "decimal": ("string",),
+    "date": ("string",),
+    "string": (),
+}
+
+PANDAS_DTYPES = {
+    "empty": "object",
+    "integer": "int64",
+    "decimal": "float64",
+    "date": "datetime64[ns]",
+    "string": "object",
+}
+
+_PROFILE_CACHE_SIZE = 256
+_profile_cache = OrderedDict()
+
+_INTEGER = r"[+-]?\d+"
+_DECIMAL = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+
+class ColumnProfile:
+    """Running type state of one column while a file is streamed."""
+
+    def __init__(self):
+        self.type = "empty"
+        self.date_format: Optional[str] = None
+        self.nulls = 0
+        self.widenings = []
+
+    @property
+    def done(self) -> bool:
+        return self.type == "string"
+
+    def fits(self, values: pd.Series, type_name: str, date_format=None) -> pd.Series:
+        if type_name == "integer":
+            return values.str.fullmatch(_INTEGER)
+        if type_name == "decimal":
+            return values.str.fullmatch(_DECIMAL)
+        if type_name == "date":
+            fmt = date_format or self.date_format
+            if fmt is None:
+                return pd.Series(False, index=values.index)
+            return pd.to_datetime(values, format=fmt, errors="coerce").notna()
+        return pd.Series(True, index=values.index)
+
+    def update(self, values: pd.Series):
+        """Widen the column type until it fits every value of a chunk."""
+        while not self.done:
+            mask = self.fits(values, self.type)
+            if self.type != "empty" and mask.all():
+                return
+            offending = values if self.type == "empty" else values[~mask]
+            first_row = offending.index[0]
+            first_value = offending.iloc[0]
+
+            for candidate in _NEXT_TYPES[self.type]:
+                date_format = None
+                if candidate == "date":
+                    # Prefer a format that fits the whole chunk, else the
+                    # offending value alone.
+                    date_format = infer_date_format(offending) or infer_date_format(
+                        offending.iloc[:1]
+                    )
+                    if date_format is None:
+                        continue
+                if self.fits(offending.iloc[:1], candidate, date_format).all():
+                    if self.type != "empty":
+                        self.widenings.append(
+                            {
+                                "from": self.type,
+                                "to": candidate,
+                                "row": int(first_row),
+                                "value": first_value,
+                            }
+                        )
+                    self.type = candidate
+                    self.date_format = date_format if candidate == "date" else None
+                    break
+
+    def to_dict(self) -> dict:
+        return {
+            "type": self.type,
+            "dtype": PANDAS_DTYPES[self.type],
+            "date_format": self.date_format,
+            "nulls": self.nulls,
+            "widenings": self.widenings,
+        }
+
+
+def profile_chunks(chunks: Iterable[pd.DataFrame]) -> dict:
+    """
+    Infer column types over a stream of chunks.
+
+    Chunks are expected to keep a running row index (as pd.read_csv chunks
+    do) so widening offsets are absolute data-row numbers. Columns stop being
+    checked once they reach "string"; when every column has, the stream is
+    abandoned early.
+    """
+    profiles = {}
+    rows = 0
+    stopped_early = False
+    for chunk in chunks:
+        if not profiles:
+            profiles = {col: ColumnProfile() for col in chunk.columns}
+        rows += len(chunk)
+        for col, profile in profiles.items():
+            if profile.done:
+                continue
+            values = chunk[col]
+            values = values[values.notna()].astype(str).str.strip()
+            non_empty = values[values != ""]
+            profile.nulls += len(chunk) - len(non_empty)
+            if not non_empty.empty:
+                profile.update(non_empty)
+
+        if profiles and all(profile.done for profile in profiles.values()):
+            stopped_early = True
+            break
+
+    return {
+        "rows": rows,
+        "stopped_early": stopped_early,
+        "columns": {col: profile.to_dict() for col, profile in profiles.items()},
+    }
+
+
+def profile_file(
+    file_path: str, max_memory_mb: float = DEFAULT_CHUNK_MEMORY_MB
+) -> dict:
+    """
+    Stream a whole file (or every part behind a directory / glob) as raw
+    strings and infer each column's type with first-offending-row offsets.
+    Profiles of the last _PROFILE_CACHE_SIZE inputs are memoised per
+    path + mtime + size of every part.
+    """
+    paths = resolve_input_paths(file_path)
+    cache_key = tuple(
+        (os.path.abspath(path), os.stat(path).st_mtime_ns, os.stat(path).st_size)
+        for path in paths
+    )
+    if cache_key in _profile_cache:
+        _profile_cache.move_to_end(cache_key)
+        return _profile_cache[cache_key]
+
+    chunks = iter_raw_chunks(file_path, max_memory_mb)
+    # Parts restart their row index, so offsets are made global here.
+    profile = profile_chunks(_offset_rows(chunks))
+    _profile_cache[cache_key] = profile
+    if len(_profile_cache) > _PROFILE_CACHE_SIZE:
+        _profile_cache.popitem(last=False)
+    return profile
+
+
+def _offset_rows(chunks):
+    offset = 0
+    for chunk in chunks:
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield chunk
+
+
+def profile_schema(profile: dict) -> dict:
+    """Column name -> pandas dtype name, as used by compare_schemas."""
+    return {col: info["dtype"] for col, info in profile["columns"].items()}
@@ -0,0 +1,26 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Module-level cache directories are read at import; keep them out of ~/.cache.
+os.environ.setdefault(
+    "SALES_AGENT_CACHE_DIR", tempfile.mkdtemp(prefix="salesanalysisagent-tests-")
+)
+
+
+@pytest.fixture
+def write_csv(tmp_path):
+    """Write a DataFrame (or raw text) to tmp_path/name and return the path."""
+
+    def write(name, data):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, pd.DataFrame):
+            data.to_csv(path, index=False)
+        else:
+            path.write_text(data, encoding="utf-8")
+        return str(path)
+
+    return write
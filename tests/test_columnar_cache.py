@@ -0,0 +1,130 @@
+import decimal
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools import columnar_cache
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(columnar_cache, "CACHE_DIR", str(directory))
+    monkeypatch.setattr(columnar_cache, "CACHE_ENABLED", True)
+    return directory
+
+
+def counting_loader(calls):
+    def load(file_path, **read_kwargs):
+        calls.append(file_path)
+        return pd.read_csv(file_path)
+
+    return load
+
+
+def test_second_load_is_served_from_the_cache(cache_dir, write_csv):
+    path = write_csv("feed.csv", pd.DataFrame({"id": [1, 2], "price": [1.5, 2.5]}))
+    calls = []
+
+    first = columnar_cache.load_columnar(path, loader=counting_loader(calls))
+    second = columnar_cache.load_columnar(path, loader=counting_loader(calls))
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(list((cache_dir / "columnar").glob("*.arrow"))) == 1
+
+
+def test_edited_file_is_parsed_again(cache_dir, write_csv):
+    path = write_csv("feed.csv", pd.DataFrame({"id": [1, 2]}))
+    calls = []
+    columnar_cache.load_columnar(path, loader=counting_loader(calls))
+
+    write_csv("feed.csv", pd.DataFrame({"id": [1, 2, 3]}))
+    df = columnar_cache.load_columnar(path, loader=counting_loader(calls))
+
+    assert len(calls) == 2
+    assert df["id"].tolist() == [1, 2, 3]
+
+
+def test_read_options_are_part_of_the_key(write_csv):
+    path = write_csv("feed.csv", pd.DataFrame({"id": [1]}))
+
+    assert columnar_cache.cache_key(path) != columnar_cache.cache_key(path, sep=";")
+
+
+def test_mixed_type_columns_are_cached_as_text(cache_dir, write_csv):
+    path = write_csv("feed.csv", pd.DataFrame({"id": [1]}))
+    mixed = pd.DataFrame({"id": pd.Series([1, "3A", None], dtype=object)})
+
+    df = columnar_cache.load_columnar(path, loader=lambda file_path: mixed)
+    cached = columnar_cache.load_columnar(path, loader=pytest.fail)
+
+    assert df["id"].tolist()[:2] == ["1", "3A"]
+    assert cached["id"].tolist()[:2] == ["1", "3A"]
+    assert cached["id"].isna().tolist() == [False, False, True]
+
+
+@pytest.mark.parametrize(
+    "values", [[decimal.Decimal("1e-40"), decimal.Decimal("1e40")], [1, 2**70]]
+)
+def test_values_arrow_cannot_type_are_cached_as_text(cache_dir, write_csv, values):
+    path = write_csv("feed.csv", pd.DataFrame({"id": [1]}))
+    odd = pd.DataFrame({"note": pd.Series(values + [None], dtype=object)})
+
+    df = columnar_cache.load_columnar(path, loader=lambda file_path: odd)
+    cached = columnar_cache.load_columnar(path, loader=pytest.fail)
+
+    text = [str(value) for value in values]
+    assert df["note"].tolist()[:2] == text
+    assert cached["note"].tolist()[:2] == text
+    assert cached["note"].isna().tolist() == [False, False, True]
+
+
+def test_unchanged_files_are_not_hashed_again_by_a_new_process(
+    cache_dir, write_csv, monkeypatch
+):
+    path = write_csv("feed.csv", "id\n1\n")
+    digest = columnar_cache.content_hash(path)
+    stat = os.stat(path)
+    monkeypatch.setattr(columnar_cache, "_hash_memo", type(columnar_cache._hash_memo)())
+
+    # Same size and mtime: the recorded hash is trusted without reading.
+    write_csv("feed.csv", "id\n2\n")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert columnar_cache.content_hash(path) == digest
+
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert columnar_cache.content_hash(path) != digest
+
+
+def test_hash_memo_keeps_the_most_recent_files(cache_dir, write_csv, monkeypatch):
+    monkeypatch.setattr(columnar_cache, "_hash_memo", type(columnar_cache._hash_memo)())
+    monkeypatch.setattr(columnar_cache, "_HASH_MEMO_SIZE", 2)
+    paths = [write_csv(f"feed-{n}.csv", f"id\n{n}\n") for n in range(3)]
+
+    for path in paths:
+        columnar_cache.content_hash(path)
+
+    assert [key[0] for key in columnar_cache._hash_memo] == [
+        os.path.abspath(path) for path in paths[1:]
+    ]
+
+
+def test_evict_drops_least_recently_used(cache_dir):
+    directory = cache_dir / "columnar"
+    directory.mkdir(parents=True)
+    now = time.time()
+    paths = []
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = directory / f"{name}.arrow"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (now - age * 60, now - age * 60))
+        paths.append(path)
+
+    columnar_cache.evict(max_bytes=150, keep=str(paths[2]))
+
+    assert [path.exists() for path in paths] == [False, False, True]
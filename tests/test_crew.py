@@ -0,0 +1,92 @@
+import importlib
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+import yaml
+
+TASKS_YAML = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "src",
+    "salesanalysisagent",
+    "config",
+    "tasks.yaml",
+)
+
+
+@pytest.fixture
+def crew():
+    pytest.importorskip("crewai")
+    yield importlib.import_module("salesanalysisagent.crew")
+    # test_main checks that the fast paths never import crew.py.
+    sys.modules.pop("salesanalysisagent.crew", None)
+
+
+def make_crew(*specs):
+    tasks = [
+        SimpleNamespace(
+            name=name,
+            async_execution=async_execution,
+            output_file=f"{name}.out",
+            description=name,
+            agent=SimpleNamespace(role=name),
+            output=None,
+        )
+        for name, async_execution in specs
+    ]
+    return SimpleNamespace(tasks=tasks)
+
+
+def test_independent_tasks_run_async_and_feed_the_code_gen_task():
+    with open(TASKS_YAML, "r", encoding="utf-8") as f:
+        tasks = yaml.safe_load(f)
+
+    context = tasks["code_gen_task"]["context"]
+    assert context == [
+        "inspect_task",
+        "schema_validator_task",
+        "data_format_check_task",
+    ]
+    assert all(tasks[name].get("async_execution") for name in context)
+    assert not tasks["code_gen_task"].get("async_execution")
+
+
+def test_a_crew_never_ends_on_an_async_task(monkeypatch, crew):
+    monkeypatch.setattr(crew, "PARALLEL_TASKS", True)
+    shaped = crew.prepare_run(
+        make_crew(("inspect_task", True), ("data_format_check_task", True)),
+        skip_tasks={"code_gen_task"},
+    )
+
+    assert [task.async_execution for task in shaped.tasks] == [True, False]
+
+
+def test_parallel_tasks_off_runs_everything_in_order(monkeypatch, crew, tmp_path):
+    monkeypatch.setattr(crew, "PARALLEL_TASKS", False)
+    shaped = crew.prepare_run(
+        make_crew(("inspect_task", True), ("schema_validator_task", True)),
+        output_dir=str(tmp_path),
+    )
+
+    assert [task.async_execution for task in shaped.tasks] == [False, False]
+    assert shaped.tasks[0].output_file == str(tmp_path / "inspect_task.out")
+
+
+def test_skipped_tasks_leave_their_output_for_the_context(monkeypatch, crew):
+    monkeypatch.setattr(crew, "PARALLEL_TASKS", True)
+    base = make_crew(
+        ("inspect_task", True), ("data_format_check_task", True), ("code_gen", False)
+    )
+    skipped = base.tasks[1]
+
+    shaped = crew.prepare_run(
+        base,
+        skip_tasks={"data_format_check_task"},
+        precomputed_outputs={"data_format_check_task": "def fix(df): ..."},
+    )
+
+    assert [task.name for task in shaped.tasks] == ["inspect_task", "code_gen"]
+    assert skipped.output.raw == "def fix(df): ..."
+    assert [task.async_execution for task in shaped.tasks] == [True, False]
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools.dataset_registry import DatasetRegistry, load_dataframe
+
+
+@pytest.fixture
+def feed(write_csv):
+    return write_csv("feed.csv", pd.DataFrame({"id": [1, 2], "price": [1.5, 2.5]}))
+
+
+def test_concurrent_requests_parse_once(feed):
+    registry = DatasetRegistry()
+    parses = []
+
+    def slow_loader(file_path):
+        parses.append(file_path)
+        time.sleep(0.1)
+        return pd.read_csv(file_path)
+
+    threads = [
+        threading.Thread(target=registry.get_or_load, args=(feed, slow_loader))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert parses == [feed]
+    assert (registry.misses, registry.hits) == (1, 7)
+
+
+def test_edited_file_is_parsed_again(feed, write_csv):
+    registry = DatasetRegistry()
+    registry.get_or_load(feed)
+
+    write_csv("feed.csv", pd.DataFrame({"id": [1, 2, 3], "price": [1.5, 2.5, 9.0]}))
+
+    assert len(registry.get_or_load(feed)) == 3
+    assert registry.misses == 2
+
+
+def test_least_recently_used_frames_are_evicted(write_csv):
+    paths = [write_csv(f"f{n}.csv", pd.DataFrame({"id": range(100)})) for n in range(3)]
+    registry = DatasetRegistry()
+    registry.max_bytes = int(2.5 * registry.get_or_load(paths[0]).memory_usage().sum())
+    registry.get_or_load(paths[1])
+    registry.get_or_load(paths[0])
+
+    registry.get_or_load(paths[2])
+
+    assert registry.get(registry.key_for(paths[1])) is None
+    assert registry.get(registry.key_for(paths[0])) is not None
+
+
+def test_unsupported_read_options_fail_before_parsing(feed):
+    with pytest.raises(TypeError, match="Unsupported read options sep"):
+        load_dataframe(feed, sep=";")
+    with pytest.raises(TypeError, match="max_workers"):
+        DatasetRegistry().get_or_load(feed, nrows=1)
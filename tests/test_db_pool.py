@@ -0,0 +1,96 @@
+import sys
+import types
+
+import pytest
+
+from salesanalysisagent.tools import db_pool
+from salesanalysisagent.tools.db_pool import ConnectionPool
+
+
+class Connection:
+    def __init__(self, fail_rollback=False):
+        self.rollbacks = 0
+        self.closed = False
+        self.fail_rollback = fail_rollback
+
+    def rollback(self):
+        if self.fail_rollback:
+            raise OSError("server has gone away")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_connections_are_reused_and_rolled_back_on_release():
+    pool = ConnectionPool(Connection, max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert second is first
+    assert pool.created == 1
+    assert first.rollbacks == 2
+
+
+def test_rollback_happens_on_error_too():
+    pool = ConnectionPool(Connection, max_size=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection() as connection:
+            raise ValueError("bad row")
+
+    assert connection.rollbacks == 1
+    assert pool.acquire(timeout=0) is connection
+
+
+def test_connection_that_cannot_roll_back_is_discarded():
+    pool = ConnectionPool(lambda: Connection(fail_rollback=True), max_size=1)
+
+    broken = pool.acquire()
+    pool.release(broken)
+
+    assert broken.closed
+    assert pool.acquire(timeout=0) is not broken
+
+
+def test_stale_connections_are_health_checked():
+    pool = ConnectionPool(
+        Connection, max_size=1, health_check=lambda c: False, health_check_interval=0
+    )
+
+    stale = pool.acquire()
+    pool.release(stale)
+
+    assert pool.acquire() is not stale
+    assert stale.closed
+    assert pool.created == 2
+
+
+def test_pool_is_bounded():
+    pool = ConnectionPool(Connection, max_size=1)
+    pool.acquire()
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+
+def test_no_credentials_are_sent_unless_configured(monkeypatch):
+    calls = []
+    connector = types.SimpleNamespace(connect=lambda **kwargs: calls.append(kwargs))
+    monkeypatch.setitem(
+        sys.modules, "mysql", types.SimpleNamespace(connector=connector)
+    )
+    monkeypatch.setitem(sys.modules, "mysql.connector", connector)
+    monkeypatch.setattr(db_pool, "DEFAULT_USER", None)
+    monkeypatch.setattr(db_pool, "DEFAULT_PASSWORD", None)
+
+    route = db_pool.route_for("pos_data")
+    route.pop("backend")
+    db_pool.mysql_factory(**route)()
+
+    (kwargs,) = calls
+    assert "user" not in kwargs and "password" not in kwargs
+    assert db_pool.route_for("pos_data", user="etl")["user"] == "etl"
@@ -0,0 +1,81 @@
+import os
+import time
+
+from salesanalysisagent.tools.decision_cache import (
+    DecisionCache,
+    fingerprint,
+    shape_fingerprint,
+)
+
+DIFF = {"type_mismatches": {"price": ["object", "decimal(10,2)"]}}
+PROFILE = {
+    "price": {"source": {"$9.9": 10, "9.9": 2}, "target": {"9.9": 5}, "drift": True}
+}
+
+
+def test_fingerprint_ignores_shape_counts():
+    recounted = {
+        "price": {"source": {"9.9": 7, "$9.9": 1}, "target": {"9.9": 3}, "drift": True}
+    }
+
+    assert shape_fingerprint(PROFILE) == shape_fingerprint(recounted)
+    assert fingerprint("t", DIFF, shape_fingerprint(PROFILE), "v1") == fingerprint(
+        "t", DIFF, shape_fingerprint(recounted), "v1"
+    )
+
+
+def test_fingerprint_changes_with_task_drift_and_table_version():
+    shapes = shape_fingerprint(PROFILE)
+    key = fingerprint("task", DIFF, shapes, "v1")
+
+    assert key != fingerprint("other_task", DIFF, shapes, "v1")
+    assert key != fingerprint("task", {}, shapes, "v1")
+    assert key != fingerprint("task", DIFF, None, "v1")
+    assert key != fingerprint("task", DIFF, shapes, "v2")
+
+
+def test_put_then_get_round_trips(tmp_path):
+    cache = DecisionCache(str(tmp_path))
+
+    assert cache.get("k") is None
+    cache.put("k", {"task": "t", "raw": "```python\npass\n```"})
+
+    entry = cache.get("k")
+    assert entry["raw"] == "```python\npass\n```"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_invalidate_table_drops_only_its_decisions(tmp_path):
+    cache = DecisionCache(str(tmp_path))
+    cache.put("sales", {"database_name": "pos", "table_name": "sales"})
+    cache.put("stock", {"database_name": "pos", "table_name": "stock"})
+    cache.put("other", {"database_name": "crm", "table_name": "sales"})
+
+    cache.invalidate_table("pos", "sales")
+    assert [cache.get(key) is None for key in ("sales", "stock", "other")] == [
+        True,
+        False,
+        False,
+    ]
+
+    cache.invalidate_table("pos")
+    assert cache.get("stock") is None
+    assert cache.get("other") is not None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DecisionCache(str(tmp_path), max_bytes=10**6)
+    for key in ("old", "used", "new"):
+        cache.put(key, {"raw": "x" * 100})
+    # Entry sizes differ by a byte or two with the created timestamp.
+    size = max(os.path.getsize(path) for path in tmp_path.glob("*.json")) + 8
+    past = time.time() - 60
+    for key in ("old", "used"):
+        os.utime(tmp_path / f"{key}.json", (past, past))
+    cache.get("used")  # touched, so it is no longer the oldest
+
+    cache.max_bytes = 2 * size
+    cache.put("newest", {"raw": "x" * 100})
+
+    assert cache.get("old") is None
+    assert cache.get("used") is not None
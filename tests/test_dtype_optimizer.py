@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools.dtype_optimizer import infer_date_format, optimize_dtypes
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        (["2024-03-01", "2024-12-31"], "%Y-%m-%d"),
+        # Ambiguous throughout: month-first, as US feeds write it.
+        (["03/04/2024", "01/02/2024"], "%m/%d/%Y"),
+        # One day above 12 settles it.
+        (["03/04/2024", "25/02/2024"], "%d/%m/%Y"),
+        (["12-31-2024", "01-02-2024"], "%m-%d-%Y"),
+        (["31-12-2024", "01-02-2024"], "%d-%m-%Y"),
+        (["12.5", "3"], None),
+    ],
+)
+def test_infer_date_format(values, expected):
+    assert infer_date_format(pd.Series(values)) == expected
+
+
+def test_identifiers_keep_int64_while_measures_shrink():
+    df = pd.DataFrame(
+        {
+            "product_id": range(100),
+            "storeId": range(100),
+            "qty": [1, 2] * 50,
+            "price": [1.5, 2.25] * 50,
+        }
+    )
+
+    df, applied = optimize_dtypes(df)
+
+    assert df["product_id"].dtype == "int64"
+    assert df["storeId"].dtype == "int64"
+    assert df["qty"].dtype == "int8"
+    assert df["price"].dtype == "float32"
+    assert set(applied) == {"qty", "price"}
+    assert (df["product_id"] + 100).max() == 199
+
+
+def test_dates_are_parsed_with_the_inferred_format():
+    df = pd.DataFrame({"day": ["03/04/2024", "01/02/2024"]})
+
+    df, applied = optimize_dtypes(df)
+
+    assert applied["day"]["format"] == "%m/%d/%Y"
+    assert df["day"].dt.month.tolist() == [3, 1]
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from salesanalysisagent.tools.file_reader import iter_chunks, read_file
+
+
+def test_csv_chunks_stay_small_and_cover_every_row(write_csv):
+    df = pd.DataFrame({"order_id": range(5000), "note": ["x" * 50] * 5000})
+    path = write_csv("orders.csv", df)
+
+    chunks = list(iter_chunks(path, max_memory_mb=0.05))
+
+    assert len(chunks) > 1
+    assert sum(len(chunk) for chunk in chunks) == 5000
+    assert pd.concat(chunks)["order_id"].tolist() == list(range(5000))
+
+
+def test_parquet_chunks_match_the_whole_file(tmp_path):
+    path = str(tmp_path / "orders.parquet")
+    pd.DataFrame({"order_id": range(3000)}).to_parquet(path, row_group_size=500)
+
+    chunks = list(iter_chunks(path, max_memory_mb=0.001))
+
+    assert len(chunks) > 1
+    assert pd.concat(chunks)["order_id"].tolist() == read_file(path)[
+        "order_id"
+    ].tolist()
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from salesanalysisagent.tools.format_rules import plan_format_fixes
+from salesanalysisagent.tools.multipart_reader import iter_raw_chunks
+from salesanalysisagent.tools.shape_profiler import shape_report_for_files
+
+TARGET = "id,price,day,name\n1,10.50,2024-01-03,Widget\n2,3.00,2024-01-04,Gadget\n"
+
+
+def plan(write_csv, source, table_name=None):
+    source_path = write_csv("source.csv", source)
+    report = shape_report_for_files(source_path, write_csv("target.csv", TARGET))
+    return source_path, plan_format_fixes(source_path, report, table_name)
+
+
+def test_rules_cover_known_drift(write_csv):
+    source = (
+        "id,price,day,name\n"
+        "1,$10.50,01/03/2024,  Widget\n"
+        "2,$3.00,01/04/2024,Gadget \n"
+    )
+    source_path, fixes = plan(write_csv, source)
+
+    assert fixes["drifted"] == ["price", "day", "name"]
+    assert fixes["uncovered"] == []
+    assert {t["column"]: t["rule"] for t in fixes["transforms"]} == {
+        "price": "currency",
+        "day": "date",
+        "name": "trim",
+    }
+
+    # The rendered code is self-contained and reproduces the target layout.
+    namespace = {}
+    exec(fixes["code"], namespace)
+    fixed = namespace["fix_data_format_change"](next(iter_raw_chunks(source_path)))
+    target = pd.read_csv(write_csv("target.csv", TARGET), dtype=str)
+    assert fixed["price"].astype(float).tolist() == [10.5, 3.0]
+    assert fixed["day"].tolist() == target["day"].tolist()
+    assert fixed["name"].tolist() == target["name"].tolist()
+
+
+def test_rule_that_does_not_fit_every_row_is_left_to_the_llm(write_csv):
+    source = "id,price,day,name\n1,$10.50,03/01/2024,Widget\n2,N/A,04/01/2024,Gadget\n"
+    _, fixes = plan(write_csv, source)
+
+    assert fixes["uncovered"] == ["price"]
+    assert [t["column"] for t in fixes["transforms"]] == ["day"]
+
+
+def test_no_drift_needs_no_code(write_csv):
+    _, fixes = plan(write_csv, TARGET)
+
+    assert fixes == {"drifted": [], "transforms": [], "uncovered": [], "code": None}
@@ -0,0 +1,149 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.incremental import HashIndex, IncrementalFeed, row_hashes
+
+
+def frame(ids, days=None):
+    days = days or ["2024-01-10"] * len(ids)
+    return pd.DataFrame(
+        {"id": ids, "price": [i * 1.5 for i in ids], "day": pd.to_datetime(days)}
+    )
+
+
+def test_row_hashes_match_across_transformed_and_read_back_types():
+    transformed = pd.DataFrame({"id": [1, 2], "price": [1.1, 2.0], "name": ["a", None]})
+    read_back = pd.DataFrame(
+        {
+            "id": pd.Series([1, 2], dtype="int32"),
+            "price": np.array([1.1, 2.0], dtype=np.float32),
+            "name": pd.Series(["a", None], dtype=object),
+        }
+    )
+
+    assert (row_hashes(transformed) == row_hashes(read_back)).all()
+    assert row_hashes(transformed)[0] != row_hashes(transformed)[1]
+
+
+def test_hash_index_add_contains_and_persist(tmp_path):
+    index = HashIndex()
+    index.add(np.array([5, 3, 5], dtype=np.uint64), np.array([1.0, 2.0, 3.0]))
+    index.add(np.array([3, 9], dtype=np.uint64))
+
+    assert len(index) == 3
+    assert index.contains(np.array([3, 4, 5, 9], dtype=np.uint64)).tolist() == [
+        True,
+        False,
+        True,
+        True,
+    ]
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = HashIndex.load(path)
+    assert loaded.hashes.tolist() == [3, 5, 9]
+    assert HashIndex.load(str(tmp_path / "missing.npz")) is None
+
+
+def test_hash_index_extend_and_prune():
+    index = HashIndex()
+    index.extend(
+        [np.array([1, 2], dtype=np.uint64), np.array([2, 3], dtype=np.uint64)],
+        [np.array([10.0, 20.0]), None],
+    )
+
+    index.prune(before=15.0)
+
+    # 1 is older than the cutoff; 3 has no watermark and stays.
+    assert index.hashes.tolist() == [2, 3]
+
+
+def test_rerun_of_an_overlapping_file_only_keeps_new_rows(tmp_path):
+    feed = IncrementalFeed("pos.sales", directory=str(tmp_path))
+    feed.seed([])
+
+    assert len(feed.filter(frame([1, 2, 2, 3]))) == 3
+    feed.commit()
+
+    again = IncrementalFeed("pos.sales", directory=str(tmp_path))
+    new = again.filter(frame([2, 3, 4]))
+    assert new["id"].tolist() == [4]
+    assert again.skipped == 2
+
+
+def test_key_columns_decide_what_counts_as_the_same_row(tmp_path):
+    feed = IncrementalFeed("pos.sales", key_columns=["id"], directory=str(tmp_path))
+    feed.seed([frame([1])])
+
+    changed_price = frame([1, 2]).assign(price=[99.0, 3.0])
+    assert feed.filter(changed_price)["id"].tolist() == [2]
+
+
+def test_late_rows_are_checked_against_a_backfill_of_the_target(tmp_path):
+    feed = IncrementalFeed(
+        "pos.sales", watermark_column="day", lookback_days=1, directory=str(tmp_path)
+    )
+    feed.seed([frame([1], ["2024-01-10"])])
+    target = frame([2], ["2024-01-01"])
+    ranges = []
+
+    def backfill(start, stop):
+        ranges.append((start, stop))
+        yield target
+
+    feed.backfill = backfill
+    days = ["2024-01-01 00:00", "2024-01-01 00:00", "2024-01-09 12:00"]
+    late = frame([2, 3, 4], days)
+
+    # 2 is in the target already; 3 is as old but was never loaded.
+    assert feed.filter(late)["id"].tolist() == [3, 4]
+    assert ranges == [
+        (pd.Timestamp("2024-01-01").timestamp(), pd.Timestamp("2024-01-09").timestamp())
+    ]
+    assert feed.filter(frame([5], ["2024-01-02"]))["id"].tolist() == [5]
+    assert len(ranges) == 1
+
+
+def test_late_rows_without_a_backfill_are_kept(tmp_path):
+    feed = IncrementalFeed(
+        "pos.sales", watermark_column="day", lookback_days=1, directory=str(tmp_path)
+    )
+    feed.seed([frame([1], ["2024-01-10"])])
+
+    assert feed.filter(frame([1, 2], ["2024-01-10", "2024-01-01"]))["id"].tolist() == [
+        2
+    ]
+
+
+def test_text_dates_and_numbers_hash_like_the_typed_columns():
+    source = pd.DataFrame(
+        {"id": ["1", "2"], "price": ["1.50", "3"], "day": ["2024-01-03", None]}
+    )
+    read_back = pd.DataFrame(
+        {
+            "id": [1, 2],
+            "price": [1.5, 3.0],
+            "day": pd.Series([datetime.date(2024, 1, 3), None], dtype=object),
+        }
+    )
+
+    assert (row_hashes(source) == row_hashes(read_back)).all()
+
+
+def test_seen_files_and_reset(tmp_path, write_csv):
+    path = write_csv("feed.csv", frame([1]))
+    feed = IncrementalFeed("pos.sales", directory=str(tmp_path / "state"))
+    feed.seed([])
+    feed.filter(frame([1]))
+    feed.commit([path])
+
+    assert IncrementalFeed("pos.sales", directory=str(tmp_path / "state")).file_seen(
+        path
+    )
+
+    feed.reset()
+    fresh = IncrementalFeed("pos.sales", directory=str(tmp_path / "state"))
+    assert not fresh.seeded
+    assert not fresh.file_seen(path)
@@ -0,0 +1,93 @@
+import pytest
+
+pytest.importorskip("crewai")
+
+from salesanalysisagent.tools import knowledge_cache  # noqa: E402
+from salesanalysisagent.tools.knowledge_cache import (  # noqa: E402
+    CachedTextFileKnowledgeSource,
+)
+
+
+class Collection:
+    def __init__(self):
+        self.chunks = []
+
+    def count(self):
+        return len(self.chunks)
+
+
+class Storage:
+    """Stand-in for crewAI's KnowledgeStorage over one Chroma collection."""
+
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.collection = Collection()
+        self.saves = 0
+        self.resets = 0
+        self.embedding_function = None
+        self.client = self
+
+    def _get_client(self):
+        return self
+
+    def get_collection(self, name):
+        return self.collection
+
+    def save(self, chunks):
+        self.saves += 1
+        self.collection.chunks.extend(chunks)
+
+    def reset(self):
+        self.resets += 1
+        self.collection.chunks = []
+
+
+@pytest.fixture
+def knowledge(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(knowledge_cache, "KNOWLEDGE_CACHE_ENABLED", True)
+    (tmp_path / "knowledge").mkdir()
+    path = tmp_path / "knowledge" / "code.py"
+    path.write_text("import pandas as pd\n" * 50)
+    storage = Storage(f"test_{tmp_path.name}")
+
+    def source():
+        source = CachedTextFileKnowledgeSource(
+            file_paths=["code.py"], chunk_size=200, chunk_overlap=20
+        )
+        source.storage = storage
+        return source
+
+    return path, storage, source
+
+
+def test_unchanged_files_are_not_embedded_again(knowledge):
+    path, storage, source = knowledge
+
+    source().add()
+    chunks = storage.collection.count()
+    source().add()
+
+    assert storage.saves == 1
+    assert storage.collection.count() == chunks > 0
+
+
+def test_edited_files_replace_the_collection(knowledge):
+    path, storage, source = knowledge
+    source().add()
+
+    path.write_text("import numpy as np\n" * 20)
+    source().add()
+
+    assert (storage.saves, storage.resets) == (2, 1)
+    assert all("numpy" in chunk for chunk in storage.collection.chunks)
+
+
+def test_forget_makes_the_next_add_embed(knowledge):
+    path, storage, source = knowledge
+    source().add()
+
+    knowledge_cache.forget(f"knowledge_{storage.collection_name}")
+    source().add()
+
+    assert storage.saves == 2
@@ -0,0 +1,129 @@
+import json
+import os
+import subprocess
+import sys
+
+from salesanalysisagent.main import crew_tasks
+
+
+def test_crew_tasks_follow_crew_py_without_importing_crewai():
+    assert crew_tasks() == (
+        "inspect_task",
+        "schema_validator_task",
+        "data_format_check_task",
+        "code_gen_task",
+    )
+    assert "salesanalysisagent.crew" not in sys.modules
+
+
+def test_registry_hit_only_answers_the_format_task(monkeypatch, tmp_path):
+    from salesanalysisagent import main
+    from salesanalysisagent.tools import data_format_validator, transform_registry
+
+    class Registered:
+        version = 3
+        path = "transforms/v3"
+        entry = {"version": 3}
+
+        def verify(self, file_path):
+            return None
+
+        def task_output(self):
+            return "```python\ndef fix_data_format_change(df):\n    return df\n```"
+
+    class Registry:
+        def load(self, key):
+            return Registered()
+
+        def register(self, *args, **kwargs):
+            raise AssertionError("a hit must not register again")
+
+    crews = []
+
+    class Crew:
+        tasks = []
+
+    def build_crew(skip, precomputed, base_crew, output_dir):
+        crews.append((set(skip), dict(precomputed)))
+        return Crew()
+
+    monkeypatch.setattr(data_format_validator, "detect_format_changes", lambda path: {})
+    monkeypatch.setattr(main, "target_state", lambda path: ({}, 1))
+    monkeypatch.setattr(main, "transform_key", lambda detected, target: "key")
+    monkeypatch.setattr(main, "decision_keys", lambda *args: {})
+    monkeypatch.setattr(main, "build_crew", build_crew)
+    monkeypatch.setattr(transform_registry, "get_transform_registry", Registry)
+
+    main._kickoff({"file_path": "feed.csv"}, output_dir=str(tmp_path))
+
+    ((skip, precomputed),) = crews
+    assert skip == {"data_format_check_task"}
+    assert "fix_data_format_change" in precomputed["data_format_check_task"]
+
+
+def test_run_batch_takes_feeds_from_the_arguments(monkeypatch, tmp_path, write_csv):
+    from salesanalysisagent import main
+
+    feeds = [write_csv(f"in/sales-{n}.txt", "id\n1\n") for n in (1, 2)]
+    ran = []
+
+    class Crew:
+        max_rpm = None
+
+    monkeypatch.setattr(main, "TRACING_ENABLED", False)
+    monkeypatch.setattr(main, "BATCH_OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setattr(main, "build_crew", Crew)
+    monkeypatch.setattr(
+        main,
+        "_batch_kickoff",
+        lambda inputs, base_crew, output_dir: ran.append(inputs["file_path"]),
+    )
+    monkeypatch.setattr(sys, "argv", ["run_batch", str(tmp_path / "in" / "*.txt")])
+
+    assert main.run_batch() == []
+    assert sorted(ran) == feeds
+
+
+def test_validate_all_command_reads_root_and_report_path(tmp_path):
+    report_path = tmp_path / "report.json"
+    (tmp_path / "feeds").mkdir()
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "salesanalysisagent.main",
+            "validate_all",
+            str(tmp_path / "feeds"),
+            str(report_path),
+        ],
+        check=True,
+        capture_output=True,
+        env=env,
+        timeout=120,
+    )
+
+    report = json.loads(report_path.read_text())
+    assert (report["checked"], report["drifted"]) == (0, [])
+
+
+def test_train_and_test_read_their_arguments_after_the_command(monkeypatch):
+    from salesanalysisagent import main
+
+    calls = []
+
+    class Crew:
+        def train(self, n_iterations, filename, inputs):
+            calls.append(("train", n_iterations, filename))
+
+        def test(self, n_iterations, openai_model_name, inputs):
+            calls.append(("test", n_iterations, openai_model_name))
+
+    monkeypatch.setattr(main, "build_crew", Crew)
+    monkeypatch.setattr(sys, "argv", ["train", "3", "trained.pkl"])
+    main.train()
+    monkeypatch.setattr(sys, "argv", ["test", "2", "gpt-4o"])
+    main.test()
+
+    assert calls == [("train", 3, "trained.pkl"), ("test", 2, "gpt-4o")]
@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools.multipart_reader import (
+    iter_parts,
+    iter_raw_chunks,
+    read_input,
+    resolve_input_paths,
+)
+
+
+def test_parts_resolve_in_natural_order(write_csv, tmp_path):
+    for n in (10, 2, 1):
+        write_csv(f"parts/part-{n}.csv", pd.DataFrame({"id": [n]}))
+    write_csv("parts/notes.md", "not data")
+
+    paths = resolve_input_paths(str(tmp_path / "parts"))
+
+    assert [p.rsplit("/", 1)[1] for p in paths] == [
+        "part-1.csv",
+        "part-2.csv",
+        "part-10.csv",
+    ]
+    assert resolve_input_paths(str(tmp_path / "parts" / "part-*.csv")) == paths
+
+
+def test_read_input_concatenates_parts(write_csv, tmp_path):
+    write_csv("parts/a-1.csv", pd.DataFrame({"id": [1, 2], "price": [1.5, 2.5]}))
+    write_csv("parts/a-2.csv", pd.DataFrame({"id": [3], "price": [3.5]}))
+
+    df = read_input(str(tmp_path / "parts"))
+
+    assert df["id"].tolist() == [1, 2, 3]
+    assert df["price"].tolist() == [1.5, 2.5, 3.5]
+
+
+def test_read_input_rejects_mismatched_parts(write_csv, tmp_path):
+    write_csv("parts/a-1.csv", pd.DataFrame({"id": [1], "price": [1.5]}))
+    write_csv("parts/a-2.csv", pd.DataFrame({"id": [2], "cost": [2.5]}))
+
+    with pytest.raises(ValueError, match="does not match the schema"):
+        read_input(str(tmp_path / "parts"))
+
+
+def test_raw_chunks_keep_text_and_empty_cells(write_csv):
+    path = write_csv("feed.csv", "id,price,note\n007,1.50,\n8,NA,x\n")
+
+    chunks = list(iter_raw_chunks(path))
+
+    df = pd.concat(chunks, ignore_index=True)
+    assert df["id"].tolist() == ["007", "8"]
+    assert df["price"].tolist() == ["1.50", "NA"]
+    assert df["note"].tolist() == ["", "x"]
+
+
+def test_raw_chunks_stream_every_part(write_csv, tmp_path):
+    write_csv("parts/a-1.csv", pd.DataFrame({"id": range(3)}))
+    write_csv("parts/a-2.csv", pd.DataFrame({"id": range(3, 5)}))
+
+    chunks = list(iter_raw_chunks(str(tmp_path / "parts")))
+
+    assert [chunk.attrs["part"].rsplit("/", 1)[1] for chunk in chunks] == [
+        "a-1.csv",
+        "a-2.csv",
+    ]
+    assert pd.concat(chunks)["id"].tolist() == ["0", "1", "2", "3", "4"]
+
+
+def test_parts_stream_in_order_past_the_worker_count(write_csv, tmp_path):
+    paths = [write_csv(f"parts/a-{n}.csv", pd.DataFrame({"id": [n]})) for n in range(5)]
+
+    frames = list(iter_parts(paths, max_workers=2))
+
+    assert [df["id"].tolist() for df in frames] == [[n] for n in range(5)]
+
+
+@pytest.mark.parametrize("ext", ["parquet", "xlsx"])
+def test_raw_chunks_are_text_for_every_format(tmp_path, ext):
+    path = str(tmp_path / f"feed.{ext}")
+    df = pd.DataFrame({"id": [7, 8], "note": ["x", None]})
+    if ext == "parquet":
+        df.to_parquet(path)
+    else:
+        df.to_excel(path, index=False)
+
+    (chunk,) = list(iter_raw_chunks(path))
+
+    assert chunk["id"].tolist() == ["7", "8"]
+    assert chunk["note"].tolist() == ["x", ""]
+
+
+def test_data_loader_tool_reads_txt_feeds(write_csv):
+    pytest.importorskip("crewai")
+    from salesanalysisagent.tools.data_loader_tool import DataLoaderTool
+
+    path = write_csv("sales.txt", "id,price\n1,2.50\n")
+
+    assert "Unsupported file type" not in DataLoaderTool()._run(path)
@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from salesanalysisagent.tools.mysql_loader import iter_row_batches
+
+
+def test_row_batches_are_sized_and_cover_every_row():
+    df = pd.DataFrame({"id": np.arange(250), "price": np.arange(250) * 0.5})
+
+    batches = list(iter_row_batches(df, 100))
+
+    assert [len(batch) for batch in batches] == [100, 100, 50]
+    rows = [row for batch in batches for row in batch]
+    assert rows == list(df.itertuples(index=False, name=None))
+
+
+def test_row_batches_hold_plain_python_values_and_none_for_nulls():
+    df = pd.DataFrame(
+        {
+            "id": np.array([1, 2], dtype="int64"),
+            "price": [1.5, np.nan],
+            "paid": [True, False],
+            "note": ["ok", None],
+            "sold_at": pd.to_datetime(["2024-01-03 10:30", None]),
+            "wait": pd.to_timedelta(["1h", None]),
+        }
+    )
+
+    (batch,) = iter_row_batches(df, 10)
+
+    assert batch == [
+        (
+            1,
+            1.5,
+            True,
+            "ok",
+            datetime.datetime(2024, 1, 3, 10, 30),
+            datetime.timedelta(hours=1),
+        ),
+        (2, None, False, None, None, None),
+    ]
+    first = batch[0]
+    assert [type(value) for value in first] == [
+        int,
+        float,
+        bool,
+        str,
+        datetime.datetime,
+        datetime.timedelta,
+    ]
+
+
+def test_row_batches_of_an_empty_frame_yield_nothing():
+    assert list(iter_row_batches(pd.DataFrame({"id": []}), 10)) == []
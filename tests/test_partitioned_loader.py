@@ -0,0 +1,232 @@
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools import mysql_loader
+from salesanalysisagent.tools.db_pool import ConnectionPool
+from salesanalysisagent.tools.incremental import IncrementalFeed
+from salesanalysisagent.tools.mysql_loader import (
+    MySQLConnector,
+    MySQLTableWriter,
+    PartitionedLoader,
+    append_new_rows,
+)
+from salesanalysisagent.tools.schema_catalog import SchemaCatalog
+
+_TABLE = re.compile(r"(?:FROM|INTO|EXISTS) `(\w+)`")
+
+
+class Server:
+    """
+    In-memory stand-in for a MySQL server with InnoDB's REPEATABLE READ:
+    a connection's first read fixes what it sees until it commits or rolls
+    back, apart from its own uncommitted rows.
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+        self.failures = 0  # next executemany calls to fail
+        self.lost_rows = 0  # rows silently dropped by the next commit
+        self.commits = 0
+
+    def connect(self):
+        return Connection(self)
+
+    def count(self, table):
+        with self.lock:
+            return len(self.tables[table])
+
+
+class Connection:
+    def __init__(self, server):
+        self.server = server
+        self.pending = []
+        self.snapshot = None
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        with self.server.lock:
+            self.server.commits += 1
+            for table, rows in self.pending:
+                if self.server.lost_rows:
+                    rows, self.server.lost_rows = rows[self.server.lost_rows :], 0
+                self.server.tables[table].extend(rows)
+        self.rollback()
+
+    def rollback(self):
+        self.pending = []
+        self.snapshot = None
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.server = connection.server
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        table = _TABLE.search(sql).group(1)
+        if sql.startswith("CREATE TABLE IF NOT EXISTS"):
+            with self.server.lock:
+                self.server.tables.setdefault(table, [])
+        elif sql.startswith("SELECT"):
+            if self.connection.snapshot is None:
+                with self.server.lock:
+                    self.connection.snapshot = {
+                        name: len(rows) for name, rows in self.server.tables.items()
+                    }
+            # Tables only grow, so a snapshot is a prefix of the rows.
+            rows = self.server.tables[table][: self.connection.snapshot[table]]
+            for name, new in self.connection.pending:
+                if name == table:
+                    rows += new
+            self.rows = [(len(rows),)] if "COUNT(*)" in sql else rows
+        else:
+            raise NotImplementedError(sql)
+
+    def executemany(self, sql, rows):
+        with self.server.lock:
+            if self.server.failures:
+                self.server.failures -= 1
+                raise RuntimeError("Lost connection to MySQL server during query")
+        table = _TABLE.search(sql).group(1)
+        self.connection.pending.append((table, list(rows)))
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    return Server()
+
+
+@pytest.fixture
+def connector(server):
+    connector = MySQLConnector("localhost", "etl", "secret", "pos")
+    connector._pool = ConnectionPool(server.connect, max_size=4)
+    connector.connection = connector._pool.acquire()
+    yield connector
+    connector.close()
+
+
+def chunks(total, size=700):
+    for start in range(0, total, size):
+        ids = np.arange(start, min(start + size, total))
+        yield pd.DataFrame({"product_id": ids, "price": ids * 0.5})
+
+
+def make_loader(connector, **options):
+    options = dict(dict(workers=3, backoff_s=0, local_infile=False), **options)
+    return PartitionedLoader(connector, **options)
+
+
+def test_snapshot_stand_in_hides_other_connections_commits(server):
+    server.tables["sales"] = []
+    reader, writer = server.connect(), server.connect()
+    reader.cursor().execute("SELECT COUNT(*) FROM `sales`")
+
+    writer.cursor().executemany("INSERT INTO `sales` VALUES (%s)", [(1,)])
+    writer.commit()
+
+    cursor = reader.cursor()
+    cursor.execute("SELECT COUNT(*) FROM `sales`")
+    assert cursor.fetchone() == (0,)
+
+
+def test_create_table_drops_the_tables_cached_columns(connector, monkeypatch):
+    catalog = SchemaCatalog()
+    catalog._tables[("pos", "sales")] = (0.0, {"id": {"column_type": "int"}})
+    catalog._tables[("pos", "refunds")] = (0.0, {"id": {"column_type": "int"}})
+    monkeypatch.setattr(mysql_loader, "get_catalog", lambda: catalog)
+
+    MySQLTableWriter(connector).create_table_if_not_exists("sales", next(chunks(1)))
+
+    assert set(catalog._tables) == {("pos", "refunds")}
+
+
+def test_insert_fallback_commits_every_commit_rows_across_chunks(connector, server):
+    writer = MySQLTableWriter(connector)
+
+    total = writer.bulk_load(
+        "sales", chunks(3500), commit_rows=1000, local_infile=False, batch_size=100
+    )
+
+    assert total == server.count("sales") == 3500
+    # 1000, 2000 and 3000 rows, then the 500-row tail; not once per chunk.
+    assert server.commits == 4
+
+
+@pytest.mark.parametrize("partition_key", [None, "product_id"])
+def test_load_writes_every_row_once(connector, server, partition_key):
+    loader = make_loader(connector, partition_key=partition_key)
+
+    assert loader.load("sales", chunks(5000)) == 5000
+    assert server.count("sales") == 5000
+    ids = sorted(row[0] for row in server.tables["sales"])
+    assert ids == list(range(5000))
+
+
+def test_count_check_sees_past_the_callers_open_snapshot(connector, server):
+    loader = make_loader(connector)
+    loader.load("sales", chunks(1000))
+    # The caller reads on its own connection, opening a snapshot, as seeding
+    # the dedupe index does before an incremental load.
+    connector.connection.cursor().execute("SELECT COUNT(*) FROM `sales`")
+
+    assert loader.load("sales", chunks(2000)) == 2000
+    assert server.count("sales") == 3000
+
+
+def test_failed_pieces_are_retried_without_duplicates(connector, server):
+    server.failures = 2
+    loader = make_loader(connector, retries=3)
+
+    assert loader.load("sales", chunks(3000)) == 3000
+    assert server.count("sales") == 3000
+
+
+def test_piece_failing_every_retry_aborts_the_load(connector, server):
+    server.failures = 100
+    loader = make_loader(connector, retries=1)
+
+    with pytest.raises(RuntimeError, match="failed after 2 attempts"):
+        loader.load("sales", chunks(3000))
+
+
+def test_missing_rows_fail_the_consistency_check(connector, server):
+    server.lost_rows = 5
+    loader = make_loader(connector)
+
+    with pytest.raises(RuntimeError, match="wrote 3000 rows but .* grew by 2995"):
+        loader.load("sales", chunks(3000))
+
+
+def test_append_new_rows_skips_rows_already_loaded(connector, server, tmp_path):
+    loader = make_loader(connector)
+    feed = IncrementalFeed("pos.sales", directory=str(tmp_path))
+    server.tables["sales"] = []
+
+    assert append_new_rows(loader, feed, "sales", chunks(1000)) == 1000
+    assert append_new_rows(loader, feed, "sales", chunks(1500)) == 500
+    assert server.count("sales") == 1500
@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools import payload
+from salesanalysisagent.tools.dataset_registry import DatasetRegistry
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = DatasetRegistry(max_bytes=50 * 2**20)
+    monkeypatch.setattr(payload, "get_registry", lambda: registry)
+    return registry
+
+
+def sales(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "price": rng.random(rows).round(2),
+            "note": rng.choice(["ok", "refund", "  "], rows),
+        }
+    )
+
+
+def test_short_text_is_returned_unchanged():
+    assert payload.compact("done", budget=100) == "done"
+
+
+def test_frames_become_summaries_with_a_handle(registry):
+    df = sales(5000)
+
+    text = payload.compact({"result": df}, budget=2000)
+
+    summary = json.loads(text)["result"]
+    assert summary["rows"] == 5000
+    assert set(summary["columns"]) == {"id", "price", "note"}
+    assert len(summary["sample"]) <= 10
+    assert payload.resolve_frame(summary["handle"]) is df
+    assert payload.estimate_tokens(text) <= 2000
+
+
+def test_anything_is_cut_to_the_budget():
+    text = payload.compact(["row %d" % i for i in range(10_000)], budget=50)
+
+    assert payload.estimate_tokens(text) <= 50
+
+
+def test_stratified_sample_shows_rare_shapes():
+    df = pd.DataFrame({"price": ["1.00"] * 999 + ["$1,000.00"]})
+
+    sample = payload.stratified_sample(df, 3)
+
+    assert "$1,000.00" in sample["price"].tolist()
+
+
+def test_handles_are_not_reused_after_eviction(registry):
+    first = registry.register(pd.DataFrame({"x": [1]}))
+    registry.clear()
+
+    second = registry.register(pd.DataFrame({"x": [2]}))
+
+    assert first != second
+    with pytest.raises(KeyError, match="expired"):
+        payload.resolve_frame(first)
+
+
+def test_budgeted_compacts_third_party_tools(monkeypatch):
+    pytest.importorskip("crewai")
+    from crewai.tools import BaseTool
+
+    class Loud(BaseTool):
+        name: str = "loud"
+        description: str = "Returns a lot of text."
+
+        def _run(self) -> str:
+            return "word " * 20_000
+
+    monkeypatch.setattr(payload, "TOKEN_BUDGET", 100)
+    tool = payload.budgeted(Loud)()
+
+    assert isinstance(tool, Loud)
+    assert payload.estimate_tokens(tool._run()) <= 100
+    assert payload.budgeted(Loud) is type(tool)
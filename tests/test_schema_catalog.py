@@ -0,0 +1,51 @@
+import pytest
+
+from salesanalysisagent.tools import db_pool, schema_catalog
+from salesanalysisagent.tools.db_pool import ConnectionPool, sqlite_factory
+from salesanalysisagent.tools.schema_catalog import SchemaCatalog, run_ddl
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    pool = ConnectionPool(sqlite_factory(str(tmp_path / "pos.db")), max_size=2)
+    monkeypatch.setitem(db_pool._pools, "pos", pool)
+    catalog = SchemaCatalog(ttl=3600)
+    monkeypatch.setattr(schema_catalog, "_catalog", catalog)
+    run_ddl("pos", "sales", "CREATE TABLE sales (id INTEGER, price DECIMAL(10,2))")
+    return catalog
+
+
+def test_catalog_serves_cached_columns_until_invalidated(catalog):
+    assert catalog.get_schema("pos", "sales") == {
+        "id": "integer",
+        "price": "decimal(10,2)",
+    }
+    version = catalog.table_version("pos", "sales")
+
+    with db_pool.get_connection("pos") as connection:
+        connection.execute("ALTER TABLE sales ADD COLUMN note VARCHAR(50)")
+    assert "note" not in catalog.get_schema("pos", "sales")
+
+    catalog.invalidate("pos", "sales")
+    assert catalog.get_schema("pos", "sales")["note"] == "varchar(50)"
+    assert catalog.table_version("pos", "sales") != version
+
+
+def test_ddl_through_run_ddl_invalidates_the_table(catalog):
+    version = catalog.table_version("pos", "sales")
+
+    run_ddl("pos", "sales", "ALTER TABLE sales ADD COLUMN note VARCHAR(50)")
+
+    assert "note" in catalog.get_schema("pos", "sales")
+    assert catalog.table_version("pos", "sales") != version
+
+
+def test_invalidate_only_drops_the_named_tables(catalog):
+    run_ddl("pos", "refunds", "CREATE TABLE refunds (id INTEGER)")
+    catalog.load([("pos", "sales"), ("pos", "refunds")])
+
+    catalog.invalidate("pos", "refunds")
+
+    assert set(catalog._tables) == {("pos", "sales")}
+    catalog.invalidate()
+    assert catalog._tables == {}
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools import schema_validator
+
+
+class Catalog:
+    def __init__(self, schema):
+        self.schema = schema
+
+    def get_schema(self, database_name, table_name):
+        if isinstance(self.schema, Exception):
+            raise self.schema
+        return self.schema
+
+
+@pytest.fixture
+def sampled(monkeypatch):
+    calls = []
+
+    def sample(table_name, database_name):
+        calls.append((database_name, table_name))
+        return pd.DataFrame({"id": [1]}), {"id": "int64"}
+
+    monkeypatch.setattr(schema_validator, "get_target_data_and_sample", sample)
+    monkeypatch.setattr(
+        schema_validator, "get_target_info", lambda name: ("pos", "sales")
+    )
+    return calls
+
+
+def test_target_rows_are_only_sampled_when_asked(monkeypatch, sampled, write_csv):
+    path = write_csv("sales.txt", "id\n1\n")
+    monkeypatch.setattr(schema_validator, "get_catalog", lambda: Catalog({"id": "int"}))
+
+    result = schema_validator.validate_schema(path, sample_target=False)
+
+    assert sampled == []
+    assert result["target_schema"] == {"id": "int"}
+    assert result["target_data"] is None
+
+    result = schema_validator.validate_schema(path)
+    assert sampled == [("pos", "sales")]
+    assert result["target_data"]["id"].tolist() == [1]
+
+
+def test_sample_stands_in_for_an_unavailable_catalog(monkeypatch, sampled, write_csv):
+    path = write_csv("sales.txt", "id\n1\n")
+    catalog = Catalog(OSError("catalog down"))
+    monkeypatch.setattr(schema_validator, "get_catalog", lambda: catalog)
+
+    result = schema_validator.validate_schema(path, sample_target=False)
+
+    assert sampled == [("pos", "sales")]
+    assert result["target_schema"] == {"id": "int64"}
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+from salesanalysisagent.tools.shape_profiler import (
+    compare_shapes,
+    profile_shapes,
+    relaxed_shape,
+    shape_signatures,
+)
+
+WORKBOOK = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "src",
+    "salesanalysisagent",
+    "data",
+    "format_change",
+    "sales_data.xlsx",
+)
+
+
+def test_signatures_keep_digit_run_lengths():
+    values = pd.Series(["2024-03-01", "01-03-2024", "$10.00", " 10.00 USD", "P-7"])
+
+    assert shape_signatures(values).tolist() == [
+        "9999-99-99",
+        "99-99-9999",
+        "$99.99",
+        " 99.99 USD",
+        "a-9",
+    ]
+    assert relaxed_shape("$9,999.99") == relaxed_shape("$9.99") == "$9.9"
+    assert relaxed_shape("9999-99-99") == "9999-99-99"
+
+
+def test_date_layouts_drift_but_magnitudes_do_not(write_csv):
+    target = write_csv(
+        "target.csv",
+        pd.DataFrame({"day": ["2024-03-01", "2024-03-02"], "price": ["3.50", "12.00"]}),
+    )
+    source = write_csv(
+        "source.csv",
+        pd.DataFrame(
+            {"day": ["01-03-2024", "2024-03-09"], "price": ["1250.00", "8.25"]}
+        ),
+    )
+
+    report = compare_shapes(profile_shapes(source), profile_shapes(target))
+
+    assert report["day"]["drift"]
+    assert report["day"]["new_shapes"] == ["99-99-9999"]
+    assert not report["price"]["drift"]
+
+
+def test_workbooks_profile_their_first_sheet():
+    profile = profile_shapes(WORKBOOK)
+
+    assert list(profile["columns"]) == ["store_id", "store_name", "region"]
@@ -0,0 +1,54 @@
+import codecs
+import os
+
+from collections import OrderedDict
+
+from salesanalysisagent.tools import sniffer
+from salesanalysisagent.tools.sniffer import ReadOptions, sniff
+
+
+def test_sniff_defaults_for_plain_csv(write_csv):
+    path = write_csv("plain.csv", "id,price\n1,2.5\n2,3.5\n")
+
+    assert sniff(path) == ReadOptions()
+
+
+def test_sniff_semicolons_after_blank_preamble(write_csv):
+    path = write_csv("feed.csv", "\n\nid;price;note\n1;2,5;a,b\n2;3,5;c\n")
+
+    options = sniff(path)
+
+    assert options.delimiter == ";"
+    assert options.header_row == 2
+
+
+def test_sniff_bom_and_padded_fields(tmp_path):
+    path = tmp_path / "feed.txt"
+    path.write_bytes(codecs.BOM_UTF8 + b"id| price\n1| 2.5\n2| 3.5\n")
+
+    options = sniff(str(path))
+
+    assert options.encoding == "utf-8-sig"
+    assert options.delimiter == "|"
+    assert options.skipinitialspace
+
+
+def test_sniff_falls_back_to_latin1(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_bytes("id,city\n1,São Paulo\n".encode("latin-1"))
+
+    assert sniff(str(path)).encoding == "latin-1"
+
+
+def test_sniff_cache_keeps_the_most_recent_files(monkeypatch, write_csv):
+    monkeypatch.setattr(sniffer, "_options_cache", OrderedDict())
+    monkeypatch.setattr(sniffer, "_OPTIONS_CACHE_SIZE", 2)
+    paths = [write_csv(f"feed-{n}.csv", "id\n1\n") for n in range(3)]
+
+    sniff(paths[0])
+    sniff(paths[1])
+    sniff(paths[0])
+    sniff(paths[2])
+
+    cached = [key[0] for key in sniffer._options_cache]
+    assert cached == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
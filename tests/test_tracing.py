@@ -0,0 +1,84 @@
+import json
+import threading
+import tracemalloc
+
+import pytest
+
+from salesanalysisagent.tools import tracing
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    return tracing.Tracer()
+
+
+def test_spans_nest_and_count(tracer):
+    with tracer.span("kickoff", "crew"):
+        with tracer.span("read", "tool") as span:
+            tracer.record(rows=10, bytes=100)
+            tracer.record(rows=5)
+
+    read, kickoff = tracer.spans
+    assert read.parent is kickoff
+    assert read.to_dict()["rows"] == 15
+    assert read.to_dict()["bytes"] == 100
+    assert span.wall_s <= kickoff.wall_s
+
+
+def test_error_is_recorded_and_reraised(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span("load", "tool"):
+            raise ValueError("bad row")
+
+    assert tracer.spans[0].error == "ValueError: bad row"
+
+
+def test_threads_keep_their_own_parents(tracer):
+    def task():
+        with tracer.span("task", "task"):
+            pass
+
+    with tracer.span("kickoff", "crew"):
+        thread = threading.Thread(target=task)
+        thread.start()
+        thread.join()
+
+    task_span = next(span for span in tracer.spans if span.name == "task")
+    assert task_span.parent is None
+
+
+def test_no_tracemalloc_unless_memory_tracing_is_on(tracer, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_MEMORY", False)
+    with tracer.span("kickoff", "crew"):
+        assert not tracemalloc.is_tracing()
+
+
+def test_tracemalloc_stops_when_the_outermost_span_closes(tracer, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_MEMORY", True)
+    assert not tracemalloc.is_tracing()
+
+    with tracer.span("kickoff", "crew"):
+        with tracer.span("parse", "tool"):
+            data = bytearray(4 * 2**20)
+            assert tracemalloc.is_tracing()
+        assert tracemalloc.is_tracing()
+    del data
+
+    assert not tracemalloc.is_tracing()
+    parse = tracer.spans[0].to_dict()
+    assert parse["peak_mem_mb"] >= 3.9
+
+
+def test_summary_and_exports(tracer, tmp_path):
+    for _ in range(2):
+        with tracer.span("read", "tool"):
+            tracer.record(rows=3)
+
+    (row,) = tracer.summary()
+    assert (row["name"], row["calls"], row["rows"]) == ("read", 2, 6)
+    stem = tracer.export("feed.csv", directory=str(tmp_path))
+    with open(stem + ".jsonl", encoding="utf-8") as f:
+        assert [json.loads(line)["name"] for line in f] == ["read", "read"]
+    with open(stem + ".trace.json", encoding="utf-8") as f:
+        assert json.load(f)
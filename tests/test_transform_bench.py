@@ -0,0 +1,120 @@
+import time
+
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools import transform_bench
+
+VECTORISED = """
+import pandas as pd
+
+
+def fix_data_format_change(source_df):
+    df = source_df.copy()
+    df["price"] = pd.to_numeric(df["price"], errors="coerce")
+    return df
+"""
+ROW_LOOP = """
+import pandas as pd
+
+
+def cast_columns(source_df):
+    df = source_df.copy()
+    for i, row in df.iterrows():
+        df.at[i, "price"] = row["price"].strip()
+    return df
+"""
+
+
+@pytest.fixture
+def feed(write_csv):
+    return write_csv(
+        "feed.csv", pd.DataFrame({"id": range(1000), "price": [1.5] * 1000})
+    )
+
+
+def test_row_wise_patterns():
+    assert transform_bench.row_wise_patterns(ROW_LOOP) == [
+        "iterrows / itertuples loops",
+        "scalar .at / .iat access in a loop",
+    ]
+    assert transform_bench.row_wise_patterns(
+        "df.apply(lambda row: row['a'] + row['b'], axis=1)"
+    ) == ["row-wise .apply(axis=1)"]
+    for vectorised in (
+        "df.loc[df['price'] == '', 'price'] = None",
+        "df[cols] = df[cols].apply(pd.to_numeric)",
+        "df['a'].map({'x': 1})",
+        "first = df.at[0, 'price']",
+    ):
+        assert transform_bench.row_wise_patterns(vectorised) == []
+
+
+def test_throughput_decides_and_slow_code_gets_a_hint(feed):
+    source = VECTORISED + ROW_LOOP.replace("import pandas as pd\n", "")
+
+    report = transform_bench.benchmark_transforms(
+        source, feed, rows=20_000, min_rows_per_sec=0
+    )
+
+    results = {result["function"]: result for result in report["results"]}
+    assert results["fix_data_format_change"]["passed"]
+    assert results["fix_data_format_change"]["output_rows"] == 20_000
+    assert not results["cast_columns"]["passed"]
+    assert "below the" in results["cast_columns"]["hint"]
+    assert "iterrows / itertuples loops" in results["cast_columns"]["hint"]
+    assert not report["passed"]
+
+
+def test_row_wise_apply_passes_when_fast_enough(feed):
+    source = VECTORISED.replace(
+        'pd.to_numeric(df["price"], errors="coerce")', 'df["price"].apply(float)'
+    )
+
+    report = transform_bench.benchmark_transforms(
+        source, feed, rows=20_000, min_rows_per_sec=0
+    )
+
+    assert report["passed"]
+
+
+def test_limits_apply_to_module_level_code(feed):
+    source = "BIG = [0] * 10**11\n\n" + VECTORISED
+
+    report = transform_bench.benchmark_transforms(source, feed, rows=1000)
+
+    assert report["results"][0]["error"].startswith("MemoryError")
+
+
+def test_hung_job_is_killed_instead_of_awaited(feed):
+    source = "import time\n\n\ndef fix_data_format_change(df):\n    time.sleep(600)\n"
+    job = (
+        source,
+        "fix_data_format_change",
+        transform_bench.seed_sample(feed),
+        10,
+        {},
+        512,
+        600,
+    )
+
+    start = time.monotonic()
+    (outcome,) = transform_bench.run_isolated(
+        transform_bench._run_candidate, [job], timeout_s=3
+    )
+
+    assert isinstance(outcome, TimeoutError)
+    assert time.monotonic() - start < 30
+
+
+def test_jobs_beyond_the_worker_count_still_run_in_order(feed):
+    seed = transform_bench.seed_sample(feed)
+    jobs = [
+        (VECTORISED, "fix_data_format_change", seed, n, {}, 512, 60) for n in (5, 6, 7)
+    ]
+
+    outcomes = transform_bench.run_isolated(
+        transform_bench._run_candidate, jobs, timeout_s=120, workers=2
+    )
+
+    assert [outcome["output_rows"] for outcome in outcomes] == [5, 6, 7]
@@ -0,0 +1,123 @@
+import sys
+
+import pandas as pd
+import pytest
+
+from salesanalysisagent.tools.transform_registry import (
+    TransformRegistry,
+    extract_code_blocks,
+)
+
+RULES = """```python
+import pandas as pd
+
+
+def fix_data_format_change(source_df):
+    df = source_df.copy()
+    df["price"] = pd.to_numeric(df["price"].str.lstrip("$"))
+    return df
+```"""
+FORMAT_TASK = """The day column changed layout:
+```python
+import pandas as pd
+
+
+def fix_data_format_change(source_df):
+    df = source_df.copy()
+    df["day"] = pd.to_datetime(df["day"], format="%d/%m/%Y")
+    return df
+```"""
+FEED = "id,price,day\n1,$10.50,03/01/2024\n2,$3.00,04/01/2024\n"
+KEY = "ab" * 32
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return TransformRegistry(str(tmp_path / "transforms"))
+
+
+def test_extract_code_blocks_keeps_python_only():
+    raw = "Intro\n```sql\nALTER TABLE t;\n```\n```python\nx = 1\n```\n```\ny = 2\n```"
+
+    assert extract_code_blocks(raw) == ["x = 1", "y = 2"]
+    assert extract_code_blocks("z = 3") == ["z = 3"]
+
+
+def test_only_format_steps_are_registered_and_nothing_is_imported(
+    registry, write_csv, tmp_path
+):
+    marker = tmp_path / "side_effect"
+    code_gen = f"```python\nopen({str(marker)!r}, 'w').close()\n```"
+
+    entry = registry.register(
+        KEY,
+        {"rules": RULES, "data_format_check_task": FORMAT_TASK, "code_gen": code_gen},
+        file_path=write_csv("feed.csv", FEED),
+        table_name="sales",
+    )
+
+    assert entry["modules"] == ["data_format_check_task", "rules"]
+    assert entry["output_schema"] == {
+        "id": "string",
+        "price": "decimal",
+        "day": "datetime",
+    }
+    assert entry["table_name"] == "sales"
+    transform = registry.load(KEY)
+    assert transform.version == 1
+    assert set(transform.sources) == {"rules", "data_format_check_task"}
+    assert not marker.exists()
+    assert not any("salesanalysisagent_transforms" in name for name in sys.modules)
+
+
+def test_verify_checks_the_output_schema(registry, write_csv):
+    registry.register(KEY, {"rules": RULES}, file_path=write_csv("feed.csv", FEED))
+    transform = registry.load(KEY)
+
+    assert transform.verify(write_csv("same.csv", FEED)) is None
+    wider = pd.DataFrame({"id": [1], "price": ["$1"], "day": ["x"], "extra": ["y"]})
+    assert "differs from the registered" in transform.verify(
+        write_csv("wider.csv", wider)
+    )
+    bad = write_csv("bad.csv", "id,price,day\n1,n/a,x\n")
+    assert "ValueError" in transform.verify(bad)
+
+
+def test_code_that_fails_on_the_feed_is_not_registered(registry, write_csv):
+    feed = write_csv("feed.csv", "id,price,day\n1,$10.50,2024-01-03\n")
+
+    assert registry.register(KEY, {"data_format_check_task": FORMAT_TASK}, feed) is None
+    assert registry.lookup(KEY) is None
+
+
+def test_new_registration_bumps_the_version(registry, write_csv):
+    feed = write_csv("feed.csv", FEED)
+    registry.register(KEY, {"rules": RULES}, file_path=feed)
+    registry.register(KEY, {"rules": RULES}, file_path=feed)
+
+    assert registry.load(KEY).version == 2
+    # A second registry over the same directory sees the index on disk.
+    assert TransformRegistry(registry.directory).lookup(KEY)["version"] == 2
+
+
+def test_verified_inputs_are_not_run_again(registry, write_csv, monkeypatch):
+    from salesanalysisagent.tools import transform_registry
+
+    feed = write_csv("feed.csv", FEED)
+    registry.register(KEY, {"rules": RULES}, file_path=feed)
+    other = write_csv("other.csv", FEED.replace("10.50", "11.50"))
+    runs = []
+    run_steps = transform_registry.run_steps
+    monkeypatch.setattr(
+        transform_registry,
+        "run_steps",
+        lambda sources, path: runs.append(path) or run_steps(sources, path),
+    )
+
+    transform = registry.load(KEY)
+    assert transform.verify(feed) is None
+    assert transform.verify(other) is None
+    assert TransformRegistry(registry.directory).load(KEY).verify(other) is None
+
+    assert runs == [other]
+    assert "fix_data_format_change" in transform.task_output()
@@ -0,0 +1,72 @@
+import os
+from collections import OrderedDict
+
+import pandas as pd
+
+from salesanalysisagent.tools import type_profiler
+from salesanalysisagent.tools.schema_validator import get_schema
+from salesanalysisagent.tools.type_profiler import profile_file
+
+WORKBOOK = os.path.join(
+    os.path.dirname(__file__),
+    os.pardir,
+    "src",
+    "salesanalysisagent",
+    "data",
+    "format_change",
+    "sales_data.xlsx",
+)
+
+
+def test_widening_offsets_are_absolute_rows(write_csv):
+    qty = [str(i) for i in range(3000)]
+    qty[1500] = "2.5"
+    qty[2500] = "3A"
+    path = write_csv(
+        "feed.csv", pd.DataFrame({"qty": qty, "day": ["2024-01-02"] * 3000})
+    )
+
+    profile = profile_file(path, max_memory_mb=0.01)
+
+    qty_profile = profile["columns"]["qty"]
+    assert qty_profile["type"] == "string"
+    assert [
+        (w["from"], w["to"], w["row"], w["value"]) for w in qty_profile["widenings"]
+    ] == [
+        ("integer", "decimal", 1500, "2.5"),
+        ("decimal", "string", 2500, "3A"),
+    ]
+    assert profile["columns"]["day"]["date_format"] == "%Y-%m-%d"
+    assert profile["rows"] == 3000
+
+
+def test_offsets_run_across_parts(write_csv, tmp_path):
+    write_csv("parts/p-1.csv", pd.DataFrame({"qty": ["1", "2"]}))
+    write_csv("parts/p-2.csv", pd.DataFrame({"qty": ["3", "x"]}))
+
+    profile = profile_file(str(tmp_path / "parts"))
+
+    (widening,) = profile["columns"]["qty"]["widenings"]
+    assert widening["row"] == 3
+
+
+def test_workbooks_profile_their_first_sheet():
+    profile = profile_file(WORKBOOK)
+
+    assert list(profile["columns"]) == ["store_id", "store_name", "region"]
+    df, schema = get_schema(WORKBOOK)
+    assert list(df.columns) == list(schema) == ["store_id", "store_name", "region"]
+
+
+def test_profile_cache_keeps_the_most_recent_inputs(monkeypatch, write_csv):
+    monkeypatch.setattr(type_profiler, "_profile_cache", OrderedDict())
+    monkeypatch.setattr(type_profiler, "_PROFILE_CACHE_SIZE", 2)
+    paths = [write_csv(f"feed-{n}.csv", "id\n1\n") for n in range(3)]
+
+    first = profile_file(paths[0])
+    profile_file(paths[1])
+    assert profile_file(paths[0]) is first
+    profile_file(paths[2])
+
+    cached = [key[0][0] for key in type_profiler._profile_cache]
+    assert cached == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]